@@ -61,8 +61,9 @@ def require_auth(f):
         # Check if rate limiting is disabled (for testing/development)
         rate_limit_disabled = os.getenv('DISABLE_RATE_LIMIT', 'false').lower() == 'true'
         
-#        Check quota
-        has_quota, quota_error = UserService.check_quota(user_context.user_id)
+        # Check quota against the profile validate_user_token just loaded (no
+        # database round-trip), before the rate limit counts this request
+        has_quota, quota_error = UserService.check_quota(user_context.user_id, user_context)
         if not has_quota:
             return jsonify({
                 'success': False,
@@ -75,7 +76,7 @@ def require_auth(f):
         
         # Check rate limit (skip if disabled)
         if not rate_limit_disabled:
-            is_allowed, rate_limit_error = UserService.check_rate_limit(user_context.user_id)
+            is_allowed, rate_limit_error = UserService.check_rate_limit(user_context.user_id, user_context.tier)
             if not is_allowed:
                 return jsonify({
                     'success': False,
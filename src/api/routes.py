@@ -371,7 +371,7 @@ def search():
         search_time_ms = int((time.time() - start_time) * 1000)
         
         # Increment user usage (quota)
-        UserService.increment_usage(user_context.user_id)
+        UserService.increment_usage(user_context.user_id, user_context.tier)
         
         # Increment rate limit counter for successful request
         if hasattr(request, '_rate_limit_checked') and request._rate_limit_checked:
@@ -6,6 +6,11 @@ from src.models.person import Person, PersonCategory
 from src.db.models import UserProfile, JobRecord
 
 
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile keywords into one alternation so a title is scanned once"""
+    return re.compile('|'.join(re.escape(kw) for kw in keywords))
+
+
 class PersonCategorizer:
     """
     Categorize people into:
@@ -90,6 +95,82 @@ class PersonCategorizer:
         "entry level", "apprentice"
     ]
     
+    EARLY_CAREER_INDICATORS = [
+        'intern', 'internship', 'co-op', 'coop',
+        'new grad', 'new graduate', 'recent grad',
+        'entry level', 'entry-level', 'associate',
+        'junior', 'jr', 'apprentice', 'trainee',
+        'early career', 'campus', 'university',
+        # Level indicators
+        'level 1', 'l1', 'e1', 'e2'
+    ]
+    
+    # One compiled alternation per keyword list: a single scan of the title
+    # answers "does any keyword occur" (same substring semantics as any(... in ...))
+    _RECRUITER_RE = _keyword_pattern(RECRUITER_KEYWORDS)
+    _MANAGER_RE = _keyword_pattern(MANAGER_KEYWORDS)
+    _SENIOR_RE = _keyword_pattern(SENIOR_KEYWORDS)
+    _PEER_ROLE_RE = _keyword_pattern(PEER_ROLE_KEYWORDS)
+    _MANAGER_OR_SENIOR_RE = _keyword_pattern(MANAGER_KEYWORDS + SENIOR_KEYWORDS)
+    _EARLY_CAREER_RE = _keyword_pattern(EARLY_CAREER_INDICATORS)
+    
+    # Seniority words stripped when comparing core titles
+    _SENIORITY_STRIP_RES = [
+        re.compile(rf'\b{kw}\b', re.IGNORECASE)
+        for kw in SENIOR_KEYWORDS + ["junior", "jr", "sr", "i", "ii", "iii", "iv"]
+    ]
+    
+    STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'at', 'in', 'of', 'for', 'with'})
+    
+    # Tech role variations and abbreviations (abbreviation -> words it may stand for)
+    TECH_VARIATIONS = {
+        # AI/ML variations
+        'ai': ['artificial intelligence', 'a.i.', 'ml', 'machine learning'],
+        'ml': ['machine learning', 'ai', 'artificial intelligence'],
+        'mlops': ['ml ops', 'ml operations', 'machine learning operations'],
+        'nlp': ['natural language processing', 'language processing'],
+        'cv': ['computer vision', 'vision'],
+        
+        # Engineering variations
+        'eng': ['engineer', 'engineering', 'engr'],
+        'dev': ['developer', 'development'],
+        'swe': ['software engineer', 'software developer', 'software eng'],
+        'sde': ['software development engineer', 'software dev engineer'],
+        'fe': ['frontend', 'front end', 'front-end'],
+        'be': ['backend', 'back end', 'back-end'],
+        'fs': ['fullstack', 'full stack', 'full-stack'],
+        'devops': ['dev ops', 'development operations'],
+        'sre': ['site reliability', 'site reliability engineer'],
+        
+        # Product/Management
+        'pm': ['product manager', 'product management'],
+        'tpm': ['technical program manager', 'tech program manager'],
+        'em': ['engineering manager', 'eng manager'],
+        
+        # Data roles
+        'ds': ['data scientist', 'data science'],
+        'de': ['data engineer', 'data engineering'],
+        'da': ['data analyst', 'data analysis'],
+        'bi': ['business intelligence', 'business intel'],
+        
+        # Other common abbreviations
+        'sr': ['senior'],
+        'jr': ['junior'],
+        'assoc': ['associate'],
+        'mgr': ['manager'],
+        'dir': ['director'],
+        'vp': ['vice president'],
+        'infra': ['infrastructure'],
+        'sec': ['security'],
+        'arch': ['architect', 'architecture']
+    }
+    
+    # Flattened word sets of TECH_VARIATIONS, built once
+    _TECH_VARIATION_WORDS = {
+        abbrev: frozenset(word for var in variations for word in var.split())
+        for abbrev, variations in TECH_VARIATIONS.items()
+    }
+    
     def __init__(self, target_title: str):
         """
         Initialize with target job title.
@@ -100,7 +181,7 @@ class PersonCategorizer:
         self.target_title = target_title.lower()
         
         # Extract seniority from target title
-        self.target_is_senior = any(kw in self.target_title for kw in self.SENIOR_KEYWORDS)
+        self.target_is_senior = self._SENIOR_RE.search(self.target_title) is not None
     
     def categorize(self, person: Person) -> Person:
         """
@@ -116,24 +197,24 @@ class PersonCategorizer:
         title_lower = person.title.lower()
         
         # Check for recruiter (highest priority)
-        if any(kw in title_lower for kw in self.RECRUITER_KEYWORDS):
+        if self._RECRUITER_RE.search(title_lower):
             person.category = PersonCategory.RECRUITER
             return person
         
         # Check for manager/leadership
-        if any(kw in title_lower for kw in self.MANAGER_KEYWORDS):
+        if self._MANAGER_RE.search(title_lower):
             person.category = PersonCategory.MANAGER
             return person
         
         # Check for senior (if target is not already senior)
-        if not self.target_is_senior and any(kw in title_lower for kw in self.SENIOR_KEYWORDS):
+        if not self.target_is_senior and self._SENIOR_RE.search(title_lower):
             person.category = PersonCategory.SENIOR
             return person
         
         # Check for exact role matches (NEW - improves peer detection)
-        if any(kw in title_lower for kw in self.PEER_ROLE_KEYWORDS):
+        if self._PEER_ROLE_RE.search(title_lower):
             # Verify it's not senior/manager role
-            if not any(kw in title_lower for kw in self.MANAGER_KEYWORDS + self.SENIOR_KEYWORDS):
+            if not self._MANAGER_OR_SENIOR_RE.search(title_lower):
                 person.category = PersonCategory.PEER
                 return person
         
@@ -158,9 +239,9 @@ class PersonCategorizer:
     def _is_similar_title(self, title1: str, title2: str) -> bool:
         """Check if two titles are similar (same role, different seniority)"""
         # Remove seniority keywords
-        for kw in self.SENIOR_KEYWORDS + ["junior", "jr", "sr", "i", "ii", "iii", "iv"]:
-            title1 = re.sub(rf'\b{kw}\b', '', title1, flags=re.IGNORECASE)
-            title2 = re.sub(rf'\b{kw}\b', '', title2, flags=re.IGNORECASE)
+        for pattern in self._SENIORITY_STRIP_RES:
+            title1 = pattern.sub('', title1)
+            title2 = pattern.sub('', title2)
         
         # Clean whitespace
         title1 = ' '.join(title1.split())
@@ -175,10 +256,8 @@ class PersonCategorizer:
         Helps catch variations like "AI Eng" vs "AI Engineer"
         """
         # Remove common words and clean
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'at', 'in', 'of', 'for', 'with'}
-        
-        title_words = set(title.lower().split()) - stop_words
-        target_words = set(target.lower().split()) - stop_words
+        title_words = set(title.lower().split()) - self.STOP_WORDS
+        target_words = set(target.lower().split()) - self.STOP_WORDS
         
         # Check word overlap
         if not title_words or not target_words:
@@ -192,55 +271,10 @@ class PersonCategorizer:
             return True
         
         # Check for tech role variations and abbreviations
-        tech_variations = {
-            # AI/ML variations
-            'ai': ['artificial intelligence', 'a.i.', 'ml', 'machine learning'],
-            'ml': ['machine learning', 'ai', 'artificial intelligence'],
-            'mlops': ['ml ops', 'ml operations', 'machine learning operations'],
-            'nlp': ['natural language processing', 'language processing'],
-            'cv': ['computer vision', 'vision'],
-            
-            # Engineering variations
-            'eng': ['engineer', 'engineering', 'engr'],
-            'dev': ['developer', 'development'],
-            'swe': ['software engineer', 'software developer', 'software eng'],
-            'sde': ['software development engineer', 'software dev engineer'],
-            'fe': ['frontend', 'front end', 'front-end'],
-            'be': ['backend', 'back end', 'back-end'],
-            'fs': ['fullstack', 'full stack', 'full-stack'],
-            'devops': ['dev ops', 'development operations'],
-            'sre': ['site reliability', 'site reliability engineer'],
-            
-            # Product/Management
-            'pm': ['product manager', 'product management'],
-            'tpm': ['technical program manager', 'tech program manager'],
-            'em': ['engineering manager', 'eng manager'],
-            
-            # Data roles
-            'ds': ['data scientist', 'data science'],
-            'de': ['data engineer', 'data engineering'],
-            'da': ['data analyst', 'data analysis'],
-            'bi': ['business intelligence', 'business intel'],
-            
-            # Other common abbreviations
-            'sr': ['senior'],
-            'jr': ['junior'],
-            'assoc': ['associate'],
-            'mgr': ['manager'],
-            'dir': ['director'],
-            'vp': ['vice president'],
-            'infra': ['infrastructure'],
-            'sec': ['security'],
-            'arch': ['architect', 'architecture']
-        }
-        
-        # Check if any variations match
         for word in title_words:
-            if word in tech_variations:
-                variations = tech_variations[word]
-                for var in variations:
-                    if any(v in target_words for v in var.split()):
-                        return True
+            variation_words = self._TECH_VARIATION_WORDS.get(word)
+            if variation_words and not variation_words.isdisjoint(target_words):
+                return True
         
         return False
     
@@ -249,19 +283,7 @@ class PersonCategorizer:
         Detect if a title is for early career (intern, new grad, junior).
         Important for matching appropriate connections.
         """
-        title_lower = title.lower()
-        
-        early_career_indicators = [
-            'intern', 'internship', 'co-op', 'coop',
-            'new grad', 'new graduate', 'recent grad',
-            'entry level', 'entry-level', 'associate',
-            'junior', 'jr', 'apprentice', 'trainee',
-            'early career', 'campus', 'university',
-            # Level indicators
-            'level 1', 'l1', 'e1', 'e2'
-        ]
-        
-        return any(indicator in title_lower for indicator in early_career_indicators)
+        return self._EARLY_CAREER_RE.search(title.lower()) is not None
     
     def categorize_with_profile_context(
         self,
@@ -5,9 +5,10 @@ import yaml
 import time
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from src.models.person import Person, PersonCategory
 from src.models.job_context import CandidateProfile, JobContext
+from src.models.source_config import SOURCE_QUALITY_SCORES
 from src.db.models import UserProfile, JobRecord
 from src.utils.cache import get_cache
 from src.utils.cost_tracker import get_cost_tracker
@@ -36,33 +37,7 @@ class ConnectionFinder:
     """
     
     # Source quality scores (higher = better data quality)
-    SOURCE_QUALITY_SCORES = {
-        # Premium APIs (Best quality, but paid)
-        'google_serp': 1.0,           # Best: SerpAPI with LinkedIn URLs + metadata
-        'apollo': 0.95,               # Professional database with verified data
-        
-        # High Quality Free Sources (LinkedIn profiles with titles)
-        'google_cse': 0.9,            # Google Custom Search - LinkedIn profiles
-        'bing_api': 0.85,             # Bing Web Search API - LinkedIn profiles
-        
-        # Combined sources
-        'elite_free': 0.8,            # Our combined free sources
-        
-        # Low Quality Sources (minimal professional info)
-        'github': 0.2,                # GitHub API - just usernames, no titles
-        'github_legacy': 0.2,         # GitHub org members - no professional info
-        'company_website': 0.6,       # Company team pages (if used in future)
-        
-        # Default for unknown sources
-        'unknown': 0.5,
-        
-        # Deprecated/Broken sources
-        'twitter': 0.1,               # Broken (Nitter down)
-        'wellfound': 0.1,             # Broken (not finding companies)
-        'crunchbase': 0.1,            # Broken (403 Forbidden)
-        'linkedin_public': 0.1,       # Broken/Risky (ToS violations)
-        'free_linkedin': 0.1,         # Broken (all search engines blocking)
-    }
+    SOURCE_QUALITY_SCORES = SOURCE_QUALITY_SCORES
     
     def __init__(self, config_path: Optional[str] = None):
         """
@@ -137,40 +112,21 @@ class ConnectionFinder:
         paid_sources = ['google_serp', 'apollo']
         min_people_threshold = 10  # Focus on quality over quantity
         
+        # Context kwargs are the same for every source - build them once
+        kwargs = {}
+        if user_profile:
+            kwargs["user_profile"] = user_profile
+        if job_context:
+            kwargs["job_context"] = job_context
+        
         # Phase 1: Run FREE sources first
         logger.info("Phase 1: Free Sources (Cost: $0)")
         logger.debug("-" * 40)
         
-        for source_name in free_sources:
-            if source_name not in self.sources:
-                continue
-                
-            source_instance = self.sources[source_name]
-            source_config = self.config['sources'].get(source_name, {})
-            
-            if not source_config.get('enabled', True):
-                logger.debug(f"{source_name}: disabled")
-                continue
-            
-            # Check if source requires auth and is configured
-            if hasattr(source_instance, 'is_configured'):
-                if not source_instance.is_configured():
-                    logger.debug(f"{source_name}: not configured (missing API key)")
-                    continue
-            
+        for source_name, source_instance in self._runnable_sources(free_sources):
             logger.debug(f"Running {source_name}...")
             
             try:
-                # Call search_people on each source with context
-                kwargs = {}
-                # Note: company_domain can be passed if source supports it
-                
-                # Pass user profile and job context for tailored searches
-                if user_profile:
-                    kwargs["user_profile"] = user_profile
-                if job_context:
-                    kwargs["job_context"] = job_context
-                
                 people = source_instance.search_people(company, title, **kwargs)
                 
                 if people:
@@ -198,33 +154,10 @@ class ConnectionFinder:
             logger.info(f"Phase 2: Premium Sources (Need {min_people_threshold - current_count} more)")
             logger.debug("-" * 40)
             
-            for source_name in paid_sources:
-                if source_name not in self.sources:
-                    continue
-                    
-                source_instance = self.sources[source_name]
-                source_config = self.config['sources'].get(source_name, {})
-                
-                if not source_config.get('enabled', True):
-                    logger.debug(f"{source_name}: disabled")
-                    continue
-                
-                # Check if source requires auth and is configured
-                if hasattr(source_instance, 'is_configured'):
-                    if not source_instance.is_configured():
-                        logger.debug(f"{source_name}: not configured (missing API key)")
-                        continue
-                
+            for source_name, source_instance in self._runnable_sources(paid_sources):
                 logger.debug(f"Running {source_name}...")
                 
                 try:
-                    # Pass context for paid sources too
-                    kwargs = {}
-                    if user_profile:
-                        kwargs["user_profile"] = user_profile
-                    if job_context:
-                        kwargs["job_context"] = job_context
-                    
                     people = source_instance.search_people(company, title, **kwargs)
                     
                     if people:
@@ -416,6 +349,13 @@ class ConnectionFinder:
                     required_skills=job_context.candidate_skills if job_context else None
                 )
             
+            # Profile/job inputs are the same for everyone: normalize them once
+            match_context = ProfileMatcher.prepare_context(
+                profile=None,  # We'll use candidate_profile instead
+                job=job_record,
+                candidate_profile=user_profile  # Pass CandidateProfile directly
+            )
+            
             # Calculate relevance for each person
             for person_dict in all_people_dicts:
                 # Create a minimal Person object for matching
@@ -433,11 +373,8 @@ class ConnectionFinder:
                 )
                 
                 # Calculate relevance
-                relevance, match_reasons = ProfileMatcher.calculate_relevance(
-                    person_obj,
-                    profile=None,  # We'll use candidate_profile instead
-                    job=job_record,
-                    candidate_profile=user_profile  # Pass CandidateProfile directly
+                relevance, match_reasons = ProfileMatcher.calculate_relevance_with_context(
+                    person_obj, match_context
                 )
                 
                 relevance_scores[person_dict.get('name', '')] = relevance
@@ -530,6 +467,31 @@ class ConnectionFinder:
         
         return sources
     
+    def _runnable_sources(self, source_names: List[str]) -> List[Tuple[str, object]]:
+        """
+        Resolve, in order, the sources from `source_names` that exist, are
+        enabled in config and are configured (API keys present).
+        """
+        runnable = []
+        for source_name in source_names:
+            source_instance = self.sources.get(source_name)
+            if source_instance is None:
+                continue
+            
+            source_config = self.config['sources'].get(source_name, {})
+            if not source_config.get('enabled', True):
+                logger.debug(f"{source_name}: disabled")
+                continue
+            
+            # Check if source requires auth and is configured
+            if hasattr(source_instance, 'is_configured') and not source_instance.is_configured():
+                logger.debug(f"{source_name}: not configured (missing API key)")
+                continue
+            
+            runnable.append((source_name, source_instance))
+        
+        return runnable
+    
     def _guess_company_domain(self, company: str) -> Optional[str]:
         """Guess company domain from company name"""
         # Common company domain mappings
@@ -77,6 +77,48 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to fetch a user's tier and usage, creating a default (free)
+-- profile first if the user has none - one round-trip for token validation
+CREATE OR REPLACE FUNCTION get_or_init_profile(p_user_id uuid, p_email text)
+RETURNS TABLE (subscription_tier text, searches_used_this_month integer) AS $$
+#variable_conflict use_column
+BEGIN
+  INSERT INTO public.profiles (id, email, subscription_tier, searches_used_this_month)
+  VALUES (p_user_id, p_email, 'free', 0)
+  ON CONFLICT (id) DO NOTHING;
+  
+  RETURN QUERY
+  SELECT p.subscription_tier, p.searches_used_this_month
+  FROM public.profiles p
+  WHERE p.id = p_user_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to count one search for a user atomically (single round-trip, no
+-- lost updates). Enterprise (unlimited) usage is not counted. Returns the new
+-- count, or NULL if the user has no profile row.
+CREATE OR REPLACE FUNCTION increment_user_search(p_user_id uuid)
+RETURNS integer AS $$
+  UPDATE public.profiles
+  SET searches_used_this_month = COALESCE(searches_used_this_month, 0)
+      + CASE WHEN subscription_tier = 'enterprise' THEN 0 ELSE 1 END
+  WHERE id = p_user_id
+  RETURNING searches_used_this_month;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Function to count a batch of searches in one statement: p_counts[i]
+-- searches for user p_ids[i], creating free profiles as needed. Enterprise
+-- (unlimited) usage is not counted.
+CREATE OR REPLACE FUNCTION batch_increment_user_searches(p_ids uuid[], p_counts integer[])
+RETURNS void AS $$
+  INSERT INTO public.profiles AS p (id, subscription_tier, searches_used_this_month)
+  SELECT d.id, 'free', d.c
+  FROM unnest(p_ids, p_counts) AS d(id, c)
+  ON CONFLICT (id) DO UPDATE
+  SET searches_used_this_month = COALESCE(p.searches_used_this_month, 0)
+      + CASE WHEN p.subscription_tier = 'enterprise' THEN 0 ELSE EXCLUDED.searches_used_this_month END;
+$$ LANGUAGE sql SECURITY DEFINER;
+
 -- Function to get user quota info
 CREATE OR REPLACE FUNCTION get_user_quota(user_uuid uuid)
 RETURNS json AS $$
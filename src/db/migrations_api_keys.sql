@@ -0,0 +1,112 @@
+-- Migration: API Key Usage Functions
+-- Purpose: Atomic usage accounting for the api_keys table
+-- Run this in Supabase SQL editor or via migration tool
+
+-- Function to increment API key usage atomically (single round-trip, no lost updates)
+CREATE OR REPLACE FUNCTION increment_api_key_usage(p_key UUID)
+RETURNS void AS $$
+    UPDATE public.api_keys
+    SET searches_used_this_month = searches_used_this_month + 1,
+        last_used_at = NOW()
+    WHERE id = p_key;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Function to apply a batch of usage increments in one statement
+CREATE OR REPLACE FUNCTION batch_increment_api_key_usage(p_ids UUID[], p_counts INTEGER[])
+RETURNS void AS $$
+    UPDATE public.api_keys AS a
+    SET searches_used_this_month = a.searches_used_this_month + d.c,
+        last_used_at = NOW()
+    FROM unnest(p_ids, p_counts) AS d(id, c)
+    WHERE a.id = d.id;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Keyed (HMAC-SHA256) hashes are deterministic: look keys up by hash directly
+CREATE UNIQUE INDEX IF NOT EXISTS api_keys_key_hash_idx ON public.api_keys(key_hash);
+
+-- Per-key, per-minute request windows used by authorize_and_charge
+CREATE TABLE IF NOT EXISTS public.api_key_rate_limits (
+    key_id UUID NOT NULL REFERENCES public.api_keys(id) ON DELETE CASCADE,
+    window_start TIMESTAMPTZ NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (key_id, window_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_key_rate_limits_window_start ON public.api_key_rate_limits(window_start);
+
+-- Function to clean up old API key rate windows (older than 1 hour)
+CREATE OR REPLACE FUNCTION cleanup_old_api_key_rate_limits()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM public.api_key_rate_limits
+    WHERE window_start < NOW() - INTERVAL '1 hour';
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Validate + rate limit + quota check + usage charge in one round-trip.
+-- Returns no row for unknown/inactive/expired keys; otherwise one row with
+-- allowed = FALSE and reason = 'rate_limit' | 'quota' when the call is denied.
+CREATE OR REPLACE FUNCTION authorize_and_charge(p_key_hash TEXT)
+RETURNS TABLE (
+    key_id UUID,
+    user_id UUID,
+    tier TEXT,
+    allowed BOOLEAN,
+    reason TEXT,
+    searches_per_month INTEGER,
+    searches_used_this_month INTEGER,
+    rate_limit_per_minute INTEGER,
+    reset_in_seconds INTEGER
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_key public.api_keys%ROWTYPE;
+    v_window TIMESTAMPTZ := date_trunc('minute', NOW());
+    v_count INTEGER;
+BEGIN
+    SELECT * INTO v_key
+    FROM public.api_keys k
+    WHERE k.key_hash = p_key_hash
+      AND k.is_active
+      AND (k.expires_at IS NULL OR k.expires_at > NOW());
+    
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+    
+    -- Take a slot in the current minute window (only while under the limit)
+    INSERT INTO public.api_key_rate_limits AS rl (key_id, window_start, request_count)
+    VALUES (v_key.id, v_window, 1)
+    ON CONFLICT (key_id, window_start) DO UPDATE
+    SET request_count = rl.request_count + 1
+    WHERE rl.request_count < v_key.rate_limit_per_minute
+    RETURNING rl.request_count INTO v_count;
+    
+    IF v_count IS NULL THEN
+        RETURN QUERY SELECT v_key.id, v_key.user_id, v_key.tier, FALSE, 'rate_limit'::TEXT,
+            v_key.searches_per_month, v_key.searches_used_this_month, v_key.rate_limit_per_minute,
+            GREATEST(1, CEIL(EXTRACT(EPOCH FROM (v_window + INTERVAL '1 minute' - NOW()))))::INTEGER;
+        RETURN;
+    END IF;
+    
+    -- Quota check and charge in one statement (-1 means unlimited)
+    UPDATE public.api_keys k
+    SET searches_used_this_month = k.searches_used_this_month + 1,
+        last_used_at = NOW()
+    WHERE k.id = v_key.id
+      AND (k.searches_per_month = -1 OR k.searches_used_this_month < k.searches_per_month)
+    RETURNING k.searches_used_this_month INTO v_count;
+    
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT v_key.id, v_key.user_id, v_key.tier, FALSE, 'quota'::TEXT,
+            v_key.searches_per_month, v_key.searches_used_this_month, v_key.rate_limit_per_minute, 0;
+        RETURN;
+    END IF;
+    
+    RETURN QUERY SELECT v_key.id, v_key.user_id, v_key.tier, TRUE, NULL::TEXT,
+        v_key.searches_per_month, v_count, v_key.rate_limit_per_minute, 0;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- key_prefix identifies keys (sk_<prefix>_<secret>) and serves legacy lookups
+CREATE INDEX IF NOT EXISTS idx_api_keys_key_prefix ON public.api_keys(key_prefix);
@@ -0,0 +1,49 @@
+-- Migration: Bulk Discovery Inserts
+-- Purpose: Insert many people_discoveries rows per call, shipped as column arrays
+-- Run this in Supabase SQL editor or via migration tool
+
+-- Inserts one row per array position (all arrays must have the same length)
+-- and returns the inserted rows. match_reasons elements are JSON-encoded
+-- string arrays (or NULL), since Postgres arrays can't nest ragged arrays.
+CREATE OR REPLACE FUNCTION insert_people_discoveries(
+    p_job_id UUID[],
+    p_user_id UUID[],
+    p_person_type TEXT[],
+    p_full_name TEXT[],
+    p_title TEXT[],
+    p_email TEXT[],
+    p_linkedin_url TEXT[],
+    p_confidence_score DOUBLE PRECISION[],
+    p_connection_path TEXT[],
+    p_contacted BOOLEAN[],
+    p_company TEXT[],
+    p_department TEXT[],
+    p_location TEXT[],
+    p_source TEXT[],
+    p_relevance_score DOUBLE PRECISION[],
+    p_match_reasons TEXT[]
+)
+RETURNS SETOF public.people_discoveries AS $$
+    INSERT INTO public.people_discoveries (
+        job_id, user_id, person_type, full_name, title, email, linkedin_url,
+        confidence_score, connection_path, contacted, company, department,
+        location, source, relevance_score, match_reasons
+    )
+    SELECT
+        d.job_id, d.user_id, d.person_type, d.full_name, d.title, d.email, d.linkedin_url,
+        d.confidence_score, d.connection_path, COALESCE(d.contacted, FALSE), d.company, d.department,
+        d.location, d.source, d.relevance_score,
+        CASE WHEN d.match_reasons IS NULL THEN NULL
+             ELSE ARRAY(SELECT jsonb_array_elements_text(d.match_reasons::jsonb))
+        END
+    FROM unnest(
+        p_job_id, p_user_id, p_person_type, p_full_name, p_title, p_email, p_linkedin_url,
+        p_confidence_score, p_connection_path, p_contacted, p_company, p_department,
+        p_location, p_source, p_relevance_score, p_match_reasons
+    ) AS d(
+        job_id, user_id, person_type, full_name, title, email, linkedin_url,
+        confidence_score, connection_path, contacted, company, department,
+        location, source, relevance_score, match_reasons
+    )
+    RETURNING *;
+$$ LANGUAGE sql SECURITY DEFINER;
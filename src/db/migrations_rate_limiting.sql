@@ -91,3 +91,52 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- Function to check and count a request in one round-trip: increments the
+-- window's counter only while it is under p_limit
+CREATE OR REPLACE FUNCTION try_acquire_rate_limit(
+    p_user_id UUID,
+    p_window_start TIMESTAMPTZ,
+    p_reset_at TIMESTAMPTZ,
+    p_limit INTEGER
+)
+RETURNS TABLE (
+    allowed BOOLEAN,
+    request_count INTEGER
+) AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    INSERT INTO public.rate_limits AS rl (user_id, window_start, request_count, reset_at)
+    VALUES (p_user_id, p_window_start, 1, p_reset_at)
+    ON CONFLICT (user_id, window_start) DO UPDATE
+    SET request_count = rl.request_count + 1,
+        updated_at = NOW()
+    WHERE rl.request_count < p_limit
+    RETURNING rl.request_count INTO v_count;
+    
+    IF v_count IS NOT NULL THEN
+        RETURN QUERY SELECT TRUE, v_count;
+    ELSE
+        RETURN QUERY
+        SELECT FALSE, rl.request_count
+        FROM public.rate_limits rl
+        WHERE rl.user_id = p_user_id
+          AND rl.window_start = p_window_start;
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to add a batch of locally counted requests (RATE_LIMIT_MODE=local)
+-- p_rows: [{"user_id": ..., "window_start": ..., "count": n}, ...]
+CREATE OR REPLACE FUNCTION flush_rate_limits(p_rows JSONB)
+RETURNS void AS $$
+    INSERT INTO public.rate_limits (user_id, window_start, request_count, reset_at)
+    SELECT (r->>'user_id')::UUID,
+           (r->>'window_start')::TIMESTAMPTZ,
+           (r->>'count')::INTEGER,
+           (r->>'window_start')::TIMESTAMPTZ + INTERVAL '1 minute'
+    FROM jsonb_array_elements(p_rows) AS r
+    ON CONFLICT (user_id, window_start) DO UPDATE
+    SET request_count = public.rate_limits.request_count + EXCLUDED.request_count,
+        updated_at = NOW();
+$$ LANGUAGE sql SECURITY DEFINER;
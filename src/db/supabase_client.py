@@ -1,14 +1,48 @@
 """Supabase client for database operations"""
 
 import os
+import threading
 from typing import Optional
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Global Supabase client singleton
 _supabase_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+# Shared HTTP connection pool. Services call the client from several threads
+# at once (e.g. concurrent discovery inserts), so keep enough connections alive
+# to reuse TCP/TLS state instead of reconnecting per request.
+_http_client: Optional[httpx.Client] = None
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+HTTP_TIMEOUT = float(os.getenv('SUPABASE_HTTP_TIMEOUT', '120'))
+
+
+def _get_http_client() -> httpx.Client:
+    """Get or create the pooled httpx client shared by all Supabase clients"""
+    global _http_client
+    
+    if _http_client is None:
+        try:
+            # HTTP/2 multiplexes requests over one connection (needs the h2 package)
+            _http_client = httpx.Client(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT, http2=True)
+        except ImportError:
+            _http_client = httpx.Client(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT)
+    
+    return _http_client
+
+
+def _create_client(supabase_url: str, supabase_key: str) -> Client:
+    """Create a Supabase client on the shared connection pool"""
+    try:
+        options = ClientOptions(httpx_client=_get_http_client())
+    except TypeError:
+        # supabase-py versions without httpx_client support
+        return create_client(supabase_url, supabase_key)
+    return create_client(supabase_url, supabase_key, options=options)
 
 
 def get_client() -> Client:
@@ -16,15 +50,17 @@ def get_client() -> Client:
     global _supabase_client
     
     if _supabase_client is None:
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_KEY')  # Anon key for client-side operations
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError(
-                "SUPABASE_URL and SUPABASE_KEY must be set in environment variables"
-            )
-        
-        _supabase_client = create_client(supabase_url, supabase_key)
+        with _client_lock:
+            if _supabase_client is None:
+                supabase_url = os.getenv('SUPABASE_URL')
+                supabase_key = os.getenv('SUPABASE_KEY')  # Anon key for client-side operations
+                
+                if not supabase_url or not supabase_key:
+                    raise ValueError(
+                        "SUPABASE_URL and SUPABASE_KEY must be set in environment variables"
+                    )
+                
+                _supabase_client = _create_client(supabase_url, supabase_key)
     
     return _supabase_client
 
@@ -43,7 +79,7 @@ def get_client_with_token(token: str) -> Client:
         )
     
     # Create client and set session
-    client = create_client(supabase_url, supabase_key)
+    client = _create_client(supabase_url, supabase_key)
     client.auth.set_session(token)
     
     return client
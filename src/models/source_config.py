@@ -5,6 +5,36 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 
+# Source quality scores (higher = better data quality)
+SOURCE_QUALITY_SCORES = {
+    # Premium APIs (Best quality, but paid)
+    'google_serp': 1.0,           # Best: SerpAPI with LinkedIn URLs + metadata
+    'apollo': 0.95,               # Professional database with verified data
+    
+    # High Quality Free Sources (LinkedIn profiles with titles)
+    'google_cse': 0.9,            # Google Custom Search - LinkedIn profiles
+    'bing_api': 0.85,             # Bing Web Search API - LinkedIn profiles
+    
+    # Combined sources
+    'elite_free': 0.8,            # Our combined free sources
+    
+    # Low Quality Sources (minimal professional info)
+    'github': 0.2,                # GitHub API - just usernames, no titles
+    'github_legacy': 0.2,         # GitHub org members - no professional info
+    'company_website': 0.6,       # Company team pages (if used in future)
+    
+    # Default for unknown sources
+    'unknown': 0.5,
+    
+    # Deprecated/Broken sources
+    'twitter': 0.1,               # Broken (Nitter down)
+    'wellfound': 0.1,             # Broken (not finding companies)
+    'crunchbase': 0.1,            # Broken (403 Forbidden)
+    'linkedin_public': 0.1,       # Broken/Risky (ToS violations)
+    'free_linkedin': 0.1,         # Broken (all search engines blocking)
+}
+
+
 class SourceStatus(str, Enum):
     """Health status of a data source"""
     HEALTHY = "healthy"
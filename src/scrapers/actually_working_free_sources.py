@@ -8,19 +8,26 @@ Use: APIs with free tiers + GitHub + company websites
 
 import os
 import re
+import hashlib
 import requests
 import time
 import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from src.models.person import Person
 from src.models.job_context import CandidateProfile, JobContext
 from src.utils.query_tracker import track_query
 from src.utils.company_resolver import CompanyResolver
 from src.utils.query_optimizer import QueryOptimizer
+from src.utils.cache import get_cache
+from src.utils.http_client import parse_json
 
 # Load environment variables
 load_dotenv()
@@ -44,6 +51,28 @@ class ActuallyWorkingFreeSources:
     - Most "free" search engines (block bots)
     """
     
+    # Google CSE result parsing patterns, compiled once
+    _LINKEDIN_PROFILE_URL_RE = re.compile(r'linkedin\.com/(?:in|profile)/|/linkedin\.com/pub/')
+    # Trailing "- LinkedIn ..." / "LinkedIn ..." / "Profile ..." noise after a name
+    _NAME_NOISE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\s*-\s*LinkedIn.*$',
+        r'\s*LinkedIn.*$',
+        r'\s*Profile.*$',
+    ))
+    _LINKEDIN_SLUG_RE = re.compile(r'linkedin\.com/in/([^/?#]+)', re.IGNORECASE)
+    _AT_COMPANY_SUFFIX_RE = re.compile(r'\s*at\s+.*$', re.IGNORECASE)
+    _SNIPPET_TITLE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:at|@|•|\|)\s+',
+        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:Engineer|Developer|Manager|Director|Lead|Architect)',
+        r'(?:Title|Role):\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+    ))
+    
+    # Concurrent Google CSE queries per search (each is one API call either way)
+    CSE_MAX_WORKERS = 4
+    
+    # Raw CSE items are reused for repeat queries within this window
+    SERP_CACHE_TTL = timedelta(minutes=10)
+    
     def __init__(self):
         self.google_cse_id = os.getenv('GOOGLE_CSE_ID')
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
@@ -55,6 +84,35 @@ class ActuallyWorkingFreeSources:
         self.company_resolver = CompanyResolver()
         # Query optimizer for smarter searches
         self.query_optimizer = QueryOptimizer()
+        self.cache = get_cache()
+        # Shared keep-alive session for every provider request
+        self.session = self._create_session()
+    
+    def _create_session(self) -> requests.Session:
+        """
+        Create a pooled session with retries on transient errors.
+        
+        The pool is sized for the concurrent provider/query fan-out so threads
+        reuse connections instead of opening new TLS sessions. Retry-After is
+        not honoured: a long server-requested wait would blow the search's
+        time budget, so throttled calls fail fast after short backoffs.
+        """
+        session = requests.Session()
+        
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry_strategy)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        
+        return session
         
     def search_all(self, company: str, title: str = None, max_results: int = 50, 
                    user_profile: Optional[CandidateProfile] = None,
@@ -68,60 +126,79 @@ class ActuallyWorkingFreeSources:
         print(f"\n🔍 Searching: {company} {title or ''}")
         logger.info(f"Searching: {company} {title or ''}")
         
-        # Priority 1: Google Custom Search (if configured)
-        if self.google_cse_id and self.google_api_key:
-            print("  → Google Custom Search...")
-            logger.info(f"Google CSE configured - searching for {company} {title or ''}")
-            try:
-                people = self._search_google_cse(company, title, user_profile, job_context)
-                new = self._add_unique(people, seen_urls, all_people)
-                if new > 0:
+        # All providers are network-bound and independent: start them together so
+        # wall time is the slowest provider rather than the sum. Results are
+        # still merged in priority order below, so dedup precedence is unchanged.
+        cse_configured = bool(self.google_cse_id and self.google_api_key)
+        
+        # CSE and Bing run the same optimized LinkedIn queries: build them once
+        query_variations = None
+        if cse_configured or self.bing_api_key:
+            query_variations = self._generate_linkedin_queries(company, title, user_profile, job_context)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            cse_future = executor.submit(
+                self._search_google_cse, company, title, user_profile, job_context, query_variations
+            ) if cse_configured else None
+            bing_future = executor.submit(
+                self._search_bing_api, company, title, user_profile, job_context, query_variations
+            ) if self.bing_api_key else None
+            github_future = executor.submit(self._search_github, company, title, job_context)
+            
+            # Priority 1: Google Custom Search (if configured)
+            if cse_future:
+                print("  → Google Custom Search...")
+                logger.info(f"Google CSE configured - searching for {company} {title or ''}")
+                try:
+                    people = cse_future.result()
+                    new = self._add_unique(people, seen_urls, all_people)
+                    if new > 0:
+                        print(f"    ✓ Found {new} profiles")
+                        logger.info(f"Google CSE found {new} profiles")
+                    else:
+                        print(f"    ⊘ Found {len(people)} results but {new} were new/unique")
+                        logger.info(f"Google CSE found {len(people)} results, {new} new after deduplication")
+                except Exception as e:
+                    print(f"    ✗ Error: {str(e)[:50]}")
+                    logger.error(f"Google CSE error: {e}", exc_info=True)
+            else:
+                print("  ⊘ Google CSE not configured (set GOOGLE_CSE_ID + GOOGLE_API_KEY)")
+                logger.warning("Google CSE not configured - missing GOOGLE_CSE_ID or GOOGLE_API_KEY")
+            
+            # Priority 2: Bing Search API (DEPRECATED - kept for backward compatibility)
+            if bing_future:
+                print("  → Bing Web Search API...")
+                logger.debug("Bing Web Search API...")
+                try:
+                    people = bing_future.result()
+                    new = self._add_unique(people, seen_urls, all_people)
                     print(f"    ✓ Found {new} profiles")
-                    logger.info(f"Google CSE found {new} profiles")
-                else:
-                    print(f"    ⊘ Found {len(people)} results but {new} were new/unique")
-                    logger.info(f"Google CSE found {len(people)} results, {new} new after deduplication")
-            except Exception as e:
-                print(f"    ✗ Error: {str(e)[:50]}")
-                logger.error(f"Google CSE error: {e}", exc_info=True)
-        else:
-            print("  ⊘ Google CSE not configured (set GOOGLE_CSE_ID + GOOGLE_API_KEY)")
-            logger.warning("Google CSE not configured - missing GOOGLE_CSE_ID or GOOGLE_API_KEY")
-        
-        # Priority 2: Bing Search API (DEPRECATED - kept for backward compatibility)
-        if self.bing_api_key:
-            print("  → Bing Web Search API...")
-            logger.debug("Bing Web Search API...")
+                    logger.info(f"Bing API found {new} profiles")
+                except Exception as e:
+                    print(f"    ✗ Error: {str(e)[:50]}")
+                    logger.warning(f"Bing API error: {e}", exc_info=True)
+            else:
+                print("  ⊘ Bing API deprecated (use Google CSE instead)")
+                logger.debug("Bing API not configured")
+            
+            # Priority 3: GitHub - LOW QUALITY (only if LinkedIn cross-reference exists)
+            print("  → GitHub API (filtering: LinkedIn cross-reference required)...")
+            logger.debug("GitHub API (filtering: LinkedIn cross-reference required)...")
             try:
-                people = self._search_bing_api(company, title, user_profile, job_context)
-                new = self._add_unique(people, seen_urls, all_people)
-                print(f"    ✓ Found {new} profiles")
-                logger.info(f"Bing API found {new} profiles")
+                github_people = github_future.result()
+                # Filter: Only include GitHub results if they have LinkedIn URL
+                # This prevents low-quality GitHub-only results from polluting results
+                filtered_github = [p for p in github_people if p.linkedin_url is not None]
+                new = self._add_unique(filtered_github, seen_urls, all_people)
+                if len(github_people) > len(filtered_github):
+                    print(f"    ✓ Found {len(github_people)} GitHub profiles, {new} with LinkedIn cross-reference included")
+                    logger.info(f"GitHub found {len(github_people)} profiles, {new} with LinkedIn")
+                else:
+                    print(f"    ✓ Found {new} profiles with LinkedIn")
+                    logger.info(f"GitHub found {new} profiles with LinkedIn")
             except Exception as e:
                 print(f"    ✗ Error: {str(e)[:50]}")
-                logger.warning(f"Bing API error: {e}", exc_info=True)
-        else:
-            print("  ⊘ Bing API deprecated (use Google CSE instead)")
-            logger.debug("Bing API not configured")
-        
-        # Priority 3: GitHub - LOW QUALITY (only if LinkedIn cross-reference exists)
-        print("  → GitHub API (filtering: LinkedIn cross-reference required)...")
-        logger.debug("GitHub API (filtering: LinkedIn cross-reference required)...")
-        try:
-            github_people = self._search_github(company, title, job_context)
-            # Filter: Only include GitHub results if they have LinkedIn URL
-            # This prevents low-quality GitHub-only results from polluting results
-            filtered_github = [p for p in github_people if p.linkedin_url is not None]
-            new = self._add_unique(filtered_github, seen_urls, all_people)
-            if len(github_people) > len(filtered_github):
-                print(f"    ✓ Found {len(github_people)} GitHub profiles, {new} with LinkedIn cross-reference included")
-                logger.info(f"GitHub found {len(github_people)} profiles, {new} with LinkedIn")
-            else:
-                print(f"    ✓ Found {new} profiles with LinkedIn")
-                logger.info(f"GitHub found {new} profiles with LinkedIn")
-        except Exception as e:
-            print(f"    ✗ Error: {str(e)[:50]}")
-            logger.warning(f"GitHub API error: {e}", exc_info=True)
+                logger.warning(f"GitHub API error: {e}", exc_info=True)
         
         # Priority 4: Company website - SKIPPED for speed
         # Uncomment if you want to search company websites (adds ~5 seconds)
@@ -141,35 +218,79 @@ class ActuallyWorkingFreeSources:
         return all_people[:max_results]
     
     def _add_unique(self, people: List[Person], seen_urls: set, all_people: List[Person]) -> int:
-        """Add unique people to results"""
+        """
+        Add unique people to results.
+        
+        `seen_urls` holds 8-byte fingerprints (see _fingerprint) rather than
+        the URL/name strings themselves.
+        """
         count = 0
         for person in people:
-            key = person.linkedin_url or person.name
-            if key and key not in seen_urls:
-                seen_urls.add(key)
+            key = self._dedup_key(person)
+            if not key:
+                continue
+            
+            fingerprint = self._fingerprint(key)
+            if fingerprint not in seen_urls:
+                seen_urls.add(fingerprint)
                 all_people.append(person)
                 count += 1
         return count
     
+    @classmethod
+    def _dedup_key(cls, person: Person) -> Optional[str]:
+        """
+        Canonical identity for cross-source dedup.
+        
+        The LinkedIn /in/<slug> is globally unique, so it wins over URL
+        variants (country subdomains, query strings, trailing paths); people
+        without a profile slug fall back to their URL or name.
+        """
+        match = cls._LINKEDIN_SLUG_RE.search(person.linkedin_url or '')
+        if match:
+            return f"li:{match.group(1)}"
+        return person.linkedin_url or person.name
+    
+    @staticmethod
+    def _fingerprint(key: str) -> bytes:
+        """
+        Compact, portable dedup key for a profile URL (or name).
+        
+        First 8 bytes of SHA-256 over the trimmed, lowercased key without a
+        trailing slash - small enough to keep large seen-sets cheap and stable
+        across processes, unlike hash().
+        """
+        normalized = key.strip().lower().rstrip('/')
+        return hashlib.sha256(normalized.encode('utf-8')).digest()[:8]
+    
+    def _generate_linkedin_queries(self, company: str, title: str = None,
+                                   user_profile: Optional[CandidateProfile] = None,
+                                   job_context: Optional[JobContext] = None) -> List[str]:
+        """Optimized LinkedIn query variations shared by the CSE and Bing searches"""
+        return self.query_optimizer.generate_queries(
+            company=company,
+            title=title,
+            job_context=job_context,
+            candidate_profile=user_profile,
+            platform='linkedin'
+        )
+    
     def _search_google_cse(self, company: str, title: str = None,
                           user_profile: Optional[CandidateProfile] = None,
-                          job_context: Optional[JobContext] = None) -> List[Person]:
+                          job_context: Optional[JobContext] = None,
+                          query_variations: Optional[List[str]] = None) -> List[Person]:
         """
         Google Custom Search Engine API with context-aware query building.
         
         Uses resume and job data to build more targeted queries.
+        `query_variations` may be passed in when already generated (search_all).
         """
         people = []
-        url = "https://www.googleapis.com/customsearch/v1"
         
         # Build query variations with the query optimizer
-        query_variations = self.query_optimizer.generate_queries(
-            company=company,
-            title=title,
-            job_context=job_context,
-            candidate_profile=user_profile,
-            platform='linkedin'
-        )[:7]  # Limit to 7 queries
+        if query_variations is None:
+            query_variations = self._generate_linkedin_queries(company, title, user_profile, job_context)
+        query_variations = query_variations[:7]  # Limit to 7 queries
         
         # Fallback if query optimizer returns empty
         if not query_variations:
@@ -182,18 +303,49 @@ class ActuallyWorkingFreeSources:
         logger.info(f"Google CSE: Executing {len(query_variations)} query variations")
         print(f"    Executing {len(query_variations)} search queries...")
         
-        # Fix: Define company_lower for use in regex patterns
         company_lower = company.lower()
+        total = len(query_variations)
+        
+        # The executor's queue is shared by all workers: each one pulls the next
+        # query as soon as it is free, so a slow response never leaves the
+        # others idle. Results are collected in query order.
+        workers = min(self.CSE_MAX_WORKERS, total)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self._run_google_cse_query,
+                    i, total, query, company, company_lower, job_context
+                )
+                for i, query in enumerate(query_variations, 1)
+            ]
+            for future in futures:
+                people.extend(future.result())
         
-        # Try each query variation until we get good results
-        for i, query in enumerate(query_variations, 1):
-            start_time = time.time()
-            query_success = False
-            results_count = 0
+        logger.info(f"Google CSE total results: {len(people)} people")
+        return people
+    
+    def _run_google_cse_query(self, i: int, total: int, query: str, company: str,
+                              company_lower: str,
+                              job_context: Optional[JobContext] = None) -> List[Person]:
+        """Execute a single Google CSE query and parse its items into people"""
+        people = []
+        url = "https://www.googleapis.com/customsearch/v1"
+        
+        start_time = time.time()
+        query_success = False
+        results_count = 0
+        
+        try:
+            logger.debug(f"Google CSE query {i}/{total}: {query}")
             
-            try:
-                logger.debug(f"Google CSE query {i}/{len(query_variations)}: {query}")
-                
+            # Same query within SERP_CACHE_TTL: reuse the items, skip the API call
+            cache_query = {'cx': self.google_cse_id, 'q': query, 'num': 10, 'start': 1}
+            items = self.cache.get('google_cse', cache_query, ttl=self.SERP_CACHE_TTL)
+            
+            if items is not None:
+                results_count = len(items)
+                logger.debug(f"Google CSE query {i} served from cache ({results_count} results)")
+            else:
                 params = {
                     'key': self.google_api_key,
                     'cx': self.google_cse_id,
@@ -202,127 +354,27 @@ class ActuallyWorkingFreeSources:
                     'start': 1,
                 }
                 
-                response = requests.get(url, params=params, timeout=10)
+                response = self.session.get(url, params=params, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = parse_json(response)
                     items = data.get('items', [])
                     results_count = len(items)
                     
                     logger.info(f"Google CSE query {i} returned {results_count} results")
                     
-                    if results_count == 0:
-                        # Check if there's an error in the response
-                        if 'error' in data:
+                    if 'error' in data:
+                        if results_count == 0:
                             error_msg = data['error'].get('message', 'Unknown error')
                             logger.warning(f"Google CSE API error: {error_msg}")
                             print(f"    ⚠ Query {i} returned error: {error_msg[:60]}")
-                    
-                    for item in items:
-                        item_url = item.get('link', '')
-                        title_text = item.get('title', '')
-                        snippet = item.get('snippet', '')
-                        
-                        # VERY LENIENT: Accept ANY result from Google CSE (trust the search query)
-                        # Only basic sanity checks, no strict filtering
-                        
-                        # Check if it's a LinkedIn URL (for setting linkedin_url field)
-                        linkedin_patterns = [
-                            '/linkedin.com/in/',
-                            'linkedin.com/in/',
-                            'linkedin.com/profile/',
-                            '/linkedin.com/pub/'
-                        ]
-                        is_linkedin = any(pattern in item_url.lower() for pattern in linkedin_patterns) if item_url else False
-                        
-                        combined_text = f"{title_text} {snippet}".lower()
-                        
-                        # Extract name from title (format: "Name - Job Title - LinkedIn" or just "Name")
-                        name = title_text.split(' - ')[0].strip()
-                        # Clean up name (remove LinkedIn, profile, etc.)
-                        name = re.sub(r'\s*-\s*LinkedIn.*$', '', name, flags=re.IGNORECASE)
-                        name = re.sub(r'\s*LinkedIn.*$', '', name, flags=re.IGNORECASE)
-                        name = re.sub(r'\s*Profile.*$', '', name, flags=re.IGNORECASE)
-                        name = name.strip()
-                        
-                        # Skip if name is too short or clearly invalid
-                        if len(name) < 2:
-                            continue
-                        
-                        # More lenient verification - accept almost everything
-                        company_domain = job_context.company_domain if job_context else None
-                        
-                        # Check if company appears in text (very lenient)
-                        company_mentioned = False
-                        if company_lower in combined_text:
-                            company_mentioned = True
-                        elif company_domain:
-                            domain_clean = company_domain.replace('.com', '').replace('www.', '').replace('.io', '').replace('.ai', '')
-                            if domain_clean.lower() in combined_text:
-                                company_mentioned = True
-                        
-                        # Confidence boost based on company mention
-                        if company_mentioned:
-                            confidence_boost = 0.2  # Company mentioned - good
-                        else:
-                            confidence_boost = 0.0  # Not mentioned but still accept
-                        
-                        # Try to extract title from snippet or title
-                        job_title = None
-                        if ' - ' in title_text:
-                            parts = title_text.split(' - ')
-                            if len(parts) >= 2:
-                                job_title = parts[1].strip()
-                                # Clean up title
-                                job_title = re.sub(r'\s*at\s+.*$', '', job_title, flags=re.IGNORECASE)
-                                job_title = job_title.strip()
-                        
-                        # If no title from title field, try to extract from snippet
-                        if not job_title and snippet:
-                            # Look for job title patterns in snippet
-                            title_patterns = [
-                                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:at|@|•|\|)\s+',
-                                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:Engineer|Developer|Manager|Director|Lead|Architect)',
-                                r'(?:Title|Role):\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-                            ]
-                            for pattern in title_patterns:
-                                match = re.search(pattern, snippet, re.IGNORECASE)
-                                if match:
-                                    potential_title = match.group(1).strip()
-                                    if len(potential_title) > 2 and len(potential_title) < 60:
-                                        job_title = potential_title
-                                        break
-                            
-                        # Extract company from snippet if mentioned, otherwise use search company
-                        extracted_company = company  # Default to search company
-                        
-                        # Very lenient name validation - accept almost any name-like string
-                        if len(name) >= 2:
-                            # Calculate confidence - more lenient base
-                            base_confidence = 0.6  # Lower base confidence but accept more
-                            final_confidence = min(0.95, base_confidence + confidence_boost)
-                            
-                            # Set LinkedIn URL if available
-                            linkedin_url = item_url if is_linkedin else None
-                            
-                            # Create person - accept all results from Google CSE
-                            person = Person(
-                                name=name,
-                                title=job_title,
-                                company=extracted_company,
-                                linkedin_url=linkedin_url,
-                                source='google_cse',
-                                confidence_score=final_confidence
-                            )
-                            people.append(person)
-                            logger.debug(f"Added {name} - {job_title or 'No title'} at {extracted_company} (confidence: {final_confidence:.2f}, LinkedIn: {linkedin_url is not None})")
-                    
-                    query_success = True
+                    else:
+                        self.cache.set('google_cse', cache_query, items)
                 else:
                     # Log API errors
                     error_msg = f"HTTP {response.status_code}"
                     try:
-                        error_data = response.json()
+                        error_data = parse_json(response)
                         if 'error' in error_data:
                             error_msg = error_data['error'].get('message', error_msg)
                     except:
@@ -330,30 +382,108 @@ class ActuallyWorkingFreeSources:
                     
                     logger.error(f"Google CSE API error for query {i}: {error_msg}")
                     print(f"    ✗ Query {i} failed: {error_msg[:60]}")
-                        
-            except requests.exceptions.Timeout:
-                logger.warning(f"Google CSE query {i} timed out")
-                print(f"    ⚠ Query {i} timed out")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Google CSE request error for query {i}: {e}")
-                print(f"    ✗ Query {i} request error: {str(e)[:60]}")
-            except Exception as e:
-                logger.error(f"Google CSE unexpected error for query {i}: {e}", exc_info=True)
-                print(f"    ✗ Query {i} error: {str(e)[:60]}")
-            finally:
-                # Track query performance
-                execution_time_ms = (time.time() - start_time) * 1000
-                track_query(
-                    query=query,
-                    results_count=results_count,
-                    execution_time_ms=execution_time_ms,
-                    source='google_cse',
-                    success=query_success
-                )
+            
+            if items is not None:
+                # Company-domain fallback for the mention check, resolved once per query
+                domain_clean = None
+                if job_context and job_context.company_domain:
+                    domain_clean = job_context.company_domain.replace('.com', '').replace('www.', '').replace('.io', '').replace('.ai', '').lower()
+                
+                for item in items:
+                    person = self._parse_google_cse_item(item, company, company_lower, domain_clean)
+                    if person:
+                        people.append(person)
+                        logger.debug(f"Added {person.name} - {person.title or 'No title'} at {person.company} (confidence: {person.confidence_score:.2f}, LinkedIn: {person.linkedin_url is not None})")
+                
+                query_success = True
+                    
+        except requests.exceptions.Timeout:
+            logger.warning(f"Google CSE query {i} timed out")
+            print(f"    ⚠ Query {i} timed out")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Google CSE request error for query {i}: {e}")
+            print(f"    ✗ Query {i} request error: {str(e)[:60]}")
+        except Exception as e:
+            logger.error(f"Google CSE unexpected error for query {i}: {e}", exc_info=True)
+            print(f"    ✗ Query {i} error: {str(e)[:60]}")
+        finally:
+            # Track query performance
+            execution_time_ms = (time.time() - start_time) * 1000
+            track_query(
+                query=query,
+                results_count=results_count,
+                execution_time_ms=execution_time_ms,
+                source='google_cse',
+                success=query_success
+            )
         
-        logger.info(f"Google CSE total results: {len(people)} people")
         return people
     
+    def _parse_google_cse_item(self, item: dict, company: str, company_lower: str,
+                               domain_clean: Optional[str] = None) -> Optional[Person]:
+        """
+        Turn one Google CSE result item into a Person.
+        
+        VERY LENIENT: accepts any result with a usable name (trust the search
+        query); only basic sanity checks, no strict filtering.
+        """
+        item_url = item.get('link', '')
+        title_text = item.get('title', '')
+        snippet = item.get('snippet', '')
+        
+        # Check if it's a LinkedIn URL (for setting linkedin_url field)
+        is_linkedin = bool(item_url) and self._LINKEDIN_PROFILE_URL_RE.search(item_url.lower()) is not None
+        
+        # Title format: "Name - Job Title - LinkedIn" or just "Name"
+        title_parts = title_text.split(' - ')
+        
+        # Extract name, then clean up (remove LinkedIn, profile, etc.)
+        name = title_parts[0].strip()
+        for pattern in self._NAME_NOISE_RES:
+            name = pattern.sub('', name)
+        name = name.strip()
+        
+        # Skip if name is too short or clearly invalid
+        if len(name) < 2:
+            return None
+        
+        # Check if company appears in text (very lenient)
+        combined_text = f"{title_text} {snippet}".lower()
+        company_mentioned = company_lower in combined_text or (
+            bool(domain_clean) and domain_clean in combined_text
+        )
+        
+        # Confidence boost based on company mention (not mentioned but still accept)
+        confidence_boost = 0.2 if company_mentioned else 0.0
+        
+        # Try to extract title from the title field
+        job_title = None
+        if len(title_parts) >= 2:
+            job_title = self._AT_COMPANY_SUFFIX_RE.sub('', title_parts[1].strip()).strip()
+        
+        # If no title from title field, try to extract from snippet
+        if not job_title and snippet:
+            for pattern in self._SNIPPET_TITLE_RES:
+                match = pattern.search(snippet)
+                if match:
+                    potential_title = match.group(1).strip()
+                    if len(potential_title) > 2 and len(potential_title) < 60:
+                        job_title = potential_title
+                        break
+        
+        # More lenient base confidence but accept more
+        final_confidence = min(0.95, 0.6 + confidence_boost)
+        
+        # Create person - accept all results from Google CSE
+        return Person(
+            name=name,
+            title=job_title,
+            company=company,
+            linkedin_url=item_url if is_linkedin else None,
+            source='google_cse',
+            confidence_score=final_confidence
+        )
+    
     def _build_google_query_variations(self, company: str, title: str = None,
                                      user_profile: Optional[CandidateProfile] = None,
                                      job_context: Optional[JobContext] = None) -> List[str]:
@@ -452,22 +582,19 @@ class ActuallyWorkingFreeSources:
     
     def _search_bing_api(self, company: str, title: str = None,
                         user_profile: Optional[CandidateProfile] = None,
-                        job_context: Optional[JobContext] = None) -> List[Person]:
+                        job_context: Optional[JobContext] = None,
+                        query_variations: Optional[List[str]] = None) -> List[Person]:
         """
         Bing Web Search API with improved query construction.
         
         Removes strict quotes for better recall.
+        `query_variations` may be passed in when already generated (search_all).
         """
         people = []
         
         # Use query optimizer for Bing queries too
-        query_variations = self.query_optimizer.generate_queries(
-            company=company,
-            title=title,
-            job_context=job_context,
-            candidate_profile=user_profile,
-            platform='linkedin'
-        )
+        if query_variations is None:
+            query_variations = self._generate_linkedin_queries(company, title, user_profile, job_context)
         
         # Use the first optimized query for Bing
         query = query_variations[0] if query_variations else f'site:linkedin.com/in/ {company} {title or ""}'
@@ -483,23 +610,22 @@ class ActuallyWorkingFreeSources:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=5)
+            response = self.session.get(url, headers=headers, params=params, timeout=5)
             
             if response.status_code == 200:
-                data = response.json()
+                data = parse_json(response)
                 
                 for result in data.get('webPages', {}).get('value', []):
                     item_url = result.get('url', '')
                     title_text = result.get('name', '')
                     
                     if 'linkedin.com/in/' in item_url:
-                        name = title_text.split(' - ')[0].strip()
+                        parts = title_text.split(' - ')
+                        name = parts[0].strip()
                         
                         job_title = None
-                        if ' - ' in title_text:
-                            parts = title_text.split(' - ')
-                            if len(parts) >= 2:
-                                job_title = parts[1].strip()
+                        if len(parts) >= 2:
+                            job_title = parts[1].strip()
                         
                         if len(name) > 2:
                             person = Person(
@@ -586,12 +712,22 @@ class ActuallyWorkingFreeSources:
         
         # Try queries in order until we get results
         for query in queries:
+            # With a token, one GraphQL call returns name/bio/website for every
+            # user in the page - no per-user detail requests needed
+            if self.github_token:
+                graphql_people = self._search_github_graphql(query, company)
+                if graphql_people is not None:
+                    if graphql_people:
+                        people.extend(graphql_people)
+                        break
+                    continue
+            
             try:
                 params = {**params_base, 'q': query}
-                response = requests.get(url, headers=headers, params=params, timeout=5)
+                response = self.session.get(url, headers=headers, params=params, timeout=5)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = parse_json(response)
                     total_count = data.get('total_count', 0)
                     items = data.get('items', [])
                     
@@ -641,7 +777,7 @@ class ActuallyWorkingFreeSources:
         #     org_name = company.lower().replace(' ', '').replace(',', '').replace('.', '')
         #     org_url = f"https://api.github.com/orgs/{org_name}/members"
         #     
-        #     response = requests.get(org_url, headers=headers, params={'per_page': 10}, timeout=3)
+        #     response = self.session.get(org_url, headers=headers, params={'per_page': 10}, timeout=3)
         #     
         #     if response.status_code == 200:
         #         members = response.json()
@@ -667,6 +803,69 @@ class ActuallyWorkingFreeSources:
         
         return people
     
+    GITHUB_USER_SEARCH_QUERY = """
+    query($q: String!, $first: Int!) {
+      search(query: $q, type: USER, first: $first) {
+        userCount
+        nodes {
+          ... on User { login name bio company websiteUrl url }
+        }
+      }
+    }
+    """
+    
+    def _search_github_graphql(self, query: str, company: str) -> Optional[List[Person]]:
+        """
+        Search GitHub users via GraphQL (requires GITHUB_TOKEN).
+        
+        Returns people for the query, or None if the GraphQL call failed so the
+        caller can fall back to the REST search.
+        """
+        try:
+            response = self.session.post(
+                "https://api.github.com/graphql",
+                json={'query': self.GITHUB_USER_SEARCH_QUERY, 'variables': {'q': query, 'first': 20}},
+                headers={'Authorization': f'bearer {self.github_token}'},
+                timeout=5
+            )
+            if response.status_code != 200:
+                logger.debug(f"GitHub GraphQL returned HTTP {response.status_code}")
+                return None
+            
+            data = parse_json(response)
+            if data.get('errors'):
+                logger.debug(f"GitHub GraphQL errors: {data['errors']}")
+                return None
+            
+            search = data.get('data', {}).get('search', {})
+            users = [node for node in search.get('nodes', []) if node and node.get('login')]
+        except Exception as e:
+            logger.debug(f"GitHub GraphQL error: {e}")
+            return None
+        
+        if users:
+            print(f"    Found {search.get('userCount', 0)} GitHub users (returning {len(users)})")
+            logger.info(f"GitHub GraphQL search found {search.get('userCount', 0)} users (returning {len(users)})")
+        
+        people = []
+        for user in users:
+            login = user['login']
+            profile_url = user.get('url') or f"https://github.com/{login}"
+            website = user.get('websiteUrl') or ''
+            
+            people.append(Person(
+                name=user.get('name') or login.replace('-', ' ').replace('_', ' ').title(),
+                title=user.get('bio') or None,
+                company=company,
+                linkedin_url=website if 'linkedin.com/in/' in website.lower() else None,
+                source='github',
+                confidence_score=0.5,  # Lower since we don't verify bio
+                github_url=profile_url,
+                evidence_url=profile_url,
+            ))
+        
+        return people
+    
     def _search_company_website(self, company: str) -> List[Person]:
         """
         Search company website for team/about pages.
@@ -690,7 +889,7 @@ class ActuallyWorkingFreeSources:
         
         for url in patterns:
             try:
-                response = requests.get(url, timeout=5, headers={
+                response = self.session.get(url, timeout=5, headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 })
                 
@@ -145,13 +145,10 @@ class BaseSearchScraper(ABC):
             logger.debug(f"{self.name}: In backoff period, waiting {wait_time:.1f}s")
             time.sleep(wait_time)
         
-        # Rate limiting
+        # Rate limiting (per-source token bucket; only waits when this
+        # scraper's own budget is spent, never for other sources)
         self.rate_limiter.wait_if_needed(self.name)
         
-        # Add random delay
-        delay = random.uniform(1.5, 4.0)
-        time.sleep(delay)
-        
         # Get headers if not provided
         if 'headers' not in kwargs:
             kwargs['headers'] = self._get_headers()
@@ -1,21 +1,40 @@
 """API key validation and rate limiting service"""
 
 import os
+import hmac
 import time
+import hashlib
 import secrets
+import threading
+import logging
 import bcrypt
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
 from src.db.supabase_client import get_client
 from src.db.models import APIKey, APIKeyContext
+from src.utils.cache import TTLCache, get_cache
+from src.utils.batch_counter import BatchedCounter
+
+logger = logging.getLogger(__name__)
 
 
 class APIKeyService:
     """Service for API key management and validation"""
     
-    # Rate limiting: track requests per key per minute
-    _rate_limit_cache: dict = {}  # {key_id: {count: int, reset_at: float}}
+    # Rate limiting: requests per key per minute window, counted in the disk
+    # cache (see Cache.incr) so every worker process on the host shares them
+    RATE_LIMIT_WINDOW_SECONDS = 60
+    
+    # rate_limit_per_minute per key, so the hot path skips the SELECT
+    _limit_cache = TTLCache(maxsize=10000, ttl_seconds=60)
+    
+    # validate_api_key results keyed by key hash; revocation may lag by the TTL
+    _context_cache = TTLCache(maxsize=50000, ttl_seconds=30)
+    _context_cache_keys = TTLCache(maxsize=50000, ttl_seconds=30)  # {key_id: cache key}
+    # Searches charged since each cached context was loaded: {key_id: count}
+    _usage_since_cached = TTLCache(maxsize=50000, ttl_seconds=30)
+    _usage_since_cached_lock = threading.Lock()
     
     # Tier configurations
     TIER_CONFIGS = {
@@ -37,32 +56,88 @@ class APIKeyService:
         }
     }
     
-    @staticmethod
-    def generate_api_key() -> tuple[str, str]:
+    # Most legacy (bcrypt) rows verified per lookup
+    LEGACY_MAX_CANDIDATES = 3
+    
+    # Keys look like sk_<prefix>_<secret>: the prefix has its own entropy and is
+    # stored/indexed for identification, the secret is 256 random bits
+    KEY_SCHEME = 'sk'
+    
+    @classmethod
+    def generate_api_key(cls) -> tuple[str, str]:
         """
         Generate a new API key.
         
         Returns:
             (full_key, key_prefix) - Full key should be shown once, prefix for identification
         """
-        # Generate 32-byte random key, encode as hex (64 chars)
-        full_key = secrets.token_urlsafe(32)
-        key_prefix = full_key[:8]  # First 8 chars for identification
+        key_prefix = secrets.token_hex(4)  # 8 hex chars, never contains '_'
+        secret = secrets.token_urlsafe(32)
+        full_key = f"{cls.KEY_SCHEME}_{key_prefix}_{secret}"
         return full_key, key_prefix
     
+    @classmethod
+    def key_prefix_of(cls, key: str) -> str:
+        """Stored key_prefix for a key (legacy keys: first 8 chars)"""
+        scheme, sep, rest = key.partition('_')
+        if scheme == cls.KEY_SCHEME and sep:
+            prefix, sep, _ = rest.partition('_')
+            if sep and prefix:
+                return prefix
+        return key[:8]
+    
     @staticmethod
-    def hash_api_key(key: str) -> str:
-        """Hash an API key using bcrypt"""
-        return bcrypt.hashpw(key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    def _get_pepper() -> Optional[bytes]:
+        """Server-side secret for keyed API key hashes (API_KEY_PEPPER, or API_KEY_SECRET)"""
+        pepper = os.getenv('API_KEY_PEPPER') or os.getenv('API_KEY_SECRET')
+        return pepper.encode('utf-8') if pepper else None
     
     @staticmethod
-    def verify_api_key(key: str, key_hash: str) -> bool:
-        """Verify an API key against its hash"""
+    def is_legacy_hash(key_hash: str) -> bool:
+        """True for bcrypt hashes from before keyed hashing"""
+        return key_hash.startswith('$2')
+    
+    @classmethod
+    def hash_api_key(cls, key: str) -> str:
+        """
+        Hash an API key.
+        
+        Keys are 256-bit random tokens, so a keyed HMAC-SHA256 is as strong as
+        bcrypt here while verifying in microseconds instead of ~100 ms. Falls
+        back to bcrypt when no pepper is configured.
+        """
+        pepper = cls._get_pepper()
+        if pepper is None:
+            return bcrypt.hashpw(key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return hmac.new(pepper, key.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    @classmethod
+    def verify_api_key(cls, key: str, key_hash: str) -> bool:
+        """Verify an API key against its hash (HMAC-SHA256 or legacy bcrypt)"""
         try:
-            return bcrypt.checkpw(key.encode('utf-8'), key_hash.encode('utf-8'))
+            if cls.is_legacy_hash(key_hash):
+                return bcrypt.checkpw(key.encode('utf-8'), key_hash.encode('utf-8'))
+            
+            pepper = cls._get_pepper()
+            if pepper is None:
+                return False
+            expected = hmac.new(pepper, key.encode('utf-8'), hashlib.sha256).hexdigest()
+            return hmac.compare_digest(expected, key_hash)
         except Exception:
             return False
     
+    @classmethod
+    def _upgrade_legacy_hash(cls, client, key_id: UUID, key: str):
+        """Rewrite a verified bcrypt hash as HMAC-SHA256 (lazy migration)"""
+        if cls._get_pepper() is None:
+            return
+        try:
+            client.table('api_keys').update({
+                'key_hash': cls.hash_api_key(key)
+            }).eq('id', str(key_id)).execute()
+        except Exception as e:
+            logger.error(f"Error upgrading API key hash: {e}")
+    
     @classmethod
     def validate_api_key(cls, key: str) -> Optional[APIKeyContext]:
         """
@@ -77,118 +152,254 @@ class APIKeyService:
         if not key:
             return None
         
-        # Extract prefix (first 8 chars) for lookup
-        key_prefix = key[:8]
+        cache_key = cls._context_cache_key(key)
+        context = cls._context_cache.get(cache_key)
+        if context is not None:
+            charged = cls._usage_since_cached.get(context.key_id, 0)
+            if not charged:
+                return context
+            used = context.searches_used_this_month + charged
+            return context.model_copy(update={
+                'searches_used_this_month': used,
+                'searches_remaining': cls._searches_remaining(context.searches_per_month, used)
+            })
         
         client = get_client()
         
         try:
-            # Find key by prefix
-            result = client.table('api_keys').select('*').eq('key_prefix', key_prefix).eq('is_active', True).execute()
+            key_record = cls._find_key_record(client, key)
+            if key_record is None:
+                return None
             
-            if not result.data:
+            api_key = APIKey(**key_record)
+            
+            # Check if expired
+            if api_key.expires_at and datetime.utcnow() > api_key.expires_at.replace(tzinfo=None):
                 return None
             
-            # Multiple keys could have same prefix (unlikely), check all
-            for key_record in result.data:
-                key_hash = key_record['key_hash']
-                
-                # Verify the actual key matches
-                if cls.verify_api_key(key, key_hash):
-                    api_key = APIKey(**key_record)
-                    
-                    # Check if expired
-                    if api_key.expires_at and datetime.utcnow() > api_key.expires_at.replace(tzinfo=None):
-                        return None
-                    
-                    # Calculate remaining searches
-                    searches_remaining = api_key.searches_per_month - api_key.searches_used_this_month
-                    if api_key.searches_per_month > 0:  # -1 means unlimited
-                        searches_remaining = max(0, searches_remaining)
-                    else:
-                        searches_remaining = -1  # Unlimited
-                    
-                    return APIKeyContext(
-                        key_id=api_key.id,
-                        user_id=api_key.user_id,
-                        tier=api_key.tier,
-                        searches_per_month=api_key.searches_per_month,
-                        searches_used_this_month=api_key.searches_used_this_month,
-                        searches_remaining=searches_remaining,
-                        rate_limit_per_minute=api_key.rate_limit_per_minute,
-                        is_active=api_key.is_active
-                    )
+            # Calculate remaining searches
+            searches_remaining = cls._searches_remaining(
+                api_key.searches_per_month, api_key.searches_used_this_month
+            )
             
-            return None
+            cls._limit_cache.set(api_key.id, api_key.rate_limit_per_minute)
+            
+            context = APIKeyContext(
+                key_id=api_key.id,
+                user_id=api_key.user_id,
+                tier=api_key.tier,
+                searches_per_month=api_key.searches_per_month,
+                searches_used_this_month=api_key.searches_used_this_month,
+                searches_remaining=searches_remaining,
+                rate_limit_per_minute=api_key.rate_limit_per_minute,
+                is_active=api_key.is_active
+            )
+            
+            with cls._usage_since_cached_lock:
+                cls._usage_since_cached.pop(api_key.id)
+                cls._context_cache.set(cache_key, context)
+                cls._context_cache_keys.set(api_key.id, cache_key)
+            
+            return context
             
         except Exception as e:
-            print(f"Error validating API key: {e}")
+            logger.error(f"Error validating API key: {e}")
             return None
     
     @classmethod
-    def check_rate_limit(cls, key_id: UUID) -> tuple[bool, Optional[dict]]:
+    def _context_cache_key(cls, key: str) -> str:
+        """Cache key for a raw API key (never cache on the key itself)"""
+        if cls._get_pepper() is not None:
+            return cls.hash_api_key(key)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def invalidate(cls, key_id: UUID):
+        """Drop cached state for a key (call after revoking or changing it)"""
+        cache_key = cls._context_cache_keys.pop(key_id)
+        if cache_key is not None:
+            cls._context_cache.pop(cache_key)
+        cls._limit_cache.pop(key_id)
+        cls._usage_since_cached.pop(key_id)
+    
+    @classmethod
+    def _find_key_record(cls, client, key: str) -> Optional[dict]:
         """
-        Check if API key is within rate limit.
+        Find the active api_keys row for a key.
+        
+        Keyed hashes are deterministic, so this is a single equality lookup on
+        the unique key_hash index. Rows still holding a legacy bcrypt hash are
+        found by prefix and verified (then upgraded).
+        """
+        if cls._get_pepper() is not None:
+            result = client.table('api_keys').select('*').eq('key_hash', cls.hash_api_key(key)).eq('is_active', True).execute()
+            if result.data:
+                return result.data[0]
+        
+        # Legacy bcrypt rows: find by prefix, then verify. Candidates are capped
+        # so colliding prefixes can't multiply the bcrypt cost of one request.
+        result = (
+            client.table('api_keys').select('*')
+            .eq('key_prefix', cls.key_prefix_of(key))
+            .eq('is_active', True)
+            .like('key_hash', '$2%')
+            .order('last_used_at', desc=True, nullsfirst=False)
+            .limit(cls.LEGACY_MAX_CANDIDATES)
+            .execute()
+        )
+        
+        for key_record in result.data or []:
+            key_hash = key_record['key_hash']
+            if cls.is_legacy_hash(key_hash) and cls.verify_api_key(key, key_hash):
+                cls._upgrade_legacy_hash(client, key_record['id'], key)
+                return key_record
+        
+        return None
+    
+    @classmethod
+    def authorize_and_charge(cls, key: str) -> tuple[Optional[APIKeyContext], Optional[dict]]:
+        """
+        Validate an API key, enforce rate limit and quota, and charge one search.
+        
+        Uses the authorize_and_charge RPC (one round-trip, see
+        migrations_api_keys.sql); falls back to validate_api_key ->
+        check_rate_limit -> check_quota -> increment_usage when the RPC is not
+        installed or the key still has a legacy bcrypt hash.
         
         Args:
-            key_id: The API key ID
+            key: The API key from the request
             
         Returns:
-            (is_allowed, error_details) - error_details if not allowed
+            (context, error_details) - context (usage already charged) if allowed,
+            otherwise None and the reason
         """
-        now = time.time()
+        if not key:
+            return None, {'message': 'Invalid API key'}
         
-        # Get key record to check tier limits
-        client = get_client()
-        try:
-            result = client.table('api_keys').select('rate_limit_per_minute').eq('id', str(key_id)).execute()
-            if not result.data:
-                return False, {'message': 'API key not found'}
-            
-            rate_limit = result.data[0]['rate_limit_per_minute']
-        except Exception as e:
-            return False, {'message': f'Database error: {str(e)}'}
+        if cls._get_pepper() is not None:
+            try:
+                result = get_client().rpc('authorize_and_charge', {
+                    'p_key_hash': cls.hash_api_key(key)
+                }).execute()
+                if result.data:
+                    return cls._authorization_result(result.data[0])
+            except Exception as e:
+                logger.warning(f"authorize_and_charge RPC not available, using fallback: {e}")
         
-        # Check in-memory cache
-        if key_id in cls._rate_limit_cache:
-            cache_entry = cls._rate_limit_cache[key_id]
-            
-            # Reset if minute has passed
-            if now >= cache_entry['reset_at']:
-                cache_entry['count'] = 0
-                cache_entry['reset_at'] = now + 60  # Reset in 60 seconds
-            
-            # Check if limit exceeded
-            if cache_entry['count'] >= rate_limit:
-                reset_in = int(cache_entry['reset_at'] - now)
-                return False, {
-                    'message': f'Rate limit exceeded. Try again in {reset_in} seconds.',
-                    'reset_in_seconds': reset_in,
-                    'limit': rate_limit
-                }
+        context = cls.validate_api_key(key)
+        if context is None:
+            return None, {'message': 'Invalid API key'}
+        
+        is_allowed, error = cls.check_rate_limit(context.key_id, context)
+        if not is_allowed:
+            return None, error
+        
+        has_quota, error = cls.check_quota(context.key_id, context)
+        if not has_quota:
+            return None, error
+        
+        cls.increment_usage(context.key_id)
+        used = context.searches_used_this_month + 1
+        return context.model_copy(update={
+            'searches_used_this_month': used,
+            'searches_remaining': cls._searches_remaining(context.searches_per_month, used)
+        }), None
+    
+    @classmethod
+    def _authorization_result(cls, row: dict) -> tuple[Optional[APIKeyContext], Optional[dict]]:
+        """Map an authorize_and_charge row to (context, error_details)"""
+        searches_per_month = row['searches_per_month']
+        searches_used = row['searches_used_this_month']
+        
+        if row['reason'] == 'rate_limit':
+            reset_in = row['reset_in_seconds']
+            return None, {
+                'message': f'Rate limit exceeded. Try again in {reset_in} seconds.',
+                'reset_in_seconds': reset_in,
+                'limit': row['rate_limit_per_minute']
+            }
+        if not row['allowed']:
+            return None, cls._quota_result(searches_per_month, searches_used)[1]
+        
+        return APIKeyContext(
+            key_id=row['key_id'],
+            user_id=row['user_id'],
+            tier=row['tier'],
+            searches_per_month=searches_per_month,
+            searches_used_this_month=searches_used,
+            searches_remaining=cls._searches_remaining(searches_per_month, searches_used),
+            rate_limit_per_minute=row['rate_limit_per_minute'],
+            is_active=True
+        ), None
+    
+    @staticmethod
+    def _searches_remaining(searches_per_month: int, searches_used: int) -> int:
+        """Remaining searches, -1 for unlimited"""
+        if searches_per_month > 0:  # -1 means unlimited
+            return max(0, searches_per_month - searches_used)
+        return -1
+    
+    @classmethod
+    def check_rate_limit(cls, key_id: UUID,
+                         context: Optional[APIKeyContext] = None) -> tuple[bool, Optional[dict]]:
+        """
+        Check if API key is within rate limit.
+        
+        Args:
+            key_id: The API key ID
+            context: Context from validate_api_key; its limit is used instead of a lookup
             
-            # Increment counter
-            cache_entry['count'] += 1
+        Returns:
+            (is_allowed, error_details) - error_details if not allowed
+        """
+        if context is not None:
+            rate_limit = context.rate_limit_per_minute
         else:
-            # Initialize cache entry
-            cls._rate_limit_cache[key_id] = {
-                'count': 1,
-                'reset_at': now + 60
+            rate_limit = cls._limit_cache.get(key_id)
+        if rate_limit is None:
+            # Get key record to check tier limits
+            client = get_client()
+            try:
+                result = client.table('api_keys').select('rate_limit_per_minute').eq('id', str(key_id)).execute()
+                if not result.data:
+                    return False, {'message': 'API key not found'}
+                
+                rate_limit = result.data[0]['rate_limit_per_minute']
+            except Exception as e:
+                return False, {'message': f'Database error: {str(e)}'}
+            cls._limit_cache.set(key_id, rate_limit)
+        
+        # Count this request in the key's host-wide counter for the window
+        now = time.time()
+        window = int(now // cls.RATE_LIMIT_WINDOW_SECONDS)
+        count = get_cache().incr(f"api_rate_limit:{key_id}:{window}",
+                                 expire_seconds=2 * cls.RATE_LIMIT_WINDOW_SECONDS)
+        if count > rate_limit:
+            reset_in = int((window + 1) * cls.RATE_LIMIT_WINDOW_SECONDS - now)
+            return False, {
+                'message': f'Rate limit exceeded. Try again in {reset_in} seconds.',
+                'reset_in_seconds': max(1, reset_in),
+                'limit': rate_limit
             }
         
         return True, None
     
     @classmethod
-    def check_quota(cls, key_id: UUID) -> tuple[bool, Optional[dict]]:
+    def check_quota(cls, key_id: UUID,
+                    context: Optional[APIKeyContext] = None) -> tuple[bool, Optional[dict]]:
         """
         Check if API key has remaining quota.
         
         Args:
             key_id: The API key ID
+            context: Context from validate_api_key; its usage is used instead of a lookup
             
         Returns:
             (has_quota, error_details) - error_details if no quota
         """
+        if context is not None:
+            return cls._quota_result(context.searches_per_month, context.searches_used_this_month)
+        
         client = get_client()
         
         try:
@@ -197,49 +408,87 @@ class APIKeyService:
             if not result.data:
                 return False, {'message': 'API key not found'}
             
-            searches_per_month = result.data[0]['searches_per_month']
-            searches_used = result.data[0]['searches_used_this_month']
-            
-            # -1 means unlimited
-            if searches_per_month == -1:
-                return True, None
-            
-            if searches_used >= searches_per_month:
-                return False, {
-                    'message': f'Monthly quota exceeded. {searches_used}/{searches_per_month} searches used.',
-                    'searches_used': searches_used,
-                    'searches_per_month': searches_per_month
-                }
-            
-            return True, None
+            return cls._quota_result(
+                result.data[0]['searches_per_month'],
+                result.data[0]['searches_used_this_month']
+            )
             
         except Exception as e:
             return False, {'message': f'Database error: {str(e)}'}
     
+    @staticmethod
+    def _quota_result(searches_per_month: int, searches_used: int) -> tuple[bool, Optional[dict]]:
+        """Quota decision shared by the context and lookup paths"""
+        # -1 means unlimited
+        if searches_per_month == -1:
+            return True, None
+        
+        if searches_used >= searches_per_month:
+            return False, {
+                'message': f'Monthly quota exceeded. {searches_used}/{searches_per_month} searches used.',
+                'searches_used': searches_used,
+                'searches_per_month': searches_per_month
+            }
+        
+        return True, None
+    
     @classmethod
     def increment_usage(cls, key_id: UUID):
-        """Increment search usage for an API key"""
+        """
+        Increment search usage for an API key.
+        
+        Queued in memory and written in batches by a background flusher
+        (see _flush_usage), so the request path does no DB I/O.
+        """
+        _usage_counter.add(key_id)
+        
+        # Keep a cached validate_api_key context's usage current
+        with cls._usage_since_cached_lock:
+            if cls._context_cache_keys.get(key_id) is not None:
+                cls._usage_since_cached.set(key_id, cls._usage_since_cached.get(key_id, 0) + 1)
+    
+    @classmethod
+    def _flush_usage(cls, counts: dict):
+        """Persist a batch of {key_id: count} usage increments"""
         client = get_client()
         
         try:
-            # Increment searches_used_this_month and update last_used_at
-            client.table('api_keys').update({
-                'searches_used_this_month': client.rpc('increment', {'key': 'searches_used_this_month'}),
-                'last_used_at': datetime.utcnow().isoformat()
-            }).eq('id', str(key_id)).execute()
+            # One statement for the whole batch (see migrations_api_keys.sql)
+            client.rpc('batch_increment_api_key_usage', {
+                'p_ids': [str(key_id) for key_id in counts],
+                'p_counts': list(counts.values())
+            }).execute()
+            return
+        except Exception as rpc_error:
+            logger.warning(f"batch_increment_api_key_usage RPC not available, using fallback: {rpc_error}")
+        
+        for key_id, count in counts.items():
+            cls._increment_usage_now(client, key_id, count)
+    
+    @staticmethod
+    def _increment_usage_now(client, key_id: UUID, count: int = 1):
+        """Apply one key's usage increment directly"""
+        try:
+            # Atomic increment of searches_used_this_month + last_used_at
+            # (see migrations_api_keys.sql)
+            if count == 1:
+                try:
+                    client.rpc('increment_api_key_usage', {'p_key': str(key_id)}).execute()
+                    return
+                except Exception as rpc_error:
+                    logger.warning(f"increment_api_key_usage RPC not available, using fallback: {rpc_error}")
             
-            # Alternative: use SQL increment
-            # For Supabase, we need to use RPC or select + update
+            # Fallback: select + update
             result = client.table('api_keys').select('searches_used_this_month').eq('id', str(key_id)).execute()
             if result.data:
                 current = result.data[0]['searches_used_this_month']
                 client.table('api_keys').update({
-                    'searches_used_this_month': current + 1,
+                    'searches_used_this_month': current + count,
                     'last_used_at': datetime.utcnow().isoformat()
                 }).eq('id', str(key_id)).execute()
                 
         except Exception as e:
-            print(f"Error incrementing API key usage: {e}")
+            logger.error(f"Error incrementing API key usage: {e}")
     
     @classmethod
     def get_remaining_quota(cls, key_id: UUID) -> dict:
@@ -275,6 +524,15 @@ class APIKeyService:
             return {'error': f'Database error: {str(e)}'}
 
 
+# Background batching of increment_usage writes
+_usage_counter = BatchedCounter(
+    lambda counts: APIKeyService._flush_usage(counts),
+    flush_interval=1.0,
+    max_pending=500,
+    name="api-key-usage"
+)
+
+
 def create_api_key_for_user(user_id: UUID, tier: str = 'free') -> tuple[str, dict]:
     """
     Create a new API key for a user.
@@ -1,18 +1,54 @@
 """Service for storing and retrieving people discoveries"""
 
+import os
+import json
 import logging
-from typing import List, Optional, Dict, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Iterator
 from uuid import UUID
+from pydantic import TypeAdapter, ValidationError
 from src.models.person import Person
 from src.db.supabase_client import get_client
 from src.db.models import PersonDiscovery, person_to_discovery
+from src.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Columns present in every people_discoveries schema version; used to retry
+# inserts that failed on optional columns
+_SAFE_COLUMNS = frozenset((
+    'job_id', 'user_id', 'person_type', 'full_name', 'title', 'email',
+    'linkedin_url', 'confidence_score', 'connection_path', 'contacted'
+))
+
+# Columns shipped as arrays to the insert_people_discoveries RPC
+# (see migrations_discoveries.sql), in its parameter order
+_BULK_INSERT_COLUMNS = (
+    'job_id', 'user_id', 'person_type', 'full_name', 'title', 'email',
+    'linkedin_url', 'confidence_score', 'connection_path', 'contacted',
+    'company', 'department', 'location', 'source', 'relevance_score',
+    'match_reasons'
+)
+
+# Validates a whole result set in one pydantic-core call
+_DISCOVERY_LIST_ADAPTER = TypeAdapter(List[PersonDiscovery])
+
+# get_discovery_by_id results keyed by discovery id
+_discovery_by_id_cache = TTLCache(maxsize=8192, ttl_seconds=30)
+
 
 class DiscoveryService:
     """Service for managing people discoveries"""
     
+    # Rows per insert request (PostgREST has no 100-row limit; oversized
+    # payloads are split on 413), and insert requests in flight at once
+    INSERT_BATCH_SIZE = max(1, int(os.getenv('DISCOVERY_BATCH_SIZE', '500')))
+    MAX_INSERT_WORKERS = 8
+    
+    # Cleared once the database reports insert_people_discoveries is missing
+    _bulk_rpc_available = True
+    
     @staticmethod
     def save_discoveries(
         job_id: Optional[UUID],
@@ -40,6 +76,10 @@ class DiscoveryService:
             return []
         
         discoveries_to_insert = []
+        seen = set()
+        duplicates = 0
+        relevance_scores = relevance_scores or {}
+        match_reasons = match_reasons or {}
         
         for person in people:
             try:
@@ -48,15 +88,9 @@ class DiscoveryService:
                     logger.warning(f"Skipping person with no name: {person}")
                     continue
                 
-                # Calculate relevance score
-                relevance_score = None
-                if relevance_scores and person.name in relevance_scores:
-                    relevance_score = relevance_scores[person.name]
-                
-                # Get match reasons
-                person_match_reasons = None
-                if match_reasons and person.name in match_reasons:
-                    person_match_reasons = match_reasons[person.name]
+                # Relevance score and match reasons (None when not provided)
+                relevance_score = relevance_scores.get(person.name)
+                person_match_reasons = match_reasons.get(person.name)
                 
                 # Convert Person to PersonDiscovery dict
                 discovery_dict = person_to_discovery(
@@ -67,54 +101,49 @@ class DiscoveryService:
                     match_reasons=person_match_reasons
                 )
                 
+                # Skip people already queued (same person from several sources)
+                key = (
+                    discovery_dict.get('job_id'),
+                    discovery_dict.get('linkedin_url') or discovery_dict.get('email') or discovery_dict.get('full_name')
+                )
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                
                 discoveries_to_insert.append(discovery_dict)
             except Exception as e:
                 logger.error(f"Error converting person {person.name if person.name else 'unknown'} to discovery: {e}")
                 continue
         
+        if duplicates:
+            logger.info(f"Skipped {duplicates} duplicate discoveries")
+        
         # Batch insert
         if discoveries_to_insert:
-            # Insert in batches of 100 (Supabase limit)
-            batch_size = 100
+            # Insert in batches, several batches in flight
+            batch_size = DiscoveryService.INSERT_BATCH_SIZE
+            batches = [
+                discoveries_to_insert[i:i + batch_size]
+                for i in range(0, len(discoveries_to_insert), batch_size)
+            ]
             all_results = []
             failed_count = 0
             
-            for i in range(0, len(discoveries_to_insert), batch_size):
-                batch = discoveries_to_insert[i:i + batch_size]
-                
-                try:
-                    result = client.table('people_discoveries').insert(batch).execute()
-                    if result.data:
-                        all_results.extend(result.data)
-                        logger.info(f"Successfully inserted batch of {len(result.data)} discoveries")
-                    else:
-                        logger.warning(f"Batch insert returned no data (batch {i // batch_size + 1})")
-                except Exception as e:
-                    failed_count += len(batch)
-                    error_msg = str(e)
-                    logger.error(f"Error inserting batch {i // batch_size + 1}: {error_msg}")
-                    
-                    # If it's a column error, log the columns we're trying to insert
-                    if 'column' in error_msg.lower() or 'PGRST' in error_msg:
-                        logger.error(f"Batch columns: {list(batch[0].keys()) if batch else 'empty'}")
-                        # Try inserting without optional fields that might not exist
-                        try:
-                            safe_batch = []
-                            for item in batch:
-                                safe_item = {k: v for k, v in item.items() 
-                                            if k in ['job_id', 'user_id', 'person_type', 'full_name', 
-                                                    'title', 'email', 'linkedin_url', 'confidence_score',
-                                                    'connection_path', 'contacted']}
-                                safe_batch.append(safe_item)
-                            if safe_batch:
-                                result = client.table('people_discoveries').insert(safe_batch).execute()
-                                if result.data:
-                                    all_results.extend(result.data)
-                                    logger.info(f"Successfully inserted safe batch of {len(result.data)} discoveries")
-                        except Exception as retry_error:
-                            logger.error(f"Retry with safe columns also failed: {retry_error}")
-                    
-                    # Continue with next batch
+            if len(batches) == 1:
+                outcomes = [DiscoveryService._insert_batch(client, batches[0], 1)]
+            else:
+                workers = min(DiscoveryService.MAX_INSERT_WORKERS, len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # map() keeps batch order, so results stay in input order
+                    outcomes = list(executor.map(
+                        DiscoveryService._insert_batch,
+                        [client] * len(batches), batches, range(1, len(batches) + 1)
+                    ))
+            
+            for inserted, failed in outcomes:
+                all_results.extend(inserted)
+                failed_count += failed
                     
             if failed_count > 0:
                 logger.warning(f"Failed to insert {failed_count} out of {len(discoveries_to_insert)} discoveries")
@@ -124,6 +153,114 @@ class DiscoveryService:
         
         return []
     
+    @staticmethod
+    def _insert_batch(client, batch: List[Dict[str, Any]], batch_number: int) -> tuple[List[Dict[str, Any]], int]:
+        """
+        Insert one batch of discoveries.
+        
+        Returns:
+            (inserted_records, failed_count) - failed_count is the batch size if
+            the first attempt failed, even when the safe-column retry succeeded
+        """
+        if DiscoveryService._bulk_rpc_available:
+            inserted = DiscoveryService._insert_batch_rpc(client, batch)
+            if inserted is not None:
+                logger.info(f"Successfully inserted batch of {len(inserted)} discoveries")
+                return inserted, 0
+        
+        try:
+            result = client.table('people_discoveries').insert(batch).execute()
+            if result.data:
+                logger.info(f"Successfully inserted batch of {len(result.data)} discoveries")
+                return result.data, 0
+            logger.warning(f"Batch insert returned no data (batch {batch_number})")
+            return [], 0
+        except Exception as e:
+            error_msg = str(e)
+            
+            # Payload too large: split the batch in half and insert each part
+            if len(batch) > 1 and ('413' in error_msg or 'too large' in error_msg.lower()):
+                half = len(batch) // 2
+                logger.info(f"Batch {batch_number} too large ({len(batch)} rows), splitting")
+                first, first_failed = DiscoveryService._insert_batch(client, batch[:half], batch_number)
+                second, second_failed = DiscoveryService._insert_batch(client, batch[half:], batch_number)
+                return first + second, first_failed + second_failed
+            
+            logger.error(f"Error inserting batch {batch_number}: {error_msg}")
+            
+            # If it's a column error, log the columns we're trying to insert
+            if 'column' in error_msg.lower() or 'PGRST' in error_msg:
+                logger.error(f"Batch columns: {list(batch[0].keys()) if batch else 'empty'}")
+                # Try inserting without optional fields that might not exist
+                try:
+                    safe_batch = [
+                        {k: v for k, v in item.items() if k in _SAFE_COLUMNS}
+                        for item in batch
+                    ]
+                    if safe_batch:
+                        result = client.table('people_discoveries').insert(safe_batch).execute()
+                        if result.data:
+                            logger.info(f"Successfully inserted safe batch of {len(result.data)} discoveries")
+                            return result.data, len(batch)
+                except Exception as retry_error:
+                    logger.error(f"Retry with safe columns also failed: {retry_error}")
+            
+            return [], len(batch)
+    
+    @staticmethod
+    def _insert_batch_rpc(client, batch: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Insert a batch through insert_people_discoveries, one array per column.
+        
+        Returns the inserted records, or None when the RPC failed (the caller
+        then falls back to a regular insert).
+        """
+        payload = {
+            f'p_{column}': [item.get(column) for item in batch]
+            for column in _BULK_INSERT_COLUMNS
+        }
+        payload['p_match_reasons'] = [
+            json.dumps(reasons) if reasons is not None else None
+            for reasons in payload['p_match_reasons']
+        ]
+        
+        try:
+            result = client.rpc('insert_people_discoveries', payload).execute()
+            return result.data or []
+        except Exception as e:
+            error_msg = str(e)
+            if 'PGRST202' in error_msg or 'Could not find the function' in error_msg:
+                # Function not installed: stop trying it for this process
+                DiscoveryService._bulk_rpc_available = False
+                logger.info("insert_people_discoveries RPC not available, using table inserts")
+            else:
+                logger.warning(f"Bulk discovery insert RPC failed, falling back to table insert: {error_msg}")
+            return None
+    
+    @staticmethod
+    def _parse_discoveries(records: Optional[List[Dict[str, Any]]]) -> List[PersonDiscovery]:
+        """
+        Parse discovery rows, validating the whole list at once.
+        
+        Falls back to row-by-row parsing only when some row is invalid, so bad
+        records are still skipped individually.
+        """
+        if not records:
+            return []
+        
+        try:
+            return _DISCOVERY_LIST_ADAPTER.validate_python(records)
+        except ValidationError:
+            pass
+        
+        discoveries = []
+        for record in records:
+            try:
+                discoveries.append(PersonDiscovery(**record))
+            except Exception as e:
+                logger.warning(f"Failed to parse discovery record: {e}, record: {record}")
+        return discoveries
+    
     @staticmethod
     def get_discoveries_for_job(
         job_id: UUID,
@@ -144,23 +281,55 @@ class DiscoveryService:
             
             result = query.order('created_at', desc=True).execute()
             
-            if result.data:
-                discoveries = []
-                for record in result.data:
-                    try:
-                        discoveries.append(PersonDiscovery(**record))
-                    except Exception as e:
-                        logger.warning(f"Failed to parse discovery record: {e}, record: {record}")
-                return discoveries
-            
-            return []
+            return DiscoveryService._parse_discoveries(result.data)
         except Exception as e:
             logger.error(f"Error fetching discoveries for job {job_id}: {e}")
             return []
     
+    @staticmethod
+    def get_discoveries_for_jobs(
+        job_ids: List[UUID],
+        user_id: Optional[UUID] = None
+    ) -> Dict[UUID, List[PersonDiscovery]]:
+        """
+        Get discoveries for several jobs in one query.
+        
+        Returns:
+            Dict mapping each job ID to its discoveries (newest first); jobs
+            without discoveries map to an empty list
+        """
+        grouped: Dict[UUID, List[PersonDiscovery]] = {job_id: [] for job_id in job_ids}
+        if not job_ids:
+            return grouped
+        
+        client = get_client()
+        
+        try:
+            query = client.table('people_discoveries').select('*').in_('job_id', [str(job_id) for job_id in job_ids])
+            
+            if user_id:
+                query = query.eq('user_id', str(user_id))
+            
+            result = query.order('created_at', desc=True).execute()
+            
+            by_job = defaultdict(list)
+            for discovery in DiscoveryService._parse_discoveries(result.data):
+                by_job[discovery.job_id].append(discovery)
+            
+            for job_id in grouped:
+                grouped[job_id] = by_job.get(UUID(str(job_id)), [])
+            return grouped
+        except Exception as e:
+            logger.error(f"Error fetching discoveries for {len(job_ids)} jobs: {e}")
+            return grouped
+    
     @staticmethod
     def get_discovery_by_id(discovery_id: UUID) -> Optional[PersonDiscovery]:
         """Get a single discovery by ID"""
+        cached = _discovery_by_id_cache.get(str(discovery_id))
+        if cached is not None:
+            return cached
+        
         client = get_client()
         
         try:
@@ -168,7 +337,9 @@ class DiscoveryService:
             
             if result.data:
                 try:
-                    return PersonDiscovery(**result.data[0])
+                    discovery = PersonDiscovery(**result.data[0])
+                    _discovery_by_id_cache.set(str(discovery_id), discovery)
+                    return discovery
                 except Exception as e:
                     logger.error(f"Failed to parse discovery record: {e}, record: {result.data[0]}")
                     return None
@@ -189,6 +360,7 @@ class DiscoveryService:
                 update_data['notes'] = notes
             
             result = client.table('people_discoveries').update(update_data).eq('id', str(discovery_id)).execute()
+            _discovery_by_id_cache.pop(str(discovery_id))
             
             return bool(result.data)
         except Exception as e:
@@ -206,17 +378,45 @@ class DiscoveryService:
         try:
             result = client.table('people_discoveries').select('*').eq('user_id', str(user_id)).order('created_at', desc=True).limit(limit).execute()
             
-            if result.data:
-                discoveries = []
-                for record in result.data:
-                    try:
-                        discoveries.append(PersonDiscovery(**record))
-                    except Exception as e:
-                        logger.warning(f"Failed to parse discovery record: {e}, record: {record}")
-                return discoveries
-            
-            return []
+            return DiscoveryService._parse_discoveries(result.data)
         except Exception as e:
             logger.error(f"Error fetching discoveries for user {user_id}: {e}")
             return []
+    
+    @staticmethod
+    def iter_discoveries_for_user(
+        user_id: UUID,
+        page_size: int = 500
+    ) -> Iterator[PersonDiscovery]:
+        """
+        Iterate over all of a user's discoveries, newest first.
+        
+        Pages through the table with range requests so only one page is held
+        in memory at a time.
+        """
+        client = get_client()
+        offset = 0
+        
+        while True:
+            try:
+                result = (
+                    client.table('people_discoveries')
+                    .select('*')
+                    .eq('user_id', str(user_id))
+                    .order('created_at', desc=True)
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+            except Exception as e:
+                logger.error(f"Error fetching discoveries for user {user_id} at offset {offset}: {e}")
+                return
+            
+            if not result.data:
+                return
+            
+            yield from DiscoveryService._parse_discoveries(result.data)
+            
+            if len(result.data) < page_size:
+                return
+            offset += page_size
 
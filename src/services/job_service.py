@@ -4,6 +4,26 @@ from typing import Optional, Dict, Any
 from uuid import UUID
 from src.db.supabase_client import get_client
 from src.db.models import JobRecord
+from src.utils.cache import TTLCache
+
+# get_or_create_job results keyed by (user_id, company_name, job_title) - the
+# same exact-match columns the lookup filters on
+_job_cache = TTLCache(maxsize=2048, ttl_seconds=600)
+_job_cache_keys = TTLCache(maxsize=2048, ttl_seconds=600)  # {job_id: cache key}
+
+# Fields copied from scraped job_data into their own jobs columns
+_JOB_DATA_COLUMNS = ('required_skills', 'nice_to_have_skills', 'experience_required', 'education_required')
+
+# get_job_by_id results keyed by job id
+_job_by_id_cache = TTLCache(maxsize=4096, ttl_seconds=60)
+
+
+def _remember_job(cache_key: tuple, job: JobRecord) -> JobRecord:
+    """Store a job under its lookup key (and its id, for invalidation)"""
+    _job_cache.set(cache_key, job)
+    if job.id:
+        _job_cache_keys.set(str(job.id), cache_key)
+    return job
 
 
 class JobService:
@@ -36,6 +56,11 @@ class JobService:
         Returns:
             JobRecord
         """
+        cache_key = (str(user_id) if user_id else None, company_name, job_title)
+        cached = _job_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         client = get_client()
         
         # Try to find existing job
@@ -50,53 +75,50 @@ class JobService:
         
         if result.data:
             # Found existing job
-            return JobRecord(**result.data[0])
-        
-        # Create new job
+            return _remember_job(cache_key, JobRecord(**result.data[0]))
+        
+        # Create new job (optional columns only when set)
+        optional_fields = {
+            'user_id': str(user_id) if user_id else None,
+            'company_domain': company_domain,
+            'location': location,
+            'department': department,
+            'source_url': source_url,
+        }
         job_data_dict = {
             'company_name': company_name,
             'job_title': job_title,
-            'status': 'active'
+            'status': 'active',
+            **{k: v for k, v in optional_fields.items() if v}
         }
         
-        if user_id:
-            job_data_dict['user_id'] = str(user_id)
-        if company_domain:
-            job_data_dict['company_domain'] = company_domain
-        if location:
-            job_data_dict['location'] = location
-        if department:
-            job_data_dict['department'] = department
-        if source_url:
-            job_data_dict['source_url'] = source_url
         if job_data:
             job_data_dict['scraped_data'] = job_data
             # Extract common fields from job_data
-            if 'required_skills' in job_data:
-                job_data_dict['required_skills'] = job_data['required_skills']
-            if 'nice_to_have_skills' in job_data:
-                job_data_dict['nice_to_have_skills'] = job_data['nice_to_have_skills']
-            if 'experience_required' in job_data:
-                job_data_dict['experience_required'] = job_data['experience_required']
-            if 'education_required' in job_data:
-                job_data_dict['education_required'] = job_data['education_required']
+            job_data_dict.update({k: job_data[k] for k in _JOB_DATA_COLUMNS if k in job_data})
         
         insert_result = client.table('jobs').insert(job_data_dict).execute()
         
         if insert_result.data:
-            return JobRecord(**insert_result.data[0])
+            return _remember_job(cache_key, JobRecord(**insert_result.data[0]))
         
         raise Exception("Failed to create job record")
     
     @staticmethod
     def get_job_by_id(job_id: UUID) -> Optional[JobRecord]:
         """Get job by ID"""
+        cached = _job_by_id_cache.get(str(job_id))
+        if cached is not None:
+            return cached
+        
         client = get_client()
         
         result = client.table('jobs').select('*').eq('id', str(job_id)).execute()
         
         if result.data:
-            return JobRecord(**result.data[0])
+            job = JobRecord(**result.data[0])
+            _job_by_id_cache.set(str(job_id), job)
+            return job
         
         return None
     
@@ -107,6 +129,12 @@ class JobService:
         
         result = client.table('jobs').update(updates).eq('id', str(job_id)).execute()
         
+        # Drop the cached lookups for this job; the next read refetches
+        _job_by_id_cache.pop(str(job_id))
+        cache_key = _job_cache_keys.pop(str(job_id))
+        if cache_key is not None:
+            _job_cache.pop(cache_key)
+        
         if result.data:
             return JobRecord(**result.data[0])
         
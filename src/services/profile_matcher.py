@@ -1,12 +1,83 @@
 """Profile-based matching logic for connection relevance scoring"""
 
-from typing import List, Optional, Dict
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Dict, FrozenSet, Tuple
 from src.models.person import Person, PersonCategory
 from src.models.job_context import CandidateProfile, JobContext
+from src.models.source_config import SOURCE_QUALITY_SCORES
 from src.db.models import UserProfile, JobRecord
 from src.core.categorizer import PersonCategorizer
 
 
+# Words of a department/location, for token-set comparisons
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    """Lowercase word tokens of a string"""
+    return frozenset(_TOKEN_RE.findall(text.lower())) if text else frozenset()
+
+
+# Membership bits for MatchContext.skill_masks
+SKILL_REQUIRED = 1
+SKILL_NICE = 2
+SKILL_PROFILE = 4
+
+# Skill abbreviations mapped to the canonical (lowercase) skill name; both
+# person and job/profile skills are canonicalized before comparing
+SKILL_CANON: Dict[str, str] = {
+    'js': 'javascript',
+    'jsx': 'react',
+    'ts': 'typescript',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'py': 'python',
+    'go': 'golang',
+    'c++': 'cpp',
+    'k8s': 'kubernetes',
+}
+
+
+def _canonical_skills(skills) -> List[str]:
+    """Lowercase skills and map abbreviations to their canonical name"""
+    return [SKILL_CANON.get(skill, skill) for skill in map(str.lower, skills)]
+
+
+@dataclass(frozen=True, slots=True)
+class MatchContext:
+    """
+    Profile/job inputs for relevance scoring, normalized once per batch.
+    
+    Built by ProfileMatcher.prepare_context; scoring many people against the
+    same profile and job reuses it instead of re-lowercasing and re-splitting
+    the same lists for every person.
+    """
+    has_signals: bool
+    career_stage: str
+    stage_weights: Dict[str, float]
+    # BASE_WEIGHTS scaled by stage_weights (skills: cap on the skills score)
+    match_weights: Dict[str, float]
+    # Schools with usable keywords, and one pattern covering all of them
+    # (group i + 1 matches school_names[i]; see prepare_context)
+    school_names: Tuple[str, ...]
+    school_pattern: Optional['re.Pattern']
+    past_companies_lower: Tuple[str, ...]
+    past_companies_set: FrozenSet[str]  # exact-match fast path
+    # Canonical skill names (see SKILL_CANON)
+    required_set: FrozenSet[str]
+    nice_set: FrozenSet[str]
+    profile_skills_set: FrozenSet[str]
+    # Union of the three skill sets
+    target_skills: FrozenSet[str]
+    # Target skill -> membership bits (SKILL_REQUIRED | SKILL_NICE | SKILL_PROFILE)
+    skill_masks: Dict[str, int]
+    # Word tokens of the job's department/location
+    job_department_tokens: FrozenSet[str]
+    job_location_tokens: FrozenSet[str]
+    source_quality_scores: Dict[str, float]
+
+
 class ProfileMatcher:
     """Match connections based on user profile and job context"""
     
@@ -60,33 +131,24 @@ class ProfileMatcher:
             return 'senior_career'
         return 'mid_career'
     
+    # Words dropped when normalizing school names
+    SCHOOL_STOP_WORDS = frozenset(['university', 'of', 'college', 'the', 'at', 'in'])
+    
     @classmethod
-    def calculate_relevance(
+    def prepare_context(
         cls,
-        person: Person,
         profile: Optional[UserProfile] = None,
         job: Optional[JobRecord] = None,
         candidate_profile: Optional[CandidateProfile] = None,
         job_context: Optional[JobContext] = None
-    ) -> tuple[float, List[str]]:
+    ) -> MatchContext:
         """
-        Calculate relevance score for a person based on profile and job context.
+        Normalize profile and job data for scoring.
         
-        Args:
-            person: Person to score
-            profile: User profile (optional)
-            job: Job record (optional)
-            candidate_profile: CandidateProfile (optional)
-            job_context: JobContext (optional)
-            
-        Returns:
-            (relevance_score, match_reasons) - Score 0.0-1.0, list of match reasons
+        Build once and pass to calculate_relevance_with_context for every
+        person scored against the same profile/job.
         """
-        score = person.confidence_score or 0.5  # Start with base confidence
-        match_reasons = []
-        
-        if not profile and not candidate_profile and not job and not job_context:
-            return score, match_reasons
+        has_signals = bool(profile or candidate_profile or job or job_context)
         
         # Detect career stage from job title
         job_title = ''
@@ -114,8 +176,8 @@ class ProfileMatcher:
         
         # Extract job data
         if job:
-            job_department = (job.department or '').lower()
-            job_location = (job.location or '').lower()
+            job_department = job.department or ''
+            job_location = job.location or ''
             job_required_skills = job.required_skills or []
             job_nice_to_have = job.nice_to_have_skills or []
         else:
@@ -124,140 +186,251 @@ class ProfileMatcher:
             job_required_skills = []
             job_nice_to_have = []
         
-        # Check for alumni match
-        if profile_schools:
+        past_companies_lower = tuple(c.lower() for c in profile_past_companies)
+        
+        # Normalize school names (remove common words like "University of", "College")
+        # into a whole-word alternation per school: the full keyword phrase or
+        # any distinctive (> 3 chars) word of it. All schools share one
+        # pattern, each in its own group inside a lookahead, so a single scan
+        # reports every position any school matches at (zero-width matches
+        # can't hide an overlapping match of another school)
+        school_names = []
+        school_groups = []
+        for school in profile_schools:
+            school_words = [w for w in school.lower().split() if w not in cls.SCHOOL_STOP_WORDS]
+            keywords = ' '.join(school_words)
+            if keywords and len(keywords) > 3:
+                alternatives = dict.fromkeys([keywords] + [w for w in school_words if len(w) > 3])
+                school_names.append(school)
+                school_groups.append(r'(\b(?:' + '|'.join(map(re.escape, alternatives)) + r')\b)')
+        school_pattern = re.compile('(?=' + '|'.join(school_groups) + ')') if school_groups else None
+        
+        required_set = frozenset(_canonical_skills(job_required_skills))
+        nice_set = frozenset(_canonical_skills(job_nice_to_have))
+        profile_skills_set = frozenset(_canonical_skills(profile_skills))
+        
+        skill_masks: Dict[str, int] = {}
+        for skill_set, bit in ((required_set, SKILL_REQUIRED), (nice_set, SKILL_NICE), (profile_skills_set, SKILL_PROFILE)):
+            for skill in skill_set:
+                skill_masks[skill] = skill_masks.get(skill, 0) | bit
+        
+        return MatchContext(
+            has_signals=has_signals,
+            career_stage=career_stage,
+            stage_weights=stage_weights,
+            match_weights={k: w * stage_weights[k] for k, w in cls.BASE_WEIGHTS.items()},
+            school_names=tuple(school_names),
+            school_pattern=school_pattern,
+            past_companies_lower=past_companies_lower,
+            past_companies_set=frozenset(past_companies_lower),
+            required_set=required_set,
+            nice_set=nice_set,
+            profile_skills_set=profile_skills_set,
+            target_skills=required_set | nice_set | profile_skills_set,
+            skill_masks=skill_masks,
+            job_department_tokens=_tokens(job_department),
+            job_location_tokens=_tokens(job_location),
+            source_quality_scores=SOURCE_QUALITY_SCORES
+        )
+    
+    @classmethod
+    def calculate_relevance(
+        cls,
+        person: Person,
+        profile: Optional[UserProfile] = None,
+        job: Optional[JobRecord] = None,
+        candidate_profile: Optional[CandidateProfile] = None,
+        job_context: Optional[JobContext] = None,
+        ctx: Optional[MatchContext] = None,
+        explain: bool = True
+    ) -> tuple[float, List[str]]:
+        """
+        Calculate relevance score for a person based on profile and job context.
+        
+        Args:
+            person: Person to score
+            profile: User profile (optional)
+            job: Job record (optional)
+            candidate_profile: CandidateProfile (optional)
+            job_context: JobContext (optional)
+            ctx: MatchContext from prepare_context (optional); when given,
+                the profile/job arguments are ignored
+            explain: Build match reasons (False returns an empty list)
+            
+        Returns:
+            (relevance_score, match_reasons) - Score 0.0-1.0, list of match reasons
+        """
+        if ctx is not None:
+            return cls.calculate_relevance_with_context(person, ctx, explain)
+        
+        if not profile and not candidate_profile and not job and not job_context:
+            return person.confidence_score or 0.5, []
+        
+        ctx = cls.prepare_context(profile, job, candidate_profile, job_context)
+        return cls.calculate_relevance_with_context(person, ctx, explain)
+    
+    @classmethod
+    def calculate_relevance_with_context(
+        cls,
+        person: Person,
+        ctx: MatchContext,
+        explain: bool = True
+    ) -> tuple[float, List[str]]:
+        """
+        Calculate relevance score for a person against a prepared MatchContext.
+        
+        With explain=False no match reasons are built (the list comes back
+        empty), for callers that only rank by score.
+        
+        Returns:
+            (relevance_score, match_reasons) - Score 0.0-1.0, list of match reasons
+        """
+        score = person.confidence_score or 0.5  # Start with base confidence
+        match_reasons = []
+        
+        if not ctx.has_signals:
+            return score, match_reasons
+        
+        career_stage = ctx.career_stage
+        stage_weights = ctx.stage_weights
+        match_weights = ctx.match_weights
+        
+        # Lowercase each person field once (company only if it's compared below)
+        p_title_lower = person.title.lower() if person.title else ''
+        p_company_lower = person.company.lower() if ctx.past_companies_lower and person.company else ''
+        p_dept_lower = person.department.lower() if person.department else ''
+        p_loc_lower = person.location.lower() if person.location else ''
+        
+        # Check for alumni match (only if the person has any text to search)
+        if ctx.school_pattern is not None and (p_title_lower or p_loc_lower or p_dept_lower or person.skills):
             # Try to match school in person's metadata
             # Check if person's title, location, or other metadata mentions a school
-            person_text = ' '.join([
-                person.title or '',
-                person.location or '',
-                person.department or '',
-                str(person.skills or [])
-            ]).lower()
+            person_text_parts = [p_title_lower, p_loc_lower, p_dept_lower]
+            if person.skills:
+                person_text_parts.extend(skill.lower() for skill in person.skills)
+            person_text = ' '.join(person_text_parts)
             
-            for school in profile_schools:
-                # Normalize school names (remove common words like "University of", "College")
-                school_normalized = school.lower()
-                school_words = [w for w in school_normalized.split() 
-                              if w not in ['university', 'of', 'college', 'the', 'at', 'in']]
-                school_keywords = ' '.join(school_words)
-                
-                # Check if school keywords appear in person's metadata
-                if school_keywords and len(school_keywords) > 3:
-                    if school_keywords in person_text or any(word in person_text for word in school_words if len(word) > 3):
-                        # Apply career stage adjusted weight
-                        alumni_weight = cls.BASE_WEIGHTS['alumni'] * stage_weights['alumni']
-                        score += alumni_weight
-                        match_reasons.append(f'alumni_match ({school})')
+            # Check if school keywords appear (as whole words) in person's
+            # metadata; the first matching school in profile order wins
+            first_group = None
+            for match in ctx.school_pattern.finditer(person_text):
+                if first_group is None or match.lastindex < first_group:
+                    first_group = match.lastindex
+                    if first_group == 1:
                         break
+            
+            if first_group is not None:
+                # Apply career stage adjusted weight
+                alumni_weight = match_weights['alumni']
+                score += alumni_weight
+                if explain:
+                    match_reasons.append(f'alumni_match ({ctx.school_names[first_group - 1]})')
         
         # Check for ex-company match
-        if profile_past_companies and person.company:
-            person_company_lower = person.company.lower()
-            for past_company in profile_past_companies:
-                past_company_lower = past_company.lower()
-                # Check if person works at a company user used to work at
-                # (This could be a connection)
-                if past_company_lower in person_company_lower or person_company_lower in past_company_lower:
-                    ex_company_weight = cls.BASE_WEIGHTS['ex_company'] * stage_weights['ex_company']
-                    score += ex_company_weight
+        if p_company_lower:
+            # Check if person works at a company user used to work at
+            # (This could be a connection). Exact names hit the set; the
+            # substring scan only runs on a miss
+            if p_company_lower in ctx.past_companies_set or any(
+                past_company_lower in p_company_lower or p_company_lower in past_company_lower
+                for past_company_lower in ctx.past_companies_lower
+            ):
+                ex_company_weight = match_weights['ex_company']
+                score += ex_company_weight
+                if explain:
                     match_reasons.append('ex_company_match')
-                    break
         
         # Check for skills overlap with fuzzy matching and weighting
-        if profile_skills or job_required_skills or job_nice_to_have:
-            person_skills = [s.lower() for s in (person.skills or [])]
-            
-            # Build weighted skill sets
-            # Required skills (from job) get highest weight
-            required_skills_set = set([s.lower() for s in job_required_skills])
-            # Nice-to-have skills get medium weight
-            nice_to_have_set = set([s.lower() for s in job_nice_to_have])
-            # Profile skills get base weight
-            profile_skills_set = set([s.lower() for s in profile_skills])
-            
-            # Check for exact matches first
-            exact_overlap_required = set(person_skills) & required_skills_set
-            exact_overlap_nice = set(person_skills) & nice_to_have_set
-            exact_overlap_profile = set(person_skills) & profile_skills_set
-            
-            # Fuzzy matching for skill variations
-            skill_synonyms = {
-                'js': ['javascript'],
-                'jsx': ['react'],
-                'ts': ['typescript'],
-                'ml': ['machine learning'],
-                'ai': ['artificial intelligence'],
-                'py': ['python'],
-                'go': ['golang'],
-                'c++': ['cpp'],
-                'k8s': ['kubernetes'],
-            }
-            
-            fuzzy_overlap = 0
-            for person_skill in person_skills:
-                # Check synonyms
-                for person_variant in [person_skill] + skill_synonyms.get(person_skill, []):
-                    if person_variant in required_skills_set or person_variant in nice_to_have_set or person_variant in profile_skills_set:
-                        fuzzy_overlap += 1
-                        break
-            
-            # Calculate weighted score
-            overlap_score = 0.0
-            # Required skills matches are most valuable
-            if exact_overlap_required:
-                overlap_score += len(exact_overlap_required) * 0.08  # Higher weight for required
-            # Nice-to-have matches
-            if exact_overlap_nice:
-                overlap_score += len(exact_overlap_nice) * 0.04  # Medium weight
-            # Profile skill matches
-            if exact_overlap_profile:
-                overlap_score += len(exact_overlap_profile) * 0.03  # Lower weight
-            
-            # Add fuzzy match bonus (capped)
-            fuzzy_bonus = min(0.05, fuzzy_overlap * 0.01)
-            overlap_score += fuzzy_bonus
+        if ctx.target_skills and person.skills:
+            person_skills = _canonical_skills(person.skills)
             
-            # Apply career stage adjusted weight
-            skills_weight = cls.BASE_WEIGHTS['skills'] * stage_weights['skills']
-            overlap_score = min(skills_weight, overlap_score)
-            
-            if overlap_score > 0:
-                score += overlap_score
-                total_matches = len(exact_overlap_required) + len(exact_overlap_nice) + len(exact_overlap_profile)
-                match_reasons.append(f'skills_match ({total_matches} skills, {len(exact_overlap_required)} required)')
+            # No skill of interest (the common case): nothing below can score,
+            # and the person's skills never need to be hashed into a set
+            if not ctx.target_skills.isdisjoint(person_skills):
+                # Check for exact (canonical) matches first. Weighted skill sets: required
+                # skills (from job) get highest weight, nice-to-have medium,
+                # profile skills base weight. One pass over the person's skills
+                # counts all three overlaps
+                required_count = nice_count = profile_count = 0
+                skill_masks = ctx.skill_masks
+                for skill in set(person_skills):
+                    mask = skill_masks.get(skill)
+                    if mask:
+                        if mask & SKILL_REQUIRED:
+                            required_count += 1
+                        if mask & SKILL_NICE:
+                            nice_count += 1
+                        if mask & SKILL_PROFILE:
+                            profile_count += 1
+                
+                # Fuzzy matching for skill variations: abbreviations were mapped to
+                # their canonical names on both sides
+                fuzzy_overlap = sum(map(ctx.target_skills.__contains__, person_skills))
+                
+                # Calculate weighted score
+                overlap_score = 0.0
+                # Required skills matches are most valuable
+                if required_count:
+                    overlap_score += required_count * 0.08  # Higher weight for required
+                # Nice-to-have matches
+                if nice_count:
+                    overlap_score += nice_count * 0.04  # Medium weight
+                # Profile skill matches
+                if profile_count:
+                    overlap_score += profile_count * 0.03  # Lower weight
+                
+                # Add fuzzy match bonus (capped)
+                fuzzy_bonus = min(0.05, fuzzy_overlap * 0.01)
+                overlap_score += fuzzy_bonus
+                
+                # Apply career stage adjusted weight
+                skills_weight = match_weights['skills']
+                overlap_score = min(skills_weight, overlap_score)
+                
+                if overlap_score > 0:
+                    score += overlap_score
+                    if explain:
+                        total_matches = required_count + nice_count + profile_count
+                        match_reasons.append(f'skills_match ({total_matches} skills, {required_count} required)')
         
-        # Check for department match
-        if job_department and person.department:
-            person_dept_lower = person.department.lower()
-            if job_department in person_dept_lower or person_dept_lower in job_department:
-                dept_weight = cls.BASE_WEIGHTS['department'] * stage_weights['department']
+        # Check for department match: one side's words contain all of the
+        # other's ("Engineering" ~ "Software Engineering", but "eng" no longer
+        # matches "engagement")
+        job_department_tokens = ctx.job_department_tokens
+        if job_department_tokens and p_dept_lower:
+            person_dept_tokens = _tokens(p_dept_lower)
+            if person_dept_tokens and (job_department_tokens <= person_dept_tokens or person_dept_tokens <= job_department_tokens):
+                dept_weight = match_weights['department']
                 score += dept_weight
-                match_reasons.append('department_match')
+                if explain:
+                    match_reasons.append('department_match')
         
-        # Check for location match
-        if job_location and person.location:
-            person_loc_lower = person.location.lower()
-            if job_location in person_loc_lower or person_loc_lower in job_location:
-                location_weight = cls.BASE_WEIGHTS['location'] * stage_weights['location']
+        # Check for location match (same token-set rule)
+        job_location_tokens = ctx.job_location_tokens
+        if job_location_tokens and p_loc_lower:
+            person_loc_tokens = _tokens(p_loc_lower)
+            if person_loc_tokens and (job_location_tokens <= person_loc_tokens or person_loc_tokens <= job_location_tokens):
+                location_weight = match_weights['location']
                 score += location_weight
-                match_reasons.append('location_match')
+                if explain:
+                    match_reasons.append('location_match')
         
         # Early career specific boosts
         if career_stage == 'early_career':
             # Boost recruiters extra for early career
             if person.category == PersonCategory.RECRUITER:
                 score += stage_weights['recruiter_boost']
-                match_reasons.append('early_career_recruiter_boost')
+                if explain:
+                    match_reasons.append('early_career_recruiter_boost')
                 
             # Boost campus/university recruiters specifically
-            if person.title and any(kw in person.title.lower() for kw in ['campus', 'university', 'college']):
+            if p_title_lower and any(kw in p_title_lower for kw in ('campus', 'university', 'college')):
                 score += stage_weights['campus_boost']
-                match_reasons.append('campus_recruiter_boost')
+                if explain:
+                    match_reasons.append('campus_recruiter_boost')
         
         # Factor in source quality (boost high-quality sources)
-        from src.core.orchestrator import ConnectionFinder
-        source_quality = ConnectionFinder.SOURCE_QUALITY_SCORES.get(person.source, 0.5)
+        source_quality = ctx.source_quality_scores.get(person.source, 0.5)
         # Boost score slightly based on source quality (0.05 max boost)
         score += (source_quality - 0.5) * 0.1
         
@@ -273,7 +446,8 @@ class ProfileMatcher:
         profile: Optional[UserProfile] = None,
         job: Optional[JobRecord] = None,
         candidate_profile: Optional[CandidateProfile] = None,
-        job_context: Optional[JobContext] = None
+        job_context: Optional[JobContext] = None,
+        explain: bool = True
     ) -> List[tuple[Person, float, List[str]]]:
         """
         Enhance a list of people with relevance scores based on profile.
@@ -284,16 +458,24 @@ class ProfileMatcher:
             job: Job record (optional)
             candidate_profile: CandidateProfile (optional)
             job_context: JobContext (optional)
+            explain: Build match reasons (False leaves them empty)
             
         Returns:
             List of tuples: (Person, relevance_score, match_reasons)
         """
         enhanced = []
         
+        # Nothing to match against: every score is just the base confidence
+        if profile is None and job is None and candidate_profile is None and job_context is None:
+            for person in people:
+                person.confidence_score = person.confidence_score or 0.5
+                enhanced.append((person, person.confidence_score, []))
+            return enhanced
+        
+        ctx = cls.prepare_context(profile, job, candidate_profile, job_context)
+        
         for person in people:
-            relevance_score, match_reasons = cls.calculate_relevance(
-                person, profile, job, candidate_profile, job_context
-            )
+            relevance_score, match_reasons = cls.calculate_relevance_with_context(person, ctx, explain)
             
             # Update the person's confidence score with the enhanced relevance
             person.confidence_score = relevance_score
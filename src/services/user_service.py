@@ -1,15 +1,54 @@
 """User authentication and rate limiting service using Supabase Auth"""
 
+import os
+import re
 import time
+import hashlib
 import logging
+import threading
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from uuid import UUID
+from jose import jwt, JWTError, ExpiredSignatureError
+from postgrest.exceptions import APIError
 from supabase import Client
 from src.db.supabase_client import get_client
+from src.utils.cache import TTLCache, get_cache
+from src.utils.batch_counter import BatchedCounter
 
 logger = logging.getLogger(__name__)
 
+# header.payload.signature, each base64url - anything else can't be a JWT
+_JWT_SHAPE_RE = re.compile(r'[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\Z')
+
+# Tracebacks of per-request failures are logged at most once a minute per
+# exception type, so an outage doesn't format one for every request
+TRACEBACK_LOG_INTERVAL_SECONDS = 60
+_traceback_logged_at = {}
+
+
+def _log_request_failure(level: int, message: str, error: Exception):
+    """Log a per-request failure, with its traceback only if not logged recently"""
+    now = time.monotonic()
+    error_type = type(error)
+    with_traceback = now - _traceback_logged_at.get(error_type, float('-inf')) >= TRACEBACK_LOG_INTERVAL_SECONDS
+    if with_traceback:
+        _traceback_logged_at[error_type] = now
+    logger.log(level, f"{message}: {error!r}", exc_info=error if with_traceback else None)
+
+
+class RPCUnavailableError(Exception):
+    """A database function is known to be missing (see UserService._call_rpc)"""
+
+
+@lru_cache(maxsize=8)
+def _window_timestamps(start_ts: int, length_seconds: int) -> Tuple[str, str]:
+    """ISO (window_start, reset_at) of a rate-limit window - formatted once per window"""
+    start = datetime.utcfromtimestamp(start_ts)
+    return start.isoformat(), (start + timedelta(seconds=length_seconds)).isoformat()
+
 
 class UserContext:
     """Context for authenticated user"""
@@ -28,27 +67,245 @@ class UserService:
     
     # Keep a small local cache for hot paths (1-minute TTL)
     # This reduces database load but doesn't replace database-backed rate limiting
-    _rate_limit_cache: dict = {}
+    # Per-minute request counters live in the disk cache (see Cache.incr) so
+    # every worker process on the host shares them; this holds each user's
+    # last known count for up to a second to absorb bursts
+    _rate_limit_cache = TTLCache(maxsize=65536, ttl_seconds=1)  # {user_id.int: {count, reset_at, window}}
+    RATE_LIMIT_WINDOW_SECONDS = 60
+    
+    # 'database': every check/increment goes through the rate_limits table
+    # (exact across any number of hosts). 'local': decide from the host-wide
+    # counter only and sync counts to rate_limits in the background - no
+    # database round-trip on the request path, for single-host deployments.
+    RATE_LIMIT_MODE = os.getenv('RATE_LIMIT_MODE', 'database').lower()
+    
+    # Requests already counted by check_rate_limit (try_acquire_rate_limit)
+    # whose increment_rate_limit() call hasn't come yet, per user. A count
+    # rather than a thread-local flag, so it holds whichever thread runs the
+    # check or the increment.
+    _acquired_requests = TTLCache(maxsize=65536, ttl_seconds=120)
+    _acquired_lock = threading.Lock()
+    
+    # (subscription_tier, searches_used_this_month) per user id, so the
+    # per-request auth/quota/rate-limit checks don't each re-read profiles.
+    # Kept current by increment_usage, dropped on update_subscription_tier.
+    # Per-user caches here are keyed by user_id.int (cheaper to hash than
+    # the UUID or its string form).
+    _profile_cache = TTLCache(maxsize=10000, ttl_seconds=30)
     
-    # Subscription tier configurations
-    TIER_CONFIGS = {
-        'free': {
+    # Profile cache misses arriving within this window share one
+    # profiles SELECT (id IN (...)) instead of each issuing their own
+    PROFILE_BATCH_WINDOW_SECONDS = 0.002
+    _profile_batch = None  # {ids, done, profiles, error} of the batch being collected
+    _profile_batch_lock = threading.Lock()
+    
+    # get_user_quota() results per user id for dashboard polling; dropped
+    # along with the profile cache entry whenever the profile changes
+    _quota_cache = TTLCache(maxsize=10000, ttl_seconds=20)
+    
+    # Serializes increment_usage's read-modify-write of cached profiles
+    _usage_lock = threading.Lock()
+    
+    # Supabase project JWT secret (Settings > API). When set, access tokens
+    # are verified locally instead of calling Supabase Auth on every request.
+    JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
+    JWT_AUDIENCE = 'authenticated'
+    
+    # Verified tokens -> (user_id, email), keyed by a digest of the token, so
+    # repeat requests skip signature checks and Supabase Auth round-trips.
+    # Entries never outlive the token's own expiry.
+    TOKEN_CACHE_TTL = 30
+    _token_cache = TTLCache(maxsize=10000, ttl_seconds=TOKEN_CACHE_TTL)
+    
+    # Subscription tier configurations (read-only)
+    TIER_CONFIGS = MappingProxyType({
+        'free': MappingProxyType({
             'searches_per_month': 10,
             'rate_limit_per_minute': 5
-        },
-        'basic': {
+        }),
+        'basic': MappingProxyType({
             'searches_per_month': 50,
             'rate_limit_per_minute': 10
-        },
-        'pro': {
+        }),
+        'pro': MappingProxyType({
             'searches_per_month': 200,
             'rate_limit_per_minute': 20
-        },
-        'enterprise': {
+        }),
+        'enterprise': MappingProxyType({
             'searches_per_month': -1,  # Unlimited
             'rate_limit_per_minute': 50
-        }
-    }
+        })
+    })
+    
+    # Flat per-tier lookups for the request path; unknown tiers get free limits
+    _SEARCHES_BY_TIER = {tier: config['searches_per_month'] for tier, config in TIER_CONFIGS.items()}
+    _RATE_LIMIT_BY_TIER = {tier: config['rate_limit_per_minute'] for tier, config in TIER_CONFIGS.items()}
+    _FREE_SEARCHES = _SEARCHES_BY_TIER['free']
+    _FREE_RATE = _RATE_LIMIT_BY_TIER['free']
+    
+    # Database functions found missing -> when. Calls to them fail fast with
+    # RPCUnavailableError (no round-trip) until RPC_REPROBE_SECONDS have
+    # passed, so a deployment without a migration doesn't pay for a failed
+    # RPC on every request, and picks the function up once it's installed.
+    RPC_REPROBE_SECONDS = 300
+    MISSING_FUNCTION_CODES = ('PGRST202', '42883')  # PostgREST / Postgres undefined_function
+    _missing_rpcs = {}
+    
+    @classmethod
+    def _call_rpc(cls, client: Client, name: str, params: dict):
+        """client.rpc(name, params).execute(), skipping functions known to be missing"""
+        missing_since = cls._missing_rpcs.get(name)
+        if missing_since is not None:
+            if time.monotonic() - missing_since < cls.RPC_REPROBE_SECONDS:
+                raise RPCUnavailableError(name)
+            cls._missing_rpcs.pop(name, None)
+        
+        try:
+            return client.rpc(name, params).execute()
+        except APIError as e:
+            if e.code in cls.MISSING_FUNCTION_CODES:
+                cls._missing_rpcs[name] = time.monotonic()
+                logger.warning(f"Database function {name} not installed, using fallback for {cls.RPC_REPROBE_SECONDS}s: {e.message}")
+                raise RPCUnavailableError(name) from e
+            raise
+    
+    @classmethod
+    def _log_rpc_fallback(cls, error: Exception, message: str):
+        """Log an RPC failure that's being handled by a fallback (missing functions are logged once by _call_rpc)"""
+        if not isinstance(error, RPCUnavailableError):
+            logger.warning(f"{message}: {error}")
+    
+    @classmethod
+    def _get_profile_cached(cls, client: Client, user_id: UUID) -> Optional[Tuple[str, int]]:
+        """
+        (subscription_tier, searches_used_this_month) for a user, from the
+        in-process cache or the profiles table. None if there's no profile row.
+        Concurrent misses are coalesced into one query.
+        """
+        cached = cls._profile_cache.get(user_id.int)
+        if cached is not None:
+            return cached
+        
+        # Join the open batch, or open one and load it after the window
+        with cls._profile_batch_lock:
+            batch = cls._profile_batch
+            leader = batch is None
+            if leader:
+                batch = cls._profile_batch = {'ids': set(), 'done': threading.Event(), 'profiles': {}, 'error': None}
+            batch['ids'].add(str(user_id))
+        
+        if leader:
+            time.sleep(cls.PROFILE_BATCH_WINDOW_SECONDS)
+            with cls._profile_batch_lock:
+                cls._profile_batch = None
+            try:
+                if len(batch['ids']) == 1:
+                    # Lone lookup: the id is the filter, no need to read it back
+                    result = client.table('profiles').select('subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
+                    rows = [(user_id, row) for row in result.data or []]
+                else:
+                    result = client.table('profiles').select('id, subscription_tier, searches_used_this_month').in_('id', list(batch['ids'])).execute()
+                    rows = [(UUID(row['id']), row) for row in result.data or []]
+                for row_id, row in rows:
+                    batch['profiles'][row_id.int] = cls._remember_profile(row_id, row.get('subscription_tier'), row.get('searches_used_this_month'))
+            except Exception as e:
+                batch['error'] = e
+            finally:
+                batch['done'].set()
+        elif not batch['done'].wait(timeout=30):
+            raise TimeoutError(f"Timed out waiting for profile batch for user {user_id}")
+        
+        if batch['error'] is not None:
+            raise batch['error']
+        return batch['profiles'].get(user_id.int)
+    
+    @classmethod
+    def _remember_profile(cls, user_id: UUID, tier: Optional[str], searches_used: Optional[int]) -> Tuple[str, int]:
+        """Normalize and cache a profile row's tier/usage (plus usage not yet flushed)"""
+        profile = (tier or 'free', (searches_used or 0) + _usage_flusher.pending().get(str(user_id), 0))
+        cls._profile_cache.set(user_id.int, profile)
+        cls._quota_cache.pop(user_id.int)
+        return profile
+    
+    @classmethod
+    def _decode_token(cls, token: str) -> Tuple[Optional[dict], bool]:
+        """
+        Verify a Supabase access token locally with the project JWT secret.
+        
+        Returns:
+            (claims, rejected) - claims if the token verified; rejected is True
+            when the token is definitely invalid (undecodable or expired), so
+            there's no point asking Supabase Auth
+        """
+        if not cls.JWT_SECRET:
+            # Can't verify the signature here, but can still spot dead tokens
+            try:
+                exp = jwt.get_unverified_claims(token).get('exp')
+            except JWTError:
+                return None, True
+            return None, isinstance(exp, (int, float)) and exp <= time.time()
+        
+        try:
+            claims = jwt.decode(token, cls.JWT_SECRET, algorithms=['HS256'], audience=cls.JWT_AUDIENCE)
+        except ExpiredSignatureError:
+            return None, True
+        except JWTError as e:
+            # e.g. a token signed with an asymmetric project key
+            logger.debug(f"Local JWT verification failed, falling back to Supabase Auth: {e}")
+            return None, False
+        
+        return (claims, False) if claims.get('sub') else (None, False)
+    
+    @classmethod
+    def _get_or_init_profile(cls, client: Client, user_id: UUID, user_email: str) -> Tuple[str, int]:
+        """
+        (subscription_tier, searches_used_this_month) for a user, creating a
+        default profile if there is none.
+        """
+        try:
+            # Single atomic round-trip (see get_or_init_profile in migrations.sql)
+            result = cls._call_rpc(client, 'get_or_init_profile', {
+                'p_user_id': str(user_id),
+                'p_email': user_email
+            })
+            if result.data:
+                row = result.data[0]
+                return cls._remember_profile(user_id, row.get('subscription_tier'), row.get('searches_used_this_month'))
+        except Exception as rpc_error:
+            cls._log_rpc_fallback(rpc_error, "RPC function not available, using fallback method")
+        
+        cached_profile = cls._get_profile_cached(client, user_id)
+        if cached_profile is not None:
+            return cached_profile
+        
+        # Actually create default profile entry in database if missing
+        try:
+            client.table('profiles').insert({
+                'id': str(user_id),
+                'email': user_email,
+                'subscription_tier': 'free',
+                'searches_used_this_month': 0
+            }).execute()
+            return cls._remember_profile(user_id, 'free', 0)
+        except Exception as e:
+            # If insert fails (e.g., profile exists but query failed), try to get it again
+            logger.warning(f"Could not create profile, trying to fetch again: {e}")
+            cached_profile = cls._get_profile_cached(client, user_id)
+            if cached_profile is not None:
+                return cached_profile
+            # Fallback to defaults if still can't get profile
+            return 'free', 0
+    
+    @classmethod
+    def _token_cache_ttl(cls, token: str, claims: Optional[dict]) -> float:
+        """Seconds a verified token may stay cached: TOKEN_CACHE_TTL, capped at its expiry"""
+        try:
+            exp = (claims or jwt.get_unverified_claims(token)).get('exp')
+        except JWTError:
+            exp = None
+        if exp is None:
+            return cls.TOKEN_CACHE_TTL
+        return min(cls.TOKEN_CACHE_TTL, exp - time.time())
     
     @classmethod
     def validate_user_token(cls, token: str) -> Optional[UserContext]:
@@ -61,80 +318,67 @@ class UserService:
         Returns:
             UserContext if valid, None if invalid
         """
-        if not token:
+        if not token or not _JWT_SHAPE_RE.match(token):
             return None
         
-        client = get_client()
-        
         try:
-            # Verify token using Supabase Auth
-            # The get_user method validates the token and returns user info
-            response = client.auth.get_user(token)
-            
-            if not response or not response.user:
-                return None
-            
-            user_id = UUID(response.user.id)
-            
-            # Get user profile and subscription tier
-            profile_result = client.table('profiles').select('id, subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
+            token_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+            identity = cls._token_cache.get(token_key)
             
-            if not profile_result.data:
-                # Actually create default profile entry in database if missing
-                try:
-                    # Get user email from auth response
-                    user_email = response.user.email or ''
-                    client.table('profiles').insert({
-                        'id': str(user_id),
-                        'email': user_email,
-                        'subscription_tier': 'free',
-                        'searches_used_this_month': 0
-                    }).execute()
-                    tier = 'free'
-                    searches_used = 0
-                except Exception as e:
-                    # If insert fails (e.g., profile exists but query failed), try to get it again
-                    logger.warning(f"Could not create profile, trying to fetch again: {e}")
-                    profile_result = client.table('profiles').select('id, subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
-                    if profile_result.data:
-                        profile = profile_result.data[0]
-                        tier = profile.get('subscription_tier') or 'free'
-                        searches_used = profile.get('searches_used_this_month')
-                        if searches_used is None:
-                            searches_used = 0
-                    else:
-                        # Fallback to defaults if still can't get profile
-                        tier = 'free'
-                        searches_used = 0
+            if identity is not None:
+                user_id, user_email = identity
             else:
-                profile = profile_result.data[0]
-                tier = profile.get('subscription_tier', 'free') or 'free'
-                searches_used = profile.get('searches_used_this_month')
-                if searches_used is None:
-                    searches_used = 0
+                claims, rejected = cls._decode_token(token)
+                if rejected:
+                    return None
+                
+                if claims:
+                    user_id = UUID(claims['sub'])
+                    user_email = claims.get('email') or ''
+                else:
+                    # Verify token using Supabase Auth
+                    # The get_user method validates the token and returns user info
+                    response = get_client().auth.get_user(token)
+                    
+                    if not response or not response.user:
+                        return None
+                    
+                    user_id = UUID(response.user.id)
+                    user_email = response.user.email or ''
+                
+                ttl = cls._token_cache_ttl(token, claims)
+                if ttl > 0:
+                    cls._token_cache.set(token_key, (user_id, user_email), ttl_seconds=ttl)
             
-            tier_config = cls.TIER_CONFIGS.get(tier, cls.TIER_CONFIGS['free'])
+            # Get user profile and subscription tier (creating it if missing)
+            cached_profile = cls._profile_cache.get(user_id.int)
+            if cached_profile is None:
+                cached_profile = cls._get_or_init_profile(get_client(), user_id, user_email)
+            tier, searches_used = cached_profile
             
             return UserContext(
                 user_id=user_id,
                 tier=tier,
-                searches_per_month=tier_config['searches_per_month'],
+                searches_per_month=cls._SEARCHES_BY_TIER.get(tier, cls._FREE_SEARCHES),
                 searches_used_this_month=searches_used,
-                rate_limit_per_minute=tier_config['rate_limit_per_minute']
+                rate_limit_per_minute=cls._RATE_LIMIT_BY_TIER.get(tier, cls._FREE_RATE)
             )
             
         except Exception as e:
-            logger.error(f"Error validating user token: {e}", exc_info=True)
+            _log_request_failure(logging.ERROR, "Error validating user token", e)
             return None
     
     @classmethod
-    def check_rate_limit(cls, user_id: UUID) -> Tuple[bool, Optional[dict]]:
+    def check_rate_limit(cls, user_id: UUID, tier: Optional[str] = None) -> Tuple[bool, Optional[dict]]:
         """
         Check if user is within rate limit using database-backed rate limiting.
-        Does NOT increment counter. Call increment_rate_limit() after successful request.
+        With the try_acquire_rate_limit function installed the request is
+        counted here and the following increment_rate_limit() is a no-op;
+        otherwise call increment_rate_limit() after successful request.
         
         Args:
             user_id: User UUID
+            tier: User's subscription tier, if already known (e.g. from UserContext)
             
         Returns:
             (is_allowed, error_details) - error_details if not allowed
@@ -143,8 +387,8 @@ class UserService:
         
         try:
             # Get user tier for rate limit
-            result = client.table('profiles').select('subscription_tier').eq('id', str(user_id)).execute()
-            if not result.data:
+            cached_profile = (tier, 0) if tier else cls._get_profile_cached(client, user_id)
+            if cached_profile is None:
                 # If profile doesn't exist, create it with defaults
                 try:
                     client.table('profiles').insert({
@@ -156,34 +400,64 @@ class UserService:
                     logger.error(f"Error creating profile in check_rate_limit: {e}", exc_info=True)
                     return False, {'message': 'User profile not found and could not be created'}
             else:
-                tier = result.data[0].get('subscription_tier') or 'free'
+                tier = cached_profile[0]
+            
+            rate_limit = cls._RATE_LIMIT_BY_TIER.get(tier, cls._FREE_RATE)
             
-            rate_limit = cls.TIER_CONFIGS.get(tier, cls.TIER_CONFIGS['free'])['rate_limit_per_minute']
+            # This host's requests alone can only undercount the global
+            # window, so a host-wide counter at the limit denies without a
+            # database round-trip (and, in local mode, decides either way)
+            now_ts = time.time()
+            cache_entry = cls._local_rate_count(user_id, now_ts)
+            if cache_entry['count'] >= rate_limit:
+                reset_in = int(cache_entry['reset_at'] - now_ts)
+                return False, {
+                    'message': f'Rate limit exceeded. Try again in {reset_in} seconds.',
+                    'reset_in_seconds': max(1, reset_in),
+                    'limit': rate_limit
+                }
+            if cls.RATE_LIMIT_MODE == 'local':
+                return True, None
             
             # Calculate current window (minute-based)
-            now = datetime.utcnow()
-            window_start = now.replace(second=0, microsecond=0)
-            reset_at = window_start + timedelta(minutes=1)
+            window_start, reset_at = cls._window_bounds(cache_entry['window'])
+            reset_in_seconds = int(cache_entry['reset_at'] - now_ts)
+            
+            # Check and count the request in one atomic round-trip; the
+            # matching increment_rate_limit() call then has nothing left to do
+            acquired = cls._try_acquire_rate_limit(client, user_id, window_start, reset_at, rate_limit)
+            if acquired is not None:
+                allowed, request_count = acquired
+                if not allowed:
+                    return False, {
+                        'message': f'Rate limit exceeded. Try again in {reset_in_seconds} seconds.',
+                        'reset_in_seconds': max(1, reset_in_seconds),
+                        'limit': rate_limit
+                    }
+                with cls._acquired_lock:
+                    cls._acquired_requests.set(user_id.int, cls._acquired_requests.get(user_id.int, 0) + 1)
+                cls._bump_local_rate_count(user_id)
+                return True, None
             
             # Try to get or create rate limit record using database function
             # This ensures atomicity across all instances
             try:
                 # Use RPC function for atomic get-or-create
-                rpc_result = client.rpc(
+                rpc_result = cls._call_rpc(
+                    client,
                     'get_or_create_rate_limit',
                     {
                         'p_user_id': str(user_id),
-                        'p_window_start': window_start.isoformat(),
-                        'p_reset_at': reset_at.isoformat()
+                        'p_window_start': window_start,
+                        'p_reset_at': reset_at
                     }
-                ).execute()
+                )
                 
                 if rpc_result.data and len(rpc_result.data) > 0:
                     request_count = rpc_result.data[0].get('request_count', 0)
                     
                     # Check if limit exceeded
                     if request_count >= rate_limit:
-                        reset_in_seconds = int((reset_at - now).total_seconds())
                         return False, {
                             'message': f'Rate limit exceeded. Try again in {reset_in_seconds} seconds.',
                             'reset_in_seconds': max(1, reset_in_seconds),
@@ -191,16 +465,15 @@ class UserService:
                         }
             except Exception as rpc_error:
                 # If RPC function doesn't exist, fall back to manual query/insert
-                logger.warning(f"RPC function not available, using fallback method: {rpc_error}")
+                cls._log_rpc_fallback(rpc_error, "RPC function not available, using fallback method")
                 
                 # Try to get existing record
-                existing = client.table('rate_limits').select('request_count').eq('user_id', str(user_id)).eq('window_start', window_start.isoformat()).execute()
+                existing = client.table('rate_limits').select('request_count').eq('user_id', str(user_id)).eq('window_start', window_start).execute()
                 
                 if existing.data and len(existing.data) > 0:
                     request_count = existing.data[0].get('request_count', 0)
                     
                     if request_count >= rate_limit:
-                        reset_in_seconds = int((reset_at - now).total_seconds())
                         return False, {
                             'message': f'Rate limit exceeded. Try again in {reset_in_seconds} seconds.',
                             'reset_in_seconds': max(1, reset_in_seconds),
@@ -211,28 +484,101 @@ class UserService:
                     # Don't count this as a request yet
                     pass
             
-            # Also check local cache for hot path optimization
-            now_ts = time.time()
-            if user_id in cls._rate_limit_cache:
-                cache_entry = cls._rate_limit_cache[user_id]
-                if now_ts >= cache_entry['reset_at']:
-                    # Cache expired, remove it
-                    del cls._rate_limit_cache[user_id]
-                elif cache_entry['count'] >= rate_limit:
-                    # Local cache shows limit exceeded (defensive check)
-                    reset_in = int(cache_entry['reset_at'] - now_ts)
-                    return False, {
-                        'message': f'Rate limit exceeded. Try again in {reset_in} seconds.',
-                        'reset_in_seconds': max(1, reset_in),
-                        'limit': rate_limit
-                    }
-            
             return True, None
             
         except Exception as e:
-            logger.error(f"Error in check_rate_limit: {e}", exc_info=True)
+            _log_request_failure(logging.ERROR, "Error in check_rate_limit", e)
             return False, {'message': f'Database error: {str(e)}'}
     
+    @classmethod
+    def _try_acquire_rate_limit(cls, client: Client, user_id: UUID, window_start: str,
+                                reset_at: str, rate_limit: int) -> Optional[Tuple[bool, int]]:
+        """
+        Count a request if the user is under their limit, atomically.
+        
+        Returns:
+            (allowed, request_count), or None if try_acquire_rate_limit isn't installed
+        """
+        try:
+            result = cls._call_rpc(
+                client,
+                'try_acquire_rate_limit',
+                {
+                    'p_user_id': str(user_id),
+                    'p_window_start': window_start,
+                    'p_reset_at': reset_at,
+                    'p_limit': rate_limit
+                }
+            )
+        except Exception as e:
+            cls._log_rpc_fallback(e, "try_acquire_rate_limit not available, using check/increment")
+            return None
+        
+        row = result.data[0] if result.data else {}
+        return bool(row.get('allowed')), row.get('request_count') or 0
+    
+    @classmethod
+    def _consume_acquired(cls, user_id: UUID) -> bool:
+        """Take one request already counted by check_rate_limit, if any"""
+        with cls._acquired_lock:
+            pending = cls._acquired_requests.get(user_id.int, 0)
+            if not pending:
+                return False
+            if pending == 1:
+                cls._acquired_requests.pop(user_id.int)
+            else:
+                cls._acquired_requests.set(user_id.int, pending - 1)
+            return True
+    
+    @classmethod
+    def _window_bounds(cls, window: int) -> Tuple[str, str]:
+        """ISO (window_start, reset_at) of a rate-limit window number"""
+        return _window_timestamps(window * cls.RATE_LIMIT_WINDOW_SECONDS, cls.RATE_LIMIT_WINDOW_SECONDS)
+    
+    @classmethod
+    def _rate_limit_key(cls, user_id: UUID, window: int) -> str:
+        """Disk cache key of a user's counter for one minute window"""
+        return f"rate_limit:{user_id}:{window}"
+    
+    @classmethod
+    def _local_rate_count(cls, user_id: UUID, now_ts: float) -> dict:
+        """This window's request count for a user across all workers on this host"""
+        window = int(now_ts // cls.RATE_LIMIT_WINDOW_SECONDS)
+        cache_entry = cls._rate_limit_cache.get(user_id.int)
+        if cache_entry is None or cache_entry['window'] != window:
+            cache_entry = {
+                'count': get_cache().get_counter(cls._rate_limit_key(user_id, window)),
+                'reset_at': (window + 1) * cls.RATE_LIMIT_WINDOW_SECONDS,
+                'window': window
+            }
+            cls._rate_limit_cache.set(user_id.int, cache_entry)
+        return cache_entry
+    
+    @classmethod
+    def _bump_local_rate_count(cls, user_id: UUID) -> int:
+        """Count a request in the host-wide counter; returns its window"""
+        window = int(time.time() // cls.RATE_LIMIT_WINDOW_SECONDS)
+        count = get_cache().incr(cls._rate_limit_key(user_id, window), expire_seconds=2 * cls.RATE_LIMIT_WINDOW_SECONDS)
+        cls._rate_limit_cache.set(user_id.int, {
+            'count': count,
+            'reset_at': (window + 1) * cls.RATE_LIMIT_WINDOW_SECONDS,
+            'window': window
+        })
+        return window
+    
+    @classmethod
+    def _flush_rate_limits(cls, counts: dict):
+        """Persist a batch of {(user_id, window): count} local rate-limit counts"""
+        rows = [
+            {
+                'user_id': user_id,
+                'window_start': cls._window_bounds(window)[0],
+                'count': count
+            }
+            for (user_id, window), count in counts.items()
+        ]
+        cls._call_rpc(get_client(), 'flush_rate_limits', {'p_rows': rows})
+    
     @classmethod
     def increment_rate_limit(cls, user_id: UUID):
         """
@@ -242,93 +588,93 @@ class UserService:
         Args:
             user_id: User UUID
         """
+        if cls.RATE_LIMIT_MODE == 'local':
+            window = cls._bump_local_rate_count(user_id)
+            _rate_limit_flusher.add((str(user_id), window))
+            return
+        
+        if cls._consume_acquired(user_id):
+            # Already counted when check_rate_limit acquired it
+            return
+        
         client = get_client()
         
         try:
             # Calculate current window (minute-based)
-            now = datetime.utcnow()
-            window_start = now.replace(second=0, microsecond=0)
-            reset_at = window_start + timedelta(minutes=1)
+            window_start, reset_at = cls._window_bounds(int(time.time() // cls.RATE_LIMIT_WINDOW_SECONDS))
             
             # Try to use RPC function for atomic increment
             try:
-                new_count = client.rpc(
+                new_count = cls._call_rpc(
+                    client,
                     'increment_rate_limit',
                     {
                         'p_user_id': str(user_id),
-                        'p_window_start': window_start.isoformat()
+                        'p_window_start': window_start
                     }
-                ).execute()
+                )
                 
                 # If RPC fails (record doesn't exist), create it
                 if not new_count.data or (isinstance(new_count.data, int) and new_count.data == 0):
                     # Create record if it doesn't exist
                     client.table('rate_limits').upsert({
                         'user_id': str(user_id),
-                        'window_start': window_start.isoformat(),
+                        'window_start': window_start,
                         'request_count': 1,
-                        'reset_at': reset_at.isoformat()
+                        'reset_at': reset_at
                     }).execute()
             except Exception as rpc_error:
                 # Fallback to manual upsert if RPC doesn't exist
-                logger.warning(f"RPC function not available, using fallback method: {rpc_error}")
+                cls._log_rpc_fallback(rpc_error, "RPC function not available, using fallback method")
                 
                 # Get existing or create new
-                existing = client.table('rate_limits').select('request_count').eq('user_id', str(user_id)).eq('window_start', window_start.isoformat()).execute()
+                existing = client.table('rate_limits').select('request_count').eq('user_id', str(user_id)).eq('window_start', window_start).execute()
                 
                 if existing.data and len(existing.data) > 0:
                     current_count = existing.data[0].get('request_count', 0)
                     client.table('rate_limits').update({
                         'request_count': current_count + 1,
-                        'updated_at': now.isoformat()
-                    }).eq('user_id', str(user_id)).eq('window_start', window_start.isoformat()).execute()
+                        'updated_at': datetime.utcnow().isoformat()
+                    }).eq('user_id', str(user_id)).eq('window_start', window_start).execute()
                 else:
                     client.table('rate_limits').insert({
                         'user_id': str(user_id),
-                        'window_start': window_start.isoformat(),
+                        'window_start': window_start,
                         'request_count': 1,
-                        'reset_at': reset_at.isoformat()
+                        'reset_at': reset_at
                     }).execute()
             
-            # Update local cache for hot path
-            now_ts = time.time()
-            if user_id in cls._rate_limit_cache:
-                cache_entry = cls._rate_limit_cache[user_id]
-                if now_ts < cache_entry['reset_at']:
-                    cache_entry['count'] += 1
-                else:
-                    # Reset cache for new window
-                    cls._rate_limit_cache[user_id] = {
-                        'count': 1,
-                        'reset_at': now_ts + 60
-                    }
-            else:
-                cls._rate_limit_cache[user_id] = {
-                    'count': 1,
-                    'reset_at': now_ts + 60
-                }
+            # Update the host-wide counter for hot path
+            cls._bump_local_rate_count(user_id)
             
         except Exception as e:
-            logger.error(f"Error incrementing rate limit: {e}", exc_info=True)
+            _log_request_failure(logging.WARNING, "Error incrementing rate limit", e)
             # Don't fail the request if rate limit increment fails
     
     @classmethod
-    def check_quota(cls, user_id: UUID) -> Tuple[bool, Optional[dict]]:
+    def check_quota(cls, user_id: UUID, context: Optional[UserContext] = None) -> Tuple[bool, Optional[dict]]:
         """
         Check if user has remaining quota.
         
         Args:
             user_id: User UUID
+            context: UserContext already loaded for this request, if any
+                (its tier and usage are used instead of reading the profile)
             
         Returns:
             (has_quota, error_details) - error_details if no quota
         """
-        client = get_client()
+        if context is not None and context.searches_per_month == -1:
+            return True, None
         
         try:
-            result = client.table('profiles').select('subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
+            if context is not None:
+                cached_profile = (context.tier, context.searches_used_this_month)
+            else:
+                client = get_client()
+                cached_profile = cls._get_profile_cached(client, user_id)
             
-            if not result.data:
+            if cached_profile is None:
                 # If profile doesn't exist, create it with defaults
                 try:
                     client.table('profiles').insert({
@@ -343,13 +689,9 @@ class UserService:
                     logger.error(f"Error creating profile in check_quota: {e}", exc_info=True)
                     return False, {'message': 'User profile not found and could not be created'}
             else:
-                tier = result.data[0].get('subscription_tier') or 'free'
-                searches_used = result.data[0].get('searches_used_this_month')
-                if searches_used is None:
-                    searches_used = 0
+                tier, searches_used = cached_profile
             
-            tier_config = cls.TIER_CONFIGS.get(tier, cls.TIER_CONFIGS['free'])
-            searches_per_month = tier_config['searches_per_month']
+            searches_per_month = cls._SEARCHES_BY_TIER.get(tier, cls._FREE_SEARCHES)
             
             # -1 means unlimited
             if searches_per_month == -1:
@@ -373,64 +715,129 @@ class UserService:
             return True, None
             
         except Exception as e:
-            logger.error(f"Error in check_quota: {e}", exc_info=True)
+            _log_request_failure(logging.ERROR, "Error in check_quota", e)
             return False, {'message': f'Database error: {str(e)}'}
     
     @classmethod
-    def increment_usage(cls, user_id: UUID):
-        """Increment search usage for a user. Skip for enterprise unlimited users."""
+    def increment_usage(cls, user_id: UUID, tier: Optional[str] = None):
+        """
+        Increment search usage for a user. Skip for enterprise unlimited users.
+        
+        Queued in memory and written in batches by a background flusher
+        (see _flush_usage), so the request path does no DB I/O.
+        
+        Args:
+            user_id: User UUID
+            tier: User's subscription tier, if already known (e.g. from UserContext)
+        """
+        with cls._usage_lock:
+            cached_profile = cls._profile_cache.get(user_id.int)
+            tier = tier or (cached_profile[0] if cached_profile is not None else None)
+            
+            # Skip increment for enterprise unlimited users (when the tier is known)
+            if tier is not None and cls._SEARCHES_BY_TIER.get(tier, cls._FREE_SEARCHES) == -1:
+                logger.debug(f"Skipping usage increment for enterprise user {user_id} (unlimited quota)")
+                return
+            
+            _usage_flusher.add(str(user_id))
+            
+            # Keep a cached profile's usage current until the batch is written
+            if cached_profile is not None:
+                cls._profile_cache.set(user_id.int, (cached_profile[0], cached_profile[1] + 1))
+        cls._quota_cache.pop(user_id.int)
+    
+    @classmethod
+    def _flush_usage(cls, counts: dict):
+        """Persist a batch of {user_id: count} search usage increments"""
         client = get_client()
         
         try:
-            # Check if user has unlimited quota (enterprise tier)
-            result = client.table('profiles').select('subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
-            
-            if result.data:
-                tier = result.data[0].get('subscription_tier') or 'free'
-                tier_config = cls.TIER_CONFIGS.get(tier, cls.TIER_CONFIGS['free'])
-                
-                # Skip increment for enterprise unlimited users
-                if tier_config['searches_per_month'] == -1:
-                    logger.debug(f"Skipping usage increment for enterprise user {user_id} (unlimited quota)")
-                    return
-                
-                current = result.data[0].get('searches_used_this_month')
-                if current is None:
-                    current = 0
-                client.table('profiles').update({
-                    'searches_used_this_month': current + 1
-                }).eq('id', str(user_id)).execute()
-                
-                logger.debug(f"Incremented usage for user {user_id}: {current + 1}")
+            # One statement for the whole batch (see migrations.sql)
+            cls._call_rpc(client, 'batch_increment_user_searches', {
+                'p_ids': list(counts),
+                'p_counts': list(counts.values())
+            })
+            return
+        except Exception as rpc_error:
+            cls._log_rpc_fallback(rpc_error, "batch_increment_user_searches RPC not available, using fallback")
+        
+        for user_id, count in counts.items():
+            try:
+                cls._increment_usage_now(client, user_id, count)
+            except Exception as e:
+                _log_request_failure(logging.WARNING, "Error incrementing user usage", e)
+    
+    @classmethod
+    def _increment_usage_now(cls, client: Client, user_id: str, count: int = 1):
+        """Apply one user's usage increment directly"""
+        if count == 1:
+            try:
+                # Atomic UPDATE ... RETURNING (see increment_user_search in migrations.sql)
+                result = cls._call_rpc(client, 'increment_user_search', {'p_user_id': user_id})
+            except Exception as rpc_error:
+                cls._log_rpc_fallback(rpc_error, "RPC function not available, using fallback method")
             else:
-                # Create profile if it doesn't exist
-                client.table('profiles').insert({
-                    'id': str(user_id),
-                    'searches_used_this_month': 1,
-                    'subscription_tier': 'free'
-                }).execute()
-                logger.debug(f"Created profile and incremented usage for user {user_id}")
-        except Exception as e:
-            logger.error(f"Error incrementing user usage: {e}", exc_info=True)
+                if result.data is not None:
+                    logger.debug(f"Incremented usage for user {user_id}: {result.data}")
+                else:
+                    # Create profile if it doesn't exist
+                    client.table('profiles').insert({
+                        'id': user_id,
+                        'searches_used_this_month': 1,
+                        'subscription_tier': 'free'
+                    }).execute()
+                    logger.debug(f"Created profile and incremented usage for user {user_id}")
+                return
+        
+        cls._increment_usage_fallback(client, user_id, count)
+    
+    @classmethod
+    def _increment_usage_fallback(cls, client: Client, user_id: str, count: int = 1):
+        """Read-then-write usage increment for databases without increment_user_search"""
+        result = client.table('profiles').select('subscription_tier, searches_used_this_month').eq('id', user_id).execute()
+        
+        if result.data:
+            tier = result.data[0].get('subscription_tier') or 'free'
+            # Skip increment for enterprise unlimited users
+            if cls._SEARCHES_BY_TIER.get(tier, cls._FREE_SEARCHES) == -1:
+                logger.debug(f"Skipping usage increment for enterprise user {user_id} (unlimited quota)")
+                return
+            
+            current = result.data[0].get('searches_used_this_month')
+            if current is None:
+                current = 0
+            client.table('profiles').update({
+                'searches_used_this_month': current + count
+            }).eq('id', user_id).execute()
+            
+            logger.debug(f"Incremented usage for user {user_id}: {current + count}")
+        else:
+            # Create profile if it doesn't exist
+            client.table('profiles').insert({
+                'id': user_id,
+                'searches_used_this_month': count,
+                'subscription_tier': 'free'
+            }).execute()
+            logger.debug(f"Created profile and incremented usage for user {user_id}")
     
     @classmethod
     def get_user_quota(cls, user_id: UUID) -> dict:
         """Get remaining quota information for a user"""
+        cached_quota = cls._quota_cache.get(user_id.int)
+        if cached_quota is not None:
+            return dict(cached_quota)
+        
         client = get_client()
         
         try:
-            result = client.table('profiles').select('subscription_tier, searches_used_this_month').eq('id', str(user_id)).execute()
+            cached_profile = cls._get_profile_cached(client, user_id)
             
-            if not result.data:
+            if cached_profile is None:
                 return {'error': 'User profile not found'}
             
-            tier = result.data[0].get('subscription_tier') or 'free'
-            searches_used = result.data[0].get('searches_used_this_month')
-            if searches_used is None:
-                searches_used = 0
+            tier, searches_used = cached_profile
             
-            tier_config = cls.TIER_CONFIGS.get(tier, cls.TIER_CONFIGS['free'])
-            searches_per_month = tier_config['searches_per_month']
+            searches_per_month = cls._SEARCHES_BY_TIER.get(tier, cls._FREE_SEARCHES)
             
             if searches_per_month == -1:
                 # Enterprise unlimited: show large number instead of -1
@@ -440,14 +847,16 @@ class UserService:
                 searches_remaining = max(0, searches_per_month - searches_used)
                 unlimited = False
             
-            return {
+            quota = {
                 'tier': tier,
                 'searches_per_month': searches_per_month,
                 'searches_used_this_month': searches_used,
                 'searches_remaining': searches_remaining,
                 'unlimited': unlimited,
-                'rate_limit_per_minute': tier_config['rate_limit_per_minute']
+                'rate_limit_per_minute': cls._RATE_LIMIT_BY_TIER.get(tier, cls._FREE_RATE)
             }
+            cls._quota_cache.set(user_id.int, quota)
+            return dict(quota)
             
         except Exception as e:
             return {'error': f'Database error: {str(e)}'}
@@ -464,7 +873,25 @@ class UserService:
             client.table('profiles').update({
                 'subscription_tier': tier
             }).eq('id', str(user_id)).execute()
+            cls._profile_cache.pop(user_id.int)
+            cls._quota_cache.pop(user_id.int)
         except Exception as e:
             logger.error(f"Error updating subscription tier: {e}", exc_info=True)
             raise
 
+
+# Search usage increments, written to profiles in batches
+_usage_flusher = BatchedCounter(
+    lambda counts: UserService._flush_usage(counts),
+    flush_interval=1.0,
+    max_pending=500,
+    name="user-usage"
+)
+
+# Local-mode rate-limit counts, synced to rate_limits in batches
+_rate_limit_flusher = BatchedCounter(
+    lambda counts: UserService._flush_rate_limits(counts),
+    flush_interval=20.0,
+    max_pending=1000,
+    name="rate-limit-flush"
+)
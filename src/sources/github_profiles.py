@@ -1,6 +1,7 @@
 """Search GitHub for company employees"""
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 from bs4 import BeautifulSoup
 from src.models.person import Person, PersonCategory
@@ -8,6 +9,9 @@ from src.utils.http_client import create_client
 from src.utils.rate_limiter import get_rate_limiter
 
 
+_MEMBER_HREF_RE = re.compile(r'^/[^/]+$')
+
+
 class GitHubScraper:
     """
     Search GitHub for employees of a company.
@@ -16,6 +20,9 @@ class GitHubScraper:
     Particularly useful for technical roles.
     """
     
+    # Concurrent member-profile fetches (still paced by the "github" rate limit)
+    MAX_PROFILE_WORKERS = 10
+    
     def __init__(self):
         self.http_client = create_client()
         self.rate_limiter = get_rate_limiter()
@@ -65,18 +72,26 @@ class GitHubScraper:
                 url = f"https://github.com/orgs/{org_name}/people"
                 response = self.http_client.get(url)
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.text, 'lxml')
                 
                 # Find member links
-                member_links = soup.find_all('a', href=re.compile(r'^/[^/]+$'))
+                member_links = [
+                    link for link in soup.select('a[href^="/"]')
+                    if _MEMBER_HREF_RE.match(link['href'])
+                ]
                 
-                for link in member_links[:50]:  # Limit results
-                    username = link.get('href').strip('/')
-                    
-                    # Get user profile
-                    user_info = self._get_user_profile(username, company)
-                    if user_info:
-                        people.append(user_info)
+                usernames = [link['href'].strip('/') for link in member_links[:50]]  # Limit results
+                
+                # Get user profiles - overlap the page fetches instead of
+                # waiting on each one in turn; results keep member order
+                if usernames:
+                    workers = min(self.MAX_PROFILE_WORKERS, len(usernames))
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        profiles = executor.map(
+                            lambda username: self._get_user_profile(username, company),
+                            usernames
+                        )
+                        people.extend(user_info for user_info in profiles if user_info)
                 
                 if people:
                     print(f"✓ Found {len(people)} members in GitHub org '{org_name}'")
@@ -101,12 +116,12 @@ class GitHubScraper:
             url = f"https://github.com/search?q={search_query}&type=users"
             
             response = self.http_client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # Find user results
-            user_results = soup.find_all('div', class_=re.compile(r'user-list-item'))
+            user_results = soup.select('div[class*="user-list-item"]', limit=20)
             
-            for result in user_results[:20]:  # Limit results
+            for result in user_results:
                 person = self._parse_user_result(result, company)
                 if person:
                     people.append(person)
@@ -123,18 +138,18 @@ class GitHubScraper:
         try:
             url = f"https://github.com/{username}"
             response = self.http_client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # Get name
-            name_elem = soup.find('span', class_=re.compile(r'vcard-fullname'))
+            name_elem = soup.select_one('span[class*="vcard-fullname"]')
             name = name_elem.get_text(strip=True) if name_elem else username
             
             # Get bio (may contain title/role)
-            bio_elem = soup.find('div', class_=re.compile(r'user-profile-bio'))
+            bio_elem = soup.select_one('div[class*="user-profile-bio"]')
             bio = bio_elem.get_text(strip=True) if bio_elem else ""
             
             # Get company from profile
-            company_elem = soup.find('span', class_='p-org')
+            company_elem = soup.select_one('span.p-org')
             profile_company = company_elem.get_text(strip=True) if company_elem else None
             
             # Only include if company matches
@@ -157,7 +172,7 @@ class GitHubScraper:
         """Parse a user from search results"""
         try:
             # Get username and link
-            link_elem = result_elem.find('a', class_=re.compile(r'user'))
+            link_elem = result_elem.select_one('a[class*="user"]')
             if not link_elem:
                 return None
             
@@ -169,7 +184,7 @@ class GitHubScraper:
             name = name_elem.get_text(strip=True) if name_elem else username
             
             # Get bio snippet
-            bio_elem = result_elem.find('p', class_=re.compile(r'bio'))
+            bio_elem = result_elem.select_one('p[class*="bio"]')
             bio = bio_elem.get_text(strip=True) if bio_elem else ""
             
             return Person(
@@ -2,14 +2,26 @@
 
 import os
 import re
+from datetime import timedelta
 from typing import List, Optional
 from urllib.parse import quote_plus, urlparse, parse_qs
 from bs4 import BeautifulSoup
 import requests
 from src.models.person import Person, PersonCategory
-from src.utils.http_client import create_client
+from src.utils.http_client import create_client, read_until
 from src.utils.rate_limiter import get_rate_limiter
 from src.utils.cost_tracker import get_cost_tracker
+from src.utils.cache import get_cache
+
+
+# Patterns used for every SERP result - compiled once at import
+_LINKEDIN_SUFFIX_RE = re.compile(r'\s*\|\s*LinkedIn.*$')
+_TITLE_SEPARATOR_RE = re.compile(r'\s*[-|]\s*')
+_NON_TITLE_RE = re.compile(r'linkedin|profile|professional')
+_SNIPPET_TITLE_RE = re.compile(r'is (?:a|an|the) ([^.]+) at', re.IGNORECASE)
+
+# Raw SERP responses are reused across companies/searches for a short while
+SERP_CACHE_TTL = timedelta(minutes=10)
 
 
 class GoogleSearchScraper:
@@ -24,6 +36,7 @@ class GoogleSearchScraper:
         self.http_client = create_client()
         self.rate_limiter = get_rate_limiter()
         self.cost_tracker = get_cost_tracker()
+        self.cache = get_cache()
         
         # Configure rate limiting
         self.rate_limiter.configure("google_serp", requests_per_second=0.5)
@@ -47,30 +60,38 @@ class GoogleSearchScraper:
     
     def _search_with_api(self, company: str, title: str) -> List[Person]:
         """Search using SerpAPI (recommended)"""
-        self.rate_limiter.wait_if_needed("google_serp")
-        
         # Build search query
         query = f'site:linkedin.com/in/ "{company}" "{title}" -intitle:jobs'
+        cache_query = {"q": query, "num": 20}
         
         try:
-            response = requests.get(
-                "https://serpapi.com/search",
-                params={
-                    "q": query,
-                    "api_key": self.api_key,
-                    "num": 20,
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
+            organic_results = self.cache.get("serpapi", cache_query, ttl=SERP_CACHE_TTL)
             
-            # Track cost (free tier)
-            self.cost_tracker.record_request("google_serp", cost=0.0)
+            if organic_results is None:
+                self.rate_limiter.wait_if_needed("google_serp")
+                
+                response = requests.get(
+                    "https://serpapi.com/search",
+                    params={
+                        "q": query,
+                        "api_key": self.api_key,
+                        "num": 20,
+                    },
+                    timeout=30
+                )
+                response.raise_for_status()
+                data = response.json()
+                
+                # Track cost (free tier)
+                self.cost_tracker.record_request("google_serp", cost=0.0)
+                
+                organic_results = data.get("organic_results", [])
+                if organic_results:
+                    self.cache.set("serpapi", cache_query, organic_results)
             
             # Parse results
             people = []
-            for result in data.get("organic_results", []):
+            for result in organic_results:
                 person = self._parse_serp_result(result, company, title)
                 if person:
                     people.append(person)
@@ -96,14 +117,16 @@ class GoogleSearchScraper:
         url = f"https://www.google.com/search?q={quote_plus(query)}&num=20"
         
         try:
-            response = self.http_client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Stop downloading once the first 20 result blocks (one <h3> each) are in
+            response = self.http_client.get(url, stream=True)
+            html = read_until(response, b'<h3', max_hits=20)
+            soup = BeautifulSoup(html, 'lxml')
             
             # Find search results
             people = []
-            results = soup.find_all('div', class_='g')
+            results = soup.select('div.g', limit=20)
             
-            for result in results[:20]:
+            for result in results:
                 person = self._parse_google_result(result, company, title)
                 if person:
                     people.append(person)
@@ -174,7 +197,7 @@ class GoogleSearchScraper:
             result_title = title_elem.get_text(strip=True)
             
             # Find snippet
-            snippet_elem = result_elem.find('div', class_=re.compile(r'VwiC3b'))
+            snippet_elem = result_elem.select_one('div[class*="VwiC3b"]')
             snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
             
             # Parse name and title
@@ -202,10 +225,10 @@ class GoogleSearchScraper:
         # or "Name | Professional Profile | LinkedIn"
         
         # Remove "| LinkedIn" suffix
-        title = re.sub(r'\s*\|\s*LinkedIn.*$', '', title)
+        title = _LINKEDIN_SUFFIX_RE.sub('', title)
         
         # Split by dash or pipe
-        parts = re.split(r'\s*[-|]\s*', title)
+        parts = _TITLE_SEPARATOR_RE.split(title)
         
         if parts:
             # First part is usually the name
@@ -222,19 +245,19 @@ class GoogleSearchScraper:
     def _extract_title_from_text(self, title: str, snippet: str) -> Optional[str]:
         """Extract job title from title or snippet"""
         # From title: "Name - Title - Company"
-        parts = re.split(r'\s*[-|]\s*', title)
+        parts = _TITLE_SEPARATOR_RE.split(title)
         
         if len(parts) >= 2:
             # Second part is often the title
             potential_title = parts[1].strip()
             
             # Skip if it's just "LinkedIn" or similar
-            if potential_title and not any(x in potential_title.lower() for x in ['linkedin', 'profile', 'professional']):
+            if potential_title and not _NON_TITLE_RE.search(potential_title.lower()):
                 return potential_title
         
         # Try to extract from snippet
         # Pattern: "Name is a Title at Company"
-        match = re.search(r'is (?:a|an|the) ([^.]+) at', snippet, re.IGNORECASE)
+        match = _SNIPPET_TITLE_RE.search(snippet)
         if match:
             return match.group(1).strip()
         
@@ -0,0 +1,81 @@
+"""
+Batched counter flushing.
+
+Accumulates per-key increments in memory and hands them to a flush callback
+in batches (every `flush_interval` seconds or once `max_pending` increments
+are queued), so usage writes stay off the request path.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedCounter:
+    """
+    Thread-safe increment accumulator with a background flusher.
+
+    `flush_fn` receives {key: count} and is responsible for persisting it;
+    failures are logged and the batch is dropped (usage counters are
+    best-effort, same as the inline writes they replace).
+    """
+
+    def __init__(self, flush_fn: Callable[[Dict[Hashable, int]], None],
+                 flush_interval: float = 1.0, max_pending: int = 500,
+                 name: str = "batched-counter"):
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+
+        self._pending: Counter = Counter()
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def add(self, key: Hashable, count: int = 1):
+        """Queue an increment - O(1), no I/O"""
+        with self._lock:
+            self._pending[key] += count
+            self._pending_total += count
+            full = self._pending_total >= self.max_pending
+            if self._thread is None:
+                self._start()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Flush pending increments now (also runs at interpreter exit)"""
+        with self._lock:
+            if not self._pending:
+                return
+            batch = dict(self._pending)
+            self._pending.clear()
+            self._pending_total = 0
+
+        try:
+            self.flush_fn(batch)
+        except Exception as e:
+            logger.error(f"{self.name}: failed to flush {len(batch)} keys: {e}", exc_info=True)
+
+    def pending(self) -> Dict[Hashable, int]:
+        """Snapshot of increments not yet flushed"""
+        with self._lock:
+            return dict(self._pending)
+
+    def _start(self):
+        # Called with the lock held
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
@@ -1,7 +1,10 @@
 """Caching utilities"""
 
 import json
+import time
 import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Any
 from datetime import datetime, timedelta
@@ -25,9 +28,18 @@ class Cache:
         hash_val = hashlib.md5(query_str.encode()).hexdigest()
         return f"{source}:{hash_val}"
     
-    def get(self, source: str, query: dict) -> Optional[Any]:
-        """Get cached result if it exists and is not expired"""
+    def get(self, source: str, query: dict, ttl: Optional[timedelta] = None) -> Optional[Any]:
+        """
+        Get cached result if it exists and is not expired.
+        
+        Args:
+            source: Cache namespace
+            query: Query dict the result was stored under
+            ttl: Optional max age overriding the cache-wide TTL
+                 (for short-lived data such as raw SERP responses)
+        """
         key = self._make_key(source, query)
+        max_age = ttl if ttl is not None else self.ttl
         
         try:
             result = self._cache.get(key)
@@ -36,7 +48,7 @@ class Cache:
                 cached_at = result.get("cached_at")
                 if cached_at:
                     cached_time = datetime.fromisoformat(cached_at)
-                    if datetime.utcnow() - cached_time > self.ttl:
+                    if datetime.utcnow() - cached_time > max_age:
                         self._cache.delete(key)
                         return None
                 
@@ -69,6 +81,32 @@ class Cache:
         else:
             self._cache.clear()
     
+    def incr(self, key: str, delta: int = 1, expire_seconds: Optional[float] = None) -> int:
+        """
+        Atomically add to a counter and return the new value.
+        
+        The counter lives in the cache directory, so every process using it
+        (e.g. all gunicorn workers) shares the same count. expire_seconds is
+        applied when the counter is created.
+        """
+        try:
+            with self._cache.transact():
+                value = self._cache.incr(key, delta, default=0)
+                if expire_seconds and value == delta:
+                    self._cache.touch(key, expire_seconds)
+            return value
+        except Exception as e:
+            print(f"Cache write error: {e}")
+            return 0
+    
+    def get_counter(self, key: str) -> int:
+        """Current value of a counter written by incr (0 if missing)"""
+        try:
+            return self._cache.get(key, 0)
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            return 0
+    
     def get_stats(self) -> dict:
         """Get cache statistics"""
         return {
@@ -77,6 +115,56 @@ class Cache:
         }
 
 
+class TTLCache:
+    """
+    Small thread-safe in-memory cache with per-entry TTL and LRU eviction.
+    
+    For hot-path lookups (API key limits, profiles) that are too short-lived
+    for the disk cache.
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict = OrderedDict()  # {key: (expires_at, value)}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get a live entry, or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Remove an entry (e.g. after the underlying record changed)"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+    
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 # Global cache instance
 _cache = Cache()
 
@@ -1,5 +1,6 @@
 """HTTP client with retries and proxy support"""
 
+import itertools
 import random
 import time
 from typing import Optional, Dict, Any
@@ -7,6 +8,11 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to requests' stdlib json
+    orjson = None
+
 
 class HttpClient:
     """HTTP client with automatic retries and user agent rotation"""
@@ -18,10 +24,25 @@ class HttpClient:
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
     ]
     
+    BASE_HEADERS = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": "gzip, deflate, br",
+        "DNT": "1",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    }
+    
     def __init__(self, proxy: Optional[str] = None, timeout: int = 30):
         self.proxy = proxy
         self.timeout = timeout
         self.session = self._create_session()
+        
+        # One prebuilt header dict per user agent, rotated evenly. Start at a
+        # random offset so separate clients don't all lead with the same UA.
+        templates = [{"User-Agent": ua, **self.BASE_HEADERS} for ua in self.USER_AGENTS]
+        offset = random.randrange(len(templates))
+        self._header_cycle = itertools.cycle(templates[offset:] + templates[:offset])
     
     def _create_session(self) -> requests.Session:
         """Create a session with retry logic"""
@@ -48,19 +69,12 @@ class HttpClient:
         return session
     
     def _get_headers(self, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
-        """Get headers with random user agent"""
-        headers = {
-            "User-Agent": random.choice(self.USER_AGENTS),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
+        """Get headers with the next user agent in the rotation"""
+        headers = next(self._header_cycle)
         
+        # Templates are shared - never mutate them
         if extra_headers:
-            headers.update(extra_headers)
+            return {**headers, **extra_headers}
         
         return headers
     
@@ -102,6 +116,56 @@ class HttpClient:
         self.session.close()
 
 
+def read_until(response: requests.Response, marker: bytes, max_hits: int,
+               chunk_size: int = 8192, max_bytes: int = 2 * 1024 * 1024) -> str:
+    """
+    Read a streamed response body only until `marker` has been seen more than
+    `max_hits` times, then stop downloading.
+    
+    Use with `stream=True` when only the first N results of a long page are
+    needed: once the (max_hits + 1)th marker arrives the first max_hits blocks
+    are complete. lxml copes with the truncated document.
+    
+    Args:
+        response: Response opened with stream=True (closed on return)
+        marker: Byte string that starts each result block (e.g. b'<h3')
+        max_hits: Number of complete result blocks needed
+        chunk_size: Bytes per read
+        max_bytes: Hard cap on bytes read
+    
+    Returns:
+        Decoded body read so far
+    """
+    buffer = bytearray()
+    hits = 0
+    
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            # Rescan the overlap so markers split across chunks are counted once
+            start = max(0, len(buffer) - len(marker) + 1)
+            buffer.extend(chunk)
+            hits += buffer.count(marker, start)
+            
+            if hits > max_hits or len(buffer) >= max_bytes:
+                break
+    finally:
+        response.close()
+    
+    return buffer.decode(response.encoding or "utf-8", errors="replace")
+
+
+def parse_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body.
+    
+    Uses orjson (several times faster on large API payloads) when installed,
+    otherwise response.json(). Raises ValueError on invalid JSON either way.
+    """
+    if orjson is None:
+        return response.json()
+    return orjson.loads(response.content)
+
+
 def create_client(proxy: Optional[str] = None) -> HttpClient:
     """Factory function to create HTTP client"""
     return HttpClient(proxy=proxy)
@@ -1,9 +1,9 @@
 """Simple metrics tracking for API endpoints"""
 
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Any, Deque, Dict, Tuple
 from threading import Lock
 
 
@@ -14,11 +14,12 @@ class MetricsTracker:
         self._lock = Lock()
         self._request_counts: Dict[str, int] = defaultdict(int)
         self._error_counts: Dict[str, int] = defaultdict(int)
-        self._request_times: Dict[str, list] = defaultdict(list)
+        # (monotonic timestamp, duration_ms) per request, oldest first
+        self._request_times: Dict[str, Deque[Tuple[float, float]]] = defaultdict(deque)
         self._started_at = datetime.utcnow()
         
         # Keep only last hour of request times
-        self._cleanup_threshold = timedelta(hours=1)
+        self._cleanup_threshold = timedelta(hours=1).total_seconds()
     
     def record_request(self, endpoint: str, status_code: int, duration_ms: float):
         """Record a request"""
@@ -29,19 +30,14 @@ class MetricsTracker:
                 self._error_counts[endpoint] += 1
             
             # Store request time (keep last hour)
-            now = datetime.utcnow()
-            self._request_times[endpoint].append({
-                'timestamp': now,
-                'duration_ms': duration_ms,
-                'status_code': status_code
-            })
+            now = time.monotonic()
+            times = self._request_times[endpoint]
+            times.append((now, duration_ms))
             
-            # Cleanup old entries
+            # Cleanup old entries - they are always at the left end
             cutoff = now - self._cleanup_threshold
-            self._request_times[endpoint] = [
-                entry for entry in self._request_times[endpoint]
-                if entry['timestamp'] > cutoff
-            ]
+            while times[0][0] <= cutoff:
+                times.popleft()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current metrics"""
@@ -55,11 +51,11 @@ class MetricsTracker:
             
             for endpoint, times in self._request_times.items():
                 if times:
-                    avg_time = sum(t['duration_ms'] for t in times) / len(times)
+                    avg_time = sum(duration for _, duration in times) / len(times)
                     avg_times[endpoint] = round(avg_time, 2)
                     
                     # Count slow requests (>5s)
-                    slow_count = sum(1 for t in times if t['duration_ms'] > 5000)
+                    slow_count = sum(1 for _, duration in times if duration > 5000)
                     if slow_count > 0:
                         slow_requests[endpoint] = slow_count
             
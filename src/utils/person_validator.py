@@ -13,6 +13,11 @@ from typing import List, Optional
 from src.models.person import Person
 
 
+def _any_of(keywords: List[str]) -> "re.Pattern":
+    """Compile literal keywords into one alternation (substring semantics)"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
 class PersonValidator:
     """
     Validates person data to remove false positives.
@@ -40,6 +45,39 @@ class PersonValidator:
         'independent contractor', 'self-employed'
     ]
     
+    # Per-title patterns, compiled once at class load
+    _PAST_EMPLOYMENT_RE = _any_of(PAST_EMPLOYMENT_KEYWORDS)
+    _PAST_PHRASE_RE = re.compile('|'.join([
+        r'was\s+at\s+[a-z]+',  # "was at Google"
+        r'[a-z]+\s+alumnus',   # "Google alumnus"
+        r'alumnus\s+of\s+[a-z]+',  # "alumnus of Google"
+        r'formerly\s+[a-z]+',  # "formerly Google"
+        r'previous\s+[a-z]+\s+employee',  # "previous Google employee"
+    ]))
+    _GENERIC_TITLE_RE = re.compile('|'.join([
+        r'(software|senior|principal|staff|lead)\s+(engineer|developer|programmer|swe)',
+        r'(product|engineering|technical)\s+(manager|director)',
+        r'(data|machine\s+learning|ml|ai)\s+(engineer|scientist)',
+        r'(ai|ml|applied)\s+(engineer|researcher)',
+    ]))  # used with .match(), i.e. anchored at the start of the title
+    _AT_COMPANY_RE = re.compile(r'(?:at|@)\s+([a-z][a-z0-9]+(?:\s+[a-z][a-z0-9]+)*)')
+    _EMPLOYMENT_CONTEXT_RE = re.compile(
+        r'\bat\s+'  # "Engineer at Company"
+        r'|\b@\s+'  # "Engineer @ Company"
+        r'|\b\|\s*'  # "Engineer | Company"
+    )
+    _CURRENT_INDICATOR_RE = _any_of(['currently', 'present', 'current role', 'works at', 'working at'])
+    
+    # Titles that mention these mean a different company (e.g. Root vs Roots AI)
+    FALSE_POSITIVE_COMPANIES = {
+        'root': ['root insurance', 'roots ai', 'square root', 'grassroots', 'root cause'],
+        'meta': ['metadata', 'metallic', 'metamask', 'metaphor'],
+        'apple': ['apple tree', 'pineapple', 'apple valley'],
+        'amazon': ['amazon rainforest', 'amazonia'],
+    }
+    
+    VERY_GENERIC_TITLE_WORDS = frozenset(['engineer', 'developer', 'programmer', 'manager', 'director'])
+    
     def __init__(self, company: str, company_domain: str = None):
         """
         Initialize validator for a specific company search.
@@ -50,6 +88,10 @@ class PersonValidator:
         """
         self.company = company.lower().strip()
         self.company_words = set(self.company.split())
+        self._company_tokens = tuple(self.company.split())
+        # Company words long enough to count as a mention on their own
+        self._significant_company_words = [w for w in self._company_tokens if len(w) > 3]
+        self._false_positive_names = self.FALSE_POSITIVE_COMPANIES.get(self.company, [])
         self.company_domain = company_domain.lower().strip() if company_domain else None
     
     def validate_person(self, person: Person) -> tuple[bool, float, str, dict]:
@@ -182,24 +224,20 @@ class PersonValidator:
         - Searching "Meta" → Person named "Meta Johnson" (FALSE POSITIVE)
         - Searching "Amazon" → Person named "Amazonia Smith" (VALID - substring, not exact word)
         """
-        name_lower = person.name.lower()
-        name_words = name_lower.split()
+        name_words = person.name.lower().split()
         
-        # Check for exact word matches (not substrings)
+        # Exact word match (not substrings)
         # This catches "Amazon Smith" but not "Amazonia Smith"
-        for name_word in name_words:
-            # Exact word match (case-insensitive)
-            if name_word == self.company:
-                return True
-            
-            # Check if company is multi-word and matches as phrase
-            if ' ' in self.company:
-                company_words = self.company.split()
-                # Check if consecutive words in name match company phrase
-                for i in range(len(name_words) - len(company_words) + 1):
-                    name_phrase = ' '.join(name_words[i:i+len(company_words)])
-                    if name_phrase == self.company:
-                        return True
+        if self.company in name_words:
+            return True
+        
+        # Multi-word company: check consecutive name words against the phrase
+        tokens = self._company_tokens
+        size = len(tokens)
+        if size > 1:
+            for i in range(len(name_words) - size + 1):
+                if tuple(name_words[i:i + size]) == tokens:
+                    return True
         
         return False
     
@@ -223,25 +261,11 @@ class PersonValidator:
         
         title_lower = person.title.lower()
         
-        # Check for keywords
-        for keyword in self.PAST_EMPLOYMENT_KEYWORDS:
-            if keyword in title_lower:
-                return True
-        
-        # Pattern matching for common past employment phrases
-        past_patterns = [
-            r'was\s+at\s+[a-z]+',  # "was at Google"
-            r'[a-z]+\s+alumnus',   # "Google alumnus"
-            r'alumnus\s+of\s+[a-z]+',  # "alumnus of Google"
-            r'formerly\s+[a-z]+',  # "formerly Google"
-            r'previous\s+[a-z]+\s+employee',  # "previous Google employee"
-        ]
-        
-        for pattern in past_patterns:
-            if re.search(pattern, title_lower):
-                return True
-        
-        return False
+        # Check for keywords, then common past employment phrases
+        return bool(
+            self._PAST_EMPLOYMENT_RE.search(title_lower) or
+            self._PAST_PHRASE_RE.search(title_lower)
+        )
     
     def _is_spam_profile(self, person: Person) -> bool:
         """
@@ -305,13 +329,13 @@ class PersonValidator:
             return False
         
         title_lower = person.title.lower()
-        company_lower = self.company.lower()
-        company_words = company_lower.split()
+        company_lower = self.company
+        company_words = self._company_tokens
         
         # Check if company OR domain is mentioned (domain is strong signal)
         company_mentioned = (
             company_lower in title_lower or
-            any(word in title_lower for word in company_words if len(word) > 3)
+            any(word in title_lower for word in self._significant_company_words)
         )
         
         # Check domain if available
@@ -319,34 +343,18 @@ class PersonValidator:
             company_mentioned = True
         
         # If title is generic without company context, filter out
-        generic_title_patterns = [
-            r'^(software|senior|principal|staff|lead)\s+(engineer|developer|programmer|swe)',
-            r'^(product|engineering|technical)\s+(manager|director)',
-            r'^(data|machine\s+learning|ml|ai)\s+(engineer|scientist)',
-            r'^(ai|ml|applied)\s+(engineer|researcher)',
-        ]
-        
-        is_generic = any(re.match(pattern, title_lower) for pattern in generic_title_patterns)
+        is_generic = self._GENERIC_TITLE_RE.match(title_lower) is not None
         
         if is_generic and not company_mentioned:
             return True  # Filter out - generic title without company context
         
         # Check for false positive companies (e.g., Root vs Roots AI)
-        false_positive_companies = {
-            'root': ['root insurance', 'roots ai', 'square root', 'grassroots', 'root cause'],
-            'meta': ['metadata', 'metallic', 'metamask', 'metaphor'],
-            'apple': ['apple tree', 'pineapple', 'apple valley'],
-            'amazon': ['amazon rainforest', 'amazonia'],
-        }
-        
-        if company_lower in false_positive_companies:
-            for false_positive in false_positive_companies[company_lower]:
-                if false_positive in title_lower:
-                    return True  # Wrong company!
+        for false_positive in self._false_positive_names:
+            if false_positive in title_lower:
+                return True  # Wrong company!
         
         # Pattern: "at [company]" or "@ [company]"
-        at_pattern = r'(?:at|@)\s+([a-z][a-z0-9]+(?:\s+[a-z][a-z0-9]+)*)'
-        matches = re.findall(at_pattern, title_lower)
+        matches = self._AT_COMPANY_RE.findall(title_lower)
         
         for matched_company in matches:
             matched_lower = matched_company.lower()
@@ -364,7 +372,7 @@ class PersonValidator:
                 
                 if matched_lower not in company_variations and len(matched_company) > 3:
                     # But allow if they mention BOTH companies
-                    if not any(word in title_lower for word in company_words if len(word) > 3):
+                    if not any(word in title_lower for word in self._significant_company_words):
                         return True
         
         return False
@@ -385,13 +393,11 @@ class PersonValidator:
             return False  # Already checked in _missing_critical_info
         
         title_lower = person.title.lower()
-        company_lower = self.company.lower()
-        company_words = company_lower.split()
         
         # Check if company is mentioned
         company_mentioned = (
-            company_lower in title_lower or
-            any(word in title_lower for word in company_words if len(word) > 3)
+            self.company in title_lower or
+            any(word in title_lower for word in self._significant_company_words)
         )
         
         # If company is mentioned, we're good
@@ -400,13 +406,7 @@ class PersonValidator:
         
         # If no company mentioned, check if title suggests employment context
         # Titles like "Engineer at X" or "X Engineer" suggest company context
-        employment_patterns = [
-            r'\bat\s+',  # "Engineer at Company"
-            r'\b@\s+',   # "Engineer @ Company"
-            r'\b\|\s*',  # "Engineer | Company"
-        ]
-        
-        has_employment_context = any(re.search(pattern, title_lower) for pattern in employment_patterns)
+        has_employment_context = self._EMPLOYMENT_CONTEXT_RE.search(title_lower) is not None
         
         # If title has employment context pattern but no company, might be wrong person
         # But be lenient - allow through if it's a detailed title
@@ -415,11 +415,10 @@ class PersonValidator:
             return False  # Let other checks handle this
         
         # Filter very generic titles without company context (high false positive risk)
-        very_generic = ['engineer', 'developer', 'programmer', 'manager', 'director']
         title_words = title_lower.split()
         
         # If title is just generic words without company, filter
-        if len(title_words) <= 2 and any(gen in title_words for gen in very_generic):
+        if len(title_words) <= 2 and not self.VERY_GENERIC_TITLE_WORDS.isdisjoint(title_words):
             return True  # Too generic, likely wrong person
         
         return False
@@ -539,8 +538,7 @@ class PersonValidator:
             score += 0.1
             
         # Bonus for current/present tense indicators
-        current_indicators = ['currently', 'present', 'current role', 'works at', 'working at']
-        if any(indicator in combined_text for indicator in current_indicators):
+        if self._CURRENT_INDICATOR_RE.search(combined_text):
             score *= 1.2
         
         return min(score, 1.0)  # Cap at 1.0
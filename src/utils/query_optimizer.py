@@ -130,13 +130,25 @@ class QueryOptimizer:
                 company, title, company_domain, job_context
             ))
         
-        # Remove duplicates while preserving order
+        return self._dedupe_queries(queries)
+    
+    @staticmethod
+    def _dedupe_queries(queries: List[str]) -> List[str]:
+        """
+        Remove queries that differ only in whitespace, preserving order.
+        
+        Templates with empty slots (e.g. no title) leave trailing/double spaces,
+        so exact-string dedup let equivalent queries through and each one cost
+        a full search request. The first occurrence is kept, whitespace-collapsed.
+        Case is kept significant: search operators like OR are case-sensitive.
+        """
         seen = set()
         unique_queries = []
         for q in queries:
-            if q not in seen:
-                seen.add(q)
-                unique_queries.append(q)
+            normalized = ' '.join(q.split())
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                unique_queries.append(normalized)
         
         return unique_queries
     
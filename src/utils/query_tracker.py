@@ -7,8 +7,9 @@ Can be enhanced later to persist to database for analytics.
 
 import time
 import logging
-from typing import Dict, List
-from collections import defaultdict
+import threading
+from typing import Deque, Dict
+from collections import defaultdict, deque
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -26,8 +27,17 @@ class QueryTracker:
     - Success/failure status
     """
     
+    # Individual query entries kept for inspection; totals cover all queries
+    MAX_RECENT_QUERIES = 1000
+    
     def __init__(self):
-        self.queries: List[Dict] = []
+        # Providers track queries from worker threads concurrently
+        self._lock = threading.Lock()
+        self.queries: Deque[Dict] = deque(maxlen=self.MAX_RECENT_QUERIES)
+        self._total_queries = 0
+        self._total_results = 0
+        self._total_time_ms = 0.0
+        self._successes = 0
         self._stats_by_pattern: Dict[str, Dict] = defaultdict(lambda: {
             'count': 0,
             'total_results': 0,
@@ -62,18 +72,26 @@ class QueryTracker:
             'success': success,
             'timestamp': datetime.utcnow().isoformat()
         }
-        self.queries.append(entry)
-        
         # Update pattern stats (simple pattern: first 50 chars of query)
         pattern = query[:50] if len(query) > 50 else query
-        stats = self._stats_by_pattern[pattern]
-        stats['count'] += 1
-        stats['total_results'] += results_count
-        stats['total_time_ms'] += execution_time_ms
-        if success:
-            stats['successes'] += 1
-        else:
-            stats['failures'] += 1
+        
+        with self._lock:
+            self.queries.append(entry)
+            
+            self._total_queries += 1
+            self._total_results += results_count
+            self._total_time_ms += execution_time_ms
+            if success:
+                self._successes += 1
+            
+            stats = self._stats_by_pattern[pattern]
+            stats['count'] += 1
+            stats['total_results'] += results_count
+            stats['total_time_ms'] += execution_time_ms
+            if success:
+                stats['successes'] += 1
+            else:
+                stats['failures'] += 1
         
         # Log query performance
         status = "✓" if success else "✗"
@@ -88,7 +106,14 @@ class QueryTracker:
         Returns:
             Dictionary with overall stats and pattern breakdowns
         """
-        if not self.queries:
+        with self._lock:
+            total_queries = self._total_queries
+            total_results = self._total_results
+            total_time = self._total_time_ms
+            successes = self._successes
+            pattern_stats = [(pattern, dict(stats)) for pattern, stats in self._stats_by_pattern.items()]
+        
+        if not total_queries:
             return {
                 'total_queries': 0,
                 'total_results': 0,
@@ -98,14 +123,9 @@ class QueryTracker:
                 'top_patterns': []
             }
         
-        total_queries = len(self.queries)
-        total_results = sum(q['results_count'] for q in self.queries)
-        total_time = sum(q['execution_time_ms'] for q in self.queries)
-        successes = sum(1 for q in self.queries if q['success'])
-        
         # Calculate pattern performance
         pattern_performance = []
-        for pattern, stats in self._stats_by_pattern.items():
+        for pattern, stats in pattern_stats:
             pattern_performance.append({
                 'pattern': pattern,
                 'queries': stats['count'],
@@ -128,8 +148,13 @@ class QueryTracker:
     
     def reset(self):
         """Reset all tracking data"""
-        self.queries.clear()
-        self._stats_by_pattern.clear()
+        with self._lock:
+            self.queries.clear()
+            self._stats_by_pattern.clear()
+            self._total_queries = 0
+            self._total_results = 0
+            self._total_time_ms = 0.0
+            self._successes = 0
 
 
 # Global query tracker instance
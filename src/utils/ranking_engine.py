@@ -5,8 +5,9 @@ Implements multi-factor scoring to ensure the best connections
 appear at the top, especially for early career job seekers.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
+from operator import itemgetter
 from enum import Enum
 
 from src.models.person import Person, PersonCategory
@@ -53,6 +54,16 @@ class ScoringWeights:
         assert abs(total - 1.0) < 0.01, f"Weights must sum to 1.0, got {total}"
 
 
+@dataclass
+class _MatchInputs:
+    """Candidate/job fields lowercased once per ranking batch"""
+    schools: List[str]
+    past_companies: List[str]
+    skills: Set[str]
+    department: str
+    location: str
+
+
 class RankingEngine:
     """
     Advanced ranking engine for connection scoring.
@@ -115,20 +126,19 @@ class RankingEngine:
         # Determine career stage
         career_stage = self._determine_career_stage(job_context, candidate_profile)
         
+        # Everything that doesn't depend on the person is resolved once per batch
+        relevance_map = self.CATEGORY_RELEVANCE.get(career_stage, self.CATEGORY_RELEVANCE["mid_career"])
+        match_inputs = self._prepare_match_inputs(job_context, candidate_profile)
+        source_quality_map = source_quality_map or {}
+        
         # Score each person
-        scored_people = []
-        for person in people:
-            score, breakdown = self._calculate_score(
-                person, 
-                career_stage,
-                job_context, 
-                candidate_profile,
-                source_quality_map
-            )
-            scored_people.append((person, score, breakdown))
+        scored_people = [
+            (person, *self._calculate_score(person, relevance_map, match_inputs, source_quality_map))
+            for person in people
+        ]
         
         # Sort by score (highest first)
-        scored_people.sort(key=lambda x: x[1], reverse=True)
+        scored_people.sort(key=itemgetter(1), reverse=True)
         
         return scored_people
     
@@ -163,49 +173,64 @@ class RankingEngine:
         # Default to mid-career
         return "mid_career"
     
+    def _prepare_match_inputs(
+        self,
+        job_context: Optional[JobContext],
+        candidate_profile: Optional[CandidateProfile]
+    ) -> Optional[_MatchInputs]:
+        """Lowercase candidate/job fields once instead of per person"""
+        if not candidate_profile:
+            return None
+        
+        return _MatchInputs(
+            schools=[school.lower() for school in candidate_profile.schools or []],
+            past_companies=[company.lower() for company in candidate_profile.past_companies or []],
+            skills={skill.lower() for skill in candidate_profile.skills or []},
+            department=(job_context.department or "").lower() if job_context else "",
+            location=(job_context.location or "").lower() if job_context else "",
+        )
+    
     def _calculate_score(
         self,
         person: Person,
-        career_stage: str,
-        job_context: Optional[JobContext],
-        candidate_profile: Optional[CandidateProfile],
-        source_quality_map: Optional[Dict[str, float]]
+        relevance_map: Dict[PersonCategory, float],
+        match_inputs: Optional[_MatchInputs],
+        source_quality_map: Dict[str, float]
     ) -> Tuple[float, Dict[str, float]]:
         """Calculate comprehensive score for a person"""
-        breakdown = {}
+        weights = self.weights
         
         # 1. Employment Verification Score (0-1)
         employment_score = self._calculate_employment_score(person)
-        breakdown['employment'] = employment_score
         
         # 2. Role Relevance Score (0-1)
-        role_score = self._calculate_role_relevance(person, career_stage)
-        breakdown['role_relevance'] = role_score
+        role_score = relevance_map.get(person.category, 0.5)
         
         # 3. Profile Match Score (0-1)
-        profile_score, match_types = self._calculate_profile_match(
-            person, job_context, candidate_profile
-        )
-        breakdown['profile_match'] = profile_score
-        breakdown['match_types'] = match_types
+        profile_score, match_types = self._calculate_profile_match(person, match_inputs)
         
         # 4. Data Quality Score (0-1)
         quality_score = self._calculate_data_quality(person)
-        breakdown['data_quality'] = quality_score
         
-        # 5. Source Quality Score (0-1)
-        source_score = 0.5  # Default
-        if source_quality_map and person.source in source_quality_map:
-            source_score = source_quality_map[person.source]
-        breakdown['source_quality'] = source_score
+        # 5. Source Quality Score (0-1), 0.5 by default
+        source_score = source_quality_map.get(person.source, 0.5)
+        
+        breakdown = {
+            'employment': employment_score,
+            'role_relevance': role_score,
+            'profile_match': profile_score,
+            'match_types': match_types,
+            'data_quality': quality_score,
+            'source_quality': source_score,
+        }
         
         # Calculate weighted total
         total_score = (
-            employment_score * self.weights.current_employee_weight +
-            role_score * self.weights.role_relevance_weight +
-            profile_score * self.weights.profile_match_weight +
-            quality_score * self.weights.data_quality_weight +
-            source_score * self.weights.source_quality_weight
+            employment_score * weights.current_employee_weight +
+            role_score * weights.role_relevance_weight +
+            profile_score * weights.profile_match_weight +
+            quality_score * weights.data_quality_weight +
+            source_score * weights.source_quality_weight
         )
         
         return total_score, breakdown
@@ -221,59 +246,53 @@ class RankingEngine:
         
         return base_score
     
-    def _calculate_role_relevance(self, person: Person, career_stage: str) -> float:
-        """Score based on role category relevance"""
-        relevance_map = self.CATEGORY_RELEVANCE.get(career_stage, self.CATEGORY_RELEVANCE["mid_career"])
-        return relevance_map.get(person.category, 0.5)
-    
     def _calculate_profile_match(
         self,
         person: Person,
-        job_context: Optional[JobContext],
-        candidate_profile: Optional[CandidateProfile]
+        match_inputs: Optional[_MatchInputs]
     ) -> Tuple[float, List[str]]:
         """Calculate profile matching score"""
         score = 0.0
         matches = []
         
-        if not candidate_profile:
+        if match_inputs is None:
             return 0.5, []  # Neutral score if no profile
         
+        title_lower = (person.title or "").lower()
+        
         # Alumni match (highest weight for early career)
-        if candidate_profile.schools and person.title:
+        if match_inputs.schools and person.title:
             # Simple heuristic: check if school name appears in person's data
-            person_text = f"{person.title} {person.company}".lower()
-            for school in candidate_profile.schools:
-                if school.lower() in person_text:
+            person_text = f"{title_lower} {person.company}".lower()
+            for school in match_inputs.schools:
+                if school in person_text:
                     score += 0.3
                     matches.append(MatchType.ALUMNI.value)
                     break
         
         # Past company match
-        if candidate_profile.past_companies:
-            for company in candidate_profile.past_companies:
-                if company.lower() in (person.title or "").lower():
-                    score += 0.2
-                    matches.append(MatchType.PAST_COMPANY.value)
-                    break
+        for company in match_inputs.past_companies:
+            if company in title_lower:
+                score += 0.2
+                matches.append(MatchType.PAST_COMPANY.value)
+                break
         
         # Skills match
-        if candidate_profile.skills and person.skills:
-            overlap = set(s.lower() for s in candidate_profile.skills) & \
-                     set(s.lower() for s in person.skills)
+        if match_inputs.skills and person.skills:
+            overlap = match_inputs.skills.intersection(s.lower() for s in person.skills)
             if overlap:
                 score += min(0.2, len(overlap) * 0.05)
                 matches.append(MatchType.SKILL_MATCH.value)
         
         # Department match
-        if job_context and job_context.department and person.department:
-            if job_context.department.lower() in person.department.lower():
+        if match_inputs.department and person.department:
+            if match_inputs.department in person.department.lower():
                 score += 0.15
                 matches.append(MatchType.DEPARTMENT.value)
         
         # Location match
-        if job_context and job_context.location and person.location:
-            job_loc = job_context.location.lower()
+        if match_inputs.location and person.location:
+            job_loc = match_inputs.location
             person_loc = person.location.lower()
             if job_loc in person_loc or person_loc in job_loc:
                 score += 0.1
@@ -1,26 +1,39 @@
 """Rate limiting utilities"""
 
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from threading import Lock
-from typing import Dict, Optional
+from typing import Deque, Dict, Optional
 
 
 class RateLimiter:
-    """Thread-safe rate limiter with per-source limits"""
+    """
+    Thread-safe rate limiter with per-source limits.
+    
+    Per-second limits are token buckets: tokens refill at `requests_per_second`
+    up to `burst`, and each request takes one. With burst=1 this is a plain
+    minimum interval between requests.
+    """
     
     def __init__(self):
         self._locks: Dict[str, Lock] = defaultdict(Lock)
         self._last_request: Dict[str, float] = {}
-        self._hourly_counts: Dict[str, list] = defaultdict(list)
-        self._min_intervals: Dict[str, float] = {}
+        self._hourly_counts: Dict[str, Deque[float]] = defaultdict(deque)
+        self._rates: Dict[str, float] = {}
+        self._bursts: Dict[str, float] = {}
+        self._tokens: Dict[str, float] = {}
+        self._last_refill: Dict[str, float] = {}
         self._hourly_limits: Dict[str, int] = {}
     
     def configure(self, source: str, requests_per_second: float, 
-                  max_per_hour: Optional[int] = None):
+                  max_per_hour: Optional[int] = None, burst: int = 1):
         """Configure rate limits for a source"""
-        self._min_intervals[source] = 1.0 / requests_per_second if requests_per_second > 0 else 0
+        if requests_per_second > 0:
+            self._rates[source] = requests_per_second
+            self._bursts[source] = max(1, burst)
+        else:
+            self._rates.pop(source, None)
         if max_per_hour:
             self._hourly_limits[source] = max_per_hour
     
@@ -33,46 +46,54 @@ class RateLimiter:
             now = time.time()
             wait_time = 0.0
             
-            # Check per-second rate limit
-            if source in self._min_intervals:
-                min_interval = self._min_intervals[source]
-                if source in self._last_request:
-                    time_since_last = now - self._last_request[source]
-                    if time_since_last < min_interval:
-                        wait_time = min_interval - time_since_last
-                        time.sleep(wait_time)
-                        now = time.time()
+            # Check per-second rate limit (token bucket)
+            rate = self._rates.get(source)
+            if rate:
+                capacity = self._bursts[source]
+                tokens = self._tokens.get(source, capacity)
+                last_refill = self._last_refill.get(source, now)
+                tokens = min(capacity, tokens + (now - last_refill) * rate)
+                if tokens < 1:
+                    wait_time = (1 - tokens) / rate
+                    time.sleep(wait_time)
+                    now = time.time()
+                    tokens = 1.0
+                self._tokens[source] = tokens - 1
+                self._last_refill[source] = now
+            
+            # Timestamps are appended in order, so expired ones are always at the
+            # left end; dropping them keeps every source bounded to one hour
+            # of history whether or not it has an hourly limit
+            timestamps = self._hourly_counts[source]
+            self._prune(timestamps, now)
             
             # Check hourly limit
             if source in self._hourly_limits:
-                # Clean old entries (older than 1 hour)
-                cutoff = now - 3600
-                self._hourly_counts[source] = [
-                    t for t in self._hourly_counts[source] if t > cutoff
-                ]
-                
                 # Wait if at limit
-                if len(self._hourly_counts[source]) >= self._hourly_limits[source]:
+                if len(timestamps) >= self._hourly_limits[source]:
                     # Wait until oldest request expires
-                    oldest = self._hourly_counts[source][0]
-                    wait_until = oldest + 3600
+                    wait_until = timestamps[0] + 3600
                     if wait_until > now:
                         extra_wait = wait_until - now
                         time.sleep(extra_wait)
                         wait_time += extra_wait
                         now = time.time()
                         # Clean again after waiting
-                        cutoff = now - 3600
-                        self._hourly_counts[source] = [
-                            t for t in self._hourly_counts[source] if t > cutoff
-                        ]
+                        self._prune(timestamps, now)
             
             # Record this request
             self._last_request[source] = now
-            self._hourly_counts[source].append(now)
+            timestamps.append(now)
             
             return wait_time
     
+    @staticmethod
+    def _prune(timestamps: Deque[float], now: float):
+        """Drop request timestamps older than one hour"""
+        cutoff = now - 3600
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+    
     def get_stats(self, source: str) -> dict:
         """Get current rate limit stats for a source"""
         now = time.time()
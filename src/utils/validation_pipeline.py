@@ -105,13 +105,15 @@ class ValidationPipeline:
         
         # Stage 2: Profile matching for valid results
         stage2_results = []
+        match_context = profile_matcher.prepare_context(
+            candidate_profile=candidate_profile,
+            job_context=job_context
+        )
         for result in stage1_results:
             if result.is_valid:
                 # Calculate profile match
-                relevance_score, match_reasons = profile_matcher.calculate_relevance(
-                    result.person,
-                    candidate_profile=candidate_profile,
-                    job_context=job_context
+                relevance_score, match_reasons = profile_matcher.calculate_relevance_with_context(
+                    result.person, match_context
                 )
                 
                 result.match_reasons = match_reasons
@@ -2,7 +2,9 @@
 
 import pytest
 import sys
+import bcrypt
 from pathlib import Path
+from uuid import uuid4
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -10,6 +12,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.models.person import Person, PersonCategory
 from src.core.categorizer import PersonCategorizer
 from src.core.aggregator import PeopleAggregator
+from src.utils.person_validator import PersonValidator
+from src.utils.cache import TTLCache
+from src.services.profile_matcher import ProfileMatcher
+from src.models.job_context import CandidateProfile
+from src.db.models import JobRecord
+from src.services.api_key_service import APIKeyService
 
 
 class TestPersonCategorizer:
@@ -123,6 +131,148 @@ class TestPeopleAggregator:
         assert len(aggregator.get_all()) == 5
 
 
+class TestPersonValidator:
+    """Test false-positive validation"""
+    
+    def test_name_matches_company(self):
+        validator = PersonValidator("Amazon")
+        
+        def person(name):
+            return Person(name=name, title="Engineer", company="Amazon", source="test")
+        
+        assert validator._name_matches_company(person("Amazon Smith"))
+        assert not validator._name_matches_company(person("Amazonia Smith"))
+        
+        validator = PersonValidator("Scale AI")
+        assert validator._name_matches_company(person("Jo Scale AI"))
+        assert not validator._name_matches_company(person("Scale Jones"))
+
+
+class TestTTLCache:
+    """Test in-memory TTL cache"""
+    
+    def test_expiry_and_eviction(self):
+        cache = TTLCache(maxsize=2, ttl_seconds=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        
+        # 'b' is least recently used now
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        
+        cache.set('d', 4, ttl_seconds=0)
+        assert cache.get('d') is None
+        assert cache.pop('a') == 1
+        assert cache.get('a') is None
+
+
+class TestProfileMatcher:
+    """Test profile/job relevance matching"""
+    
+    @staticmethod
+    def reasons(person, **context):
+        ctx = ProfileMatcher.prepare_context(**context)
+        return ProfileMatcher.calculate_relevance_with_context(person, ctx)[1]
+    
+    def test_department_match(self):
+        job = JobRecord(company_name="Meta", job_title="Software Engineer", department="Engineering")
+        
+        def person(department):
+            return Person(name="Sam Lee", company="Meta", source="test", department=department)
+        
+        # One side's words contain all of the other's
+        assert 'department_match' in self.reasons(person("Software Engineering"), job=job)
+        # Whole words only: 'eng' is not a prefix match for 'engagement'
+        job = JobRecord(company_name="Meta", job_title="Software Engineer", department="eng")
+        assert 'department_match' not in self.reasons(person("engagement"), job=job)
+    
+    def test_alumni_first_school_in_profile_order(self):
+        candidate = CandidateProfile(schools=["Stanford University", "University of Michigan"])
+        person = Person(name="Sam Lee", title="Engineer, Michigan and Stanford alum",
+                        company="Meta", source="test")
+        
+        reasons = self.reasons(person, candidate_profile=candidate)
+        assert 'alumni_match (Stanford University)' in reasons
+        assert 'alumni_match (University of Michigan)' not in reasons
+    
+    def test_skill_abbreviations(self):
+        job = JobRecord(company_name="Meta", job_title="Software Engineer", required_skills=["JavaScript"])
+        person = Person(name="Sam Lee", company="Meta", source="test", skills=["js"])
+        
+        assert any(r.startswith('skills_match') for r in self.reasons(person, job=job))
+
+
+class TestAPIKeyHashing:
+    """Test API key hashing and verification"""
+    
+    @pytest.fixture(autouse=True)
+    def no_pepper(self, monkeypatch):
+        monkeypatch.delenv('API_KEY_PEPPER', raising=False)
+        monkeypatch.delenv('API_KEY_SECRET', raising=False)
+    
+    def test_hmac_round_trip_with_pepper(self, monkeypatch):
+        monkeypatch.setenv('API_KEY_PEPPER', 'test-pepper')
+        key, _ = APIKeyService.generate_api_key()
+        key_hash = APIKeyService.hash_api_key(key)
+        
+        assert not APIKeyService.is_legacy_hash(key_hash)
+        assert APIKeyService.verify_api_key(key, key_hash)
+        assert not APIKeyService.verify_api_key(key + 'x', key_hash)
+        
+        # A different pepper can't verify it
+        monkeypatch.setenv('API_KEY_PEPPER', 'other-pepper')
+        assert not APIKeyService.verify_api_key(key, key_hash)
+    
+    def test_bcrypt_without_pepper(self):
+        key, _ = APIKeyService.generate_api_key()
+        key_hash = APIKeyService.hash_api_key(key)
+        
+        assert APIKeyService.is_legacy_hash(key_hash)
+        assert APIKeyService.verify_api_key(key, key_hash)
+        assert not APIKeyService.verify_api_key(key + 'x', key_hash)
+    
+    def test_legacy_bcrypt_hash_verifies_and_upgrades(self, monkeypatch):
+        key = 'a1b2c3d4e5f6legacykey'
+        legacy_hash = bcrypt.hashpw(key.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+        assert legacy_hash.startswith('$2b$')
+        
+        # Still verifies once a pepper is configured
+        monkeypatch.setenv('API_KEY_PEPPER', 'test-pepper')
+        assert APIKeyService.verify_api_key(key, legacy_hash)
+        
+        updates = []
+        
+        class FakeQuery:
+            def update(self, data):
+                updates.append(data)
+                return self
+            
+            def eq(self, column, value):
+                return self
+            
+            def execute(self):
+                return self
+        
+        class FakeClient:
+            def table(self, name):
+                return FakeQuery()
+        
+        APIKeyService._upgrade_legacy_hash(FakeClient(), uuid4(), key)
+        assert len(updates) == 1
+        assert APIKeyService.verify_api_key(key, updates[0]['key_hash'])
+        assert not APIKeyService.is_legacy_hash(updates[0]['key_hash'])
+    
+    def test_key_prefix_of(self):
+        key, prefix = APIKeyService.generate_api_key()
+        assert APIKeyService.key_prefix_of(key) == prefix
+        assert APIKeyService.key_prefix_of('sk_deadbeef_secret') == 'deadbeef'
+        
+        # Legacy keys: first 8 chars
+        assert APIKeyService.key_prefix_of('a1b2c3d4e5f6legacykey') == 'a1b2c3d4'
+        assert APIKeyService.key_prefix_of('sk_nosecret') == 'sk_nosec'
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-
@@ -63,6 +63,18 @@ class TestGoogleSearchScraper:
         
         name = scraper._extract_name_from_title("Jane Smith | Professional Profile | LinkedIn")
         assert name == "Jane Smith"
+    
+    def test_title_extraction(self):
+        scraper = GoogleSearchScraper()
+        
+        title = scraper._extract_title_from_text("John Doe - Software Engineer - Meta | LinkedIn", "")
+        assert title == "Software Engineer"
+        
+        title = scraper._extract_title_from_text(
+            "Jane Smith | Professional Profile | LinkedIn",
+            "Jane Smith is a Staff Engineer at Meta."
+        )
+        assert title == "Staff Engineer"
 
 
 if __name__ == "__main__":